@@ -0,0 +1,69 @@
+import argparse
+import os
+import sys
+
+# Ensure project root is in path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.env_benchmark import (
+    DEFAULT_GRID, POLICIES, run_grid, compare_to_baseline, save_report, load_report
+)
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "env_baseline.json")
+
+def _int_list(value):
+    return [int(v) for v in value.split(",") if v]
+
+def main():
+    parser = argparse.ArgumentParser(description="NegotiatorEnv throughput benchmark")
+    parser.add_argument("--agents", type=_int_list, default=DEFAULT_GRID["num_agents"])
+    parser.add_argument("--items", type=_int_list, default=DEFAULT_GRID["num_items"])
+    parser.add_argument("--lags", type=_int_list, default=DEFAULT_GRID["history_lag"])
+    parser.add_argument("--policies", default=",".join(POLICIES))
+    parser.add_argument("--steps", type=int, default=2000)
+    parser.add_argument("--resets", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_results.json", help="Where to write the JSON report")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Allowed relative regression (0.15 = 15%%)")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--no-compare", action="store_true", help="Only write the report; skip the baseline check")
+    args = parser.parse_args()
+
+    grid = {"num_agents": args.agents, "num_items": args.items, "history_lag": args.lags}
+    policies = [p for p in args.policies.split(",") if p]
+
+    print(f"{'case':<42} {'steps/s':>12} {'resets/s':>12} {'alloc B/step':>13}")
+    def progress(r):
+        case = f"{r['policy']} a={r['num_agents']} i={r['num_items']} lag={r['history_lag']}"
+        print(f"{case:<42} {r['steps_per_sec']:>12.0f} {r['resets_per_sec']:>12.0f} {r['alloc_bytes_per_step']:>13.0f}")
+
+    report = run_grid(grid, policies, steps=args.steps, resets=args.resets, seed=args.seed, progress=progress)
+    save_report(report, args.output)
+    print(f"\nReport written to {args.output}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        save_report(report, args.baseline)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    if args.no_compare:
+        return 0
+
+    if not os.path.exists(args.baseline):
+        # A comparison run without a baseline checks nothing: fail rather than pass silently
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one, or pass --no-compare.")
+        return 2
+
+    regressions = compare_to_baseline(report, load_report(args.baseline), args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for r in regressions:
+            print(f"  {r['case']} {r['metric']}: {r['baseline']:.1f} -> {r['current']:.1f} ({r['change']:+.1%})")
+        return 1
+    print(f"\nNo regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
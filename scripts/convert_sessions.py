@@ -0,0 +1,46 @@
+import argparse
+import glob
+import os
+import sys
+
+# Ensure project root is in path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.api.session_archive import ARCHIVE_EXT, convert_session_file
+
+DEFAULT_SESSIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "sessions")
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert JSON/JSONL session files to columnar archives")
+    parser.add_argument("--sessions-dir", default=os.getenv("EQX_SESSIONS_DIR", DEFAULT_SESSIONS_DIR))
+    parser.add_argument("--remove-source", action="store_true", help="Delete each source file after converting it")
+    parser.add_argument("--force", action="store_true", help="Overwrite existing archives")
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.sessions_dir, "session_*.json"))
+                   + glob.glob(os.path.join(args.sessions_dir, "session_*.jsonl")))
+    converted = skipped = failed = 0
+    before = after = 0
+    for path in paths:
+        archive_path = os.path.splitext(path)[0] + ARCHIVE_EXT
+        if os.path.exists(archive_path) and not args.force:
+            skipped += 1
+            continue
+        size = os.path.getsize(path)
+        try:
+            convert_session_file(path, remove_source=args.remove_source)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Failed: {path} - {e}")
+            failed += 1
+            continue
+        before += size
+        after += os.path.getsize(archive_path)
+        converted += 1
+
+    print(f"Converted {converted}, skipped {skipped}, failed {failed}")
+    if converted:
+        print(f"Size: {before / 1024:.1f} KiB -> {after / 1024:.1f} KiB")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
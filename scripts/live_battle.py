@@ -1,13 +1,32 @@
 import asyncio
 import os
 import sys
-import time
+
+import numpy as np
 
 # Ensure project root is in path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.environment.negotiator_env import NegotiatorEnv
 from src.agents.hybrid_agent import HybridAgent
+from src.api.turn_pipeline import TurnPipeline
+
+ACTION_NAMES = ["ACCEPT", "COUNTER", "QUIT"]
+
+def _money(values):
+    """$ amount, or amounts joined with | for bundles."""
+    return " | ".join(f"${v:.2f}" for v in np.atleast_1d(values))
+
+async def print_turn(turn):
+    proposer_id = turn["agent"]
+    print(f"\n[ROUND {turn['round']}] Turn: {proposer_id.upper()}")
+    if turn["action"] == "COUNTER":
+        print(f"🤖 {proposer_id.capitalize()} proposes: {_money(turn['price'])}")
+        print(f"💬 \"{turn['message']}\"")
+    elif turn["action"] == "ACCEPT":
+        print(f"🤝 {proposer_id.capitalize()} decided to ACCEPT the offer!")
+    else:
+        print(f"🚪 {proposer_id.capitalize()} has QUIT the negotiation.")
 
 async def live_battle():
     print("\n" + "="*60)
@@ -23,50 +42,54 @@ async def live_battle():
     
     agents = {"supplier": supplier, "retailer": retailer}
     
-    print(f"DEBUG: Supplier Valuation: ${env.val_s:.2f}")
-    print(f"DEBUG: Retailer Valuation: ${env.val_r:.2f}")
-    print(f"Negotiation Zone: ${env.val_s:.2f} - ${env.val_r:.2f}\n")
+    print(f"DEBUG: Supplier Valuation: {_money(env.val_s)}")
+    print(f"DEBUG: Retailer Valuation: {_money(env.val_r)}")
+    print(f"Negotiation Zone: {_money(env.val_s)} - {_money(env.val_r)}\n")
     print("-" * 60)
 
+    # Messages generate in the background while the env steps and the next agent
+    # decides; turns are still printed in order, each with its message
+    pipeline = TurnPipeline(print_turn)
     done = False
-    while not done:
-        proposer_id = env.current_proposer
-        agent = agents[proposer_id]
-        
-        print(f"\n[ROUND {env.current_round + 1}] Turn: {proposer_id.upper()}")
-        
-        # 1. Strategic Decision (RL)
-        action_data = agent.get_strategic_action(obs[proposer_id])
-        action_type = action_data["type"]
-        price = action_data["price"][0]
-        
-        action_name = ["ACCEPT", "COUNTER", "QUIT"][action_type]
-        
-        # 2. Natural Language Justification (LLM)
-        if action_type == 1: # COUNTER
-            msg = await agent.speak(price)
-            print(f"🤖 {proposer_id.capitalize()} proposes: ${price:.2f}")
-            print(f"💬 \"{msg}\"")
-        elif action_type == 0:
-            print(f"🤝 {proposer_id.capitalize()} decided to ACCEPT the offer!")
-        else:
-            print(f"🚪 {proposer_id.capitalize()} has QUIT the negotiation.")
+    try:
+        while not done:
+            proposer_id = env.current_proposer
+            agent = agents[proposer_id]
+            round_number = env.current_round + 1
+
+            # 1. Strategic Decision (RL)
+            action_data = agent.get_strategic_action(obs[proposer_id])
+            action_type = action_data["type"]
+            price = action_data["price"]
+
+            # 2. Natural Language Justification (LLM), started but not awaited
+            draft = agent.draft(price) if action_type == 1 else None
+
+            # 3. Environment Step
+            actions = {proposer_id: action_data}
+            obs, rewards, terms, truncs, infos = env.step(actions)
+            await pipeline.submit({
+                "round": round_number,
+                "agent": proposer_id,
+                "action": ACTION_NAMES[action_type],
+                "price": price,
+                "message": "",
+            }, draft)
+
+            # Update history for the other agent
+            other_agent_id = "retailer" if proposer_id == "supplier" else "supplier"
+            agents[other_agent_id].update_history(price)
 
-        # 3. Environment Step
-        actions = {proposer_id: action_data}
-        obs, rewards, terms, truncs, infos = env.step(actions)
-        
-        # Update history for the other agent
-        other_agent_id = "retailer" if proposer_id == "supplier" else "supplier"
-        agents[other_agent_id].update_history(price)
-        
-        done = any(terms.values()) or any(truncs.values())
-        time.sleep(1) # Slow down for visibility
+            done = any(terms.values()) or any(truncs.values())
+            await asyncio.sleep(1) # Slow down for visibility
+        await pipeline.drain()
+    finally:
+        await pipeline.close()
 
     print("\n" + "-" * 60)
     print("NEGOTIATION OVER")
-    if env.deal_price:
-        print(f"✅ Result: SUCCESSFUL DEAL at ${env.deal_price:.2f}")
+    if env.deal_prices is not None:
+        print(f"✅ Result: SUCCESSFUL DEAL at {_money(env.deal_prices)}")
     else:
         print("❌ Result: NO DEAL / FAILED")
     
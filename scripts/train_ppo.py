@@ -1,18 +1,49 @@
 import os
 import sys
 
+import numpy as np
+
 # Ensure project root is in path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import ray
 from ray import air, tune
+from ray.rllib.algorithms.callbacks import DefaultCallbacks
 from ray.rllib.algorithms.ppo import PPOConfig
 from ray.tune.registry import register_env
 from src.environment.negotiator_env import NegotiatorEnv
 from src.utils.mlflow_logger import MLflowLogger
+from src.utils.bargaining_metrics import BargainingMetrics
+
+BARGAINING_METRICS = ("nash_distance", "nash_price_distance", "pareto_distance", "efficiency")
 
 def env_creator(env_config):
-    return NegotiatorEnv(config=env_config)
+    # RLlib's collectors keep observation references across steps: never hand out buffer views
+    return NegotiatorEnv(config={"copy_obs": True, **env_config})
+
+class BargainingCallbacks(DefaultCallbacks):
+    """
+    Scores every finished training episode's deal against the Nash/Pareto solution
+    of its own valuations. RLlib averages the custom metrics per iteration; the
+    distance metrics are only reported by episodes that ended in a deal.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._metrics = None
+
+    def on_episode_end(self, *, worker, base_env, policies, episode, env_index=None, **kwargs):
+        env = base_env.get_sub_environments()[env_index or 0]
+        # Unwrap RLlib's PettingZoo adapter if present
+        env = getattr(env, "par_env", env)
+        if self._metrics is None:
+            self._metrics = BargainingMetrics.from_env(env)
+        deal = env.deal_prices is not None
+        episode.custom_metrics["deal_rate"] = float(deal)
+        if deal:
+            result = self._metrics.evaluate(env.valuation_matrix[None], np.asarray(env.deal_prices)[None])
+            for name in BARGAINING_METRICS:
+                episode.custom_metrics[name] = float(result[name][0])
+            episode.custom_metrics["in_zopa_rate"] = float(result["in_zopa"][0])
 
 def train():
     # 1. Initialize Ray
@@ -47,6 +78,7 @@ def train():
             policies={"supplier", "retailer"},
             policy_mapping_fn=lambda agent_id, *args, **kwargs: agent_id,
         )
+        .callbacks(BargainingCallbacks)
         .debugging(log_level="ERROR")
     )
     
@@ -71,6 +103,11 @@ def train():
                 "training_iteration": i
             }
             logger.log_metrics(metrics, step=i)
+            custom = result.get("custom_metrics", {})
+            logger.log_bargaining_metrics({
+                name: custom[f"{name}_mean"]
+                for name in ("deal_rate", "in_zopa_rate", *BARGAINING_METRICS) if f"{name}_mean" in custom
+            }, step=i)
             
             if i % 1 == 0:
                 print(f"Iteration {i}: Reward Mean = {metrics['episode_reward_mean']:.2f}")
@@ -10,6 +10,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.environment.negotiator_env import NegotiatorEnv
 from src.utils.mlflow_logger import MLflowLogger
+from src.utils.bargaining_metrics import BargainingMetrics, EpisodeOutcomes
 
 # A simple Policy Network
 class SimplePolicy(nn.Module):
@@ -32,6 +33,9 @@ def train_simple():
     print("=== EquilibriumX Simple RL Training (Non-Ray) ===")
     env = NegotiatorEnv(config={"max_rounds": 10})
     logger = MLflowLogger()
+    # Deal quality of the policies being trained, over their recent episodes
+    metrics = BargainingMetrics.from_env(env)
+    outcomes = EpisodeOutcomes(window=100)
     
     # 10 is the size of observation space defined in negotiator_env.py
     # 3 is the number of action types (Accept, Counter, Quit)
@@ -85,6 +89,8 @@ def train_simple():
                 "supplier_reward": total_rewards["supplier"],
                 "retailer_reward": total_rewards["retailer"]
             }, step=ep)
+            outcomes.add_env(env)
+            logger.log_bargaining_metrics(outcomes.summarize(metrics), step=ep)
 
     print("\nSimple run complete. Metrics logged to MLflow.")
 
@@ -36,7 +36,7 @@ def verify_api():
     print("\nVerifying API endpoints...")
     resp = requests.get("http://localhost:8000/api/sessions")
     if resp.status_code == 200:
-        sessions = resp.json()
+        sessions = resp.json()["sessions"]
         print(f"Found {len(sessions)} sessions.")
         if len(sessions) > 0:
             latest = sessions[0]
@@ -1,16 +1,34 @@
 from src.llm.llm_client import LLMClient
 from src.llm.prompts import NEGOTIATION_PERSONAS
+from src.utils.telemetry import AGENT_ACTION_SECONDS
 import numpy as np
+import time
+
+_ACTION_TIMER = AGENT_ACTION_SECONDS.labels()
 
 class HybridAgent:
     """
     A hybrid agent that combines RL strategic pricing (PPO) with 
     LLM natural language communication.
+
+    Pass a shared `llm_client` to reuse one pooled connection set across agents;
+    otherwise the agent creates its own client. With a shared `scheduler`
+    (LLMScheduler), messages are queued at the agent's `priority` instead of going
+    straight to the model server.
+
+    `expensive_policy` tells live sessions whether get_strategic_action is worth a
+    hop to the CPU offload pool; the built-in policy is cheap NumPy and runs inline.
     """
-    def __init__(self, role, persona="neutral", model="llama3", mock_llm=True):
+    expensive_policy = False
+
+    def __init__(self, role, persona="neutral", model="llama3", mock_llm=True, llm_client=None,
+                 scheduler=None, priority="interactive"):
         self.role = role
         self.persona = persona
-        self.llm_client = LLMClient(model=model, mock_mode=mock_llm)
+        self.model = model
+        self.llm_client = llm_client if llm_client is not None else LLMClient(model=model, mock_mode=mock_llm)
+        self.scheduler = scheduler
+        self.priority = priority
         self.system_prompt = NEGOTIATION_PERSONAS.get(persona, NEGOTIATION_PERSONAS["neutral"])["system"]
         self.history = []
 
@@ -18,6 +36,13 @@ class HybridAgent:
         """
         Policy inference for Multi-Item bundles.
         """
+        started = time.perf_counter()
+        try:
+            return self._strategic_action(observation)
+        finally:
+            _ACTION_TIMER.observe(time.perf_counter() - started)
+
+    def _strategic_action(self, observation):
         # Determine num_items from observation shape if possible, or use a default
         # Assuming observation parts are [Prices, Vals, Time, Turn, History]
         # For this demo, let's assume we can infer from the observation vector
@@ -41,9 +66,12 @@ class HybridAgent:
         prices = np.random.uniform(4500, 8500, size=(num_items,)).astype(np.float32)
         return {"type": action_type, "price": prices}
 
-    async def speak(self, strategic_prices):
+    def draft(self, strategic_prices, stream=False):
         """
-        Generates a natural language justification for the current bundle offer.
+        Starts a message for this offer without waiting for it: the prompt is built
+        and the offer recorded in the history right away, and the pending generation
+        is returned, an awaitable message or, with stream=True, an async iterator
+        of chunks. Pipelined callers step the env and run the next agent meanwhile.
         """
         prompt = self.llm_client.get_negotiation_prompt(
             self.role, 
@@ -51,16 +79,32 @@ class HybridAgent:
             self.history, 
             self.persona
         )
-        message = await self.llm_client.generate_response(prompt, self.system_prompt)
-        
-        # Track history
+        self.record_offer(strategic_prices)
+        source = self.scheduler if self.scheduler is not None else self.llm_client
+        kwargs = {"priority": self.priority} if self.scheduler is not None else {}
+        generate = source.stream_response if stream else source.generate_response
+        return generate(prompt, self.system_prompt, model=self.model, **kwargs)
+
+    async def speak(self, strategic_prices):
+        """
+        Generates a natural language justification for the current bundle offer.
+        """
+        return await self.draft(strategic_prices)
+
+    async def speak_stream(self, strategic_prices):
+        """
+        Streaming speak(): yields the message in chunks as the LLM generates it.
+        """
+        async for chunk in self.draft(strategic_prices, stream=True):
+            yield chunk
+
+    def record_offer(self, strategic_prices):
+        """Track our own offer in the history (draft() does this; headless runs call it directly)."""
         if isinstance(strategic_prices, (list, np.ndarray)):
             bundle_str = "|".join([f"${p:.2f}" for p in strategic_prices])
             self.history.append(f"Bundle: {bundle_str}")
         else:
             self.history.append(f"${strategic_prices:.2f}")
-            
-        return message
 
     def update_history(self, other_prices):
         if isinstance(other_prices, (list, np.ndarray)):
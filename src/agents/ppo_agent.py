@@ -1,24 +1,48 @@
 from src.utils.mlflow_logger import MLflowLogger
-import numpy as np
+from src.utils.bargaining_metrics import BargainingMetrics
+from src.environment.negotiator_env import NegotiatorEnv
+from src.environment.fast_forward import simulate_episodes, hybrid_random_strategy
 
 class PPOAgent:
-    def __init__(self, config):
+    """
+    Simulated PPO trainer. Each iteration rolls out a batch with the agent's own
+    policy (`strategies`, one fast_forward strategy per agent; a random placeholder
+    until the PPO network lands), and both the reward and the bargaining metrics
+    are computed from that same batch.
+    """
+    def __init__(self, config, strategies=None):
         self.config = config
         self.logger = MLflowLogger()
+        env_config = {"max_rounds": config.get("max_rounds", 10), "num_items": config.get("num_items", 1)}
+        self.env_config = env_config
+        # Rollout batches keep observations across steps, so they must be copies
+        env = NegotiatorEnv({"copy_obs": True, **env_config})
+        self.metrics = BargainingMetrics.from_env(env)
+        self.strategies = strategies or [hybrid_random_strategy() for _ in env.possible_agents]
+
+    def rollout(self, num_episodes=256, seed=None):
+        """Play a batch of episodes with the current policy."""
+        return simulate_episodes(self.strategies, config=self.env_config, num_episodes=num_episodes, seed=seed)
+
+    def evaluate_outcomes(self, batch):
+        """Score a rollout batch's deals against the Nash/Pareto solution."""
+        return self.metrics.summarize(batch["valuations"], batch["deal_prices"])
         
     def train(self, num_episodes=1000):
         with self.logger.start_run(run_name="PPO_Negotiation_Training"):
             self.logger.log_params(self.config)
             
             for episode in range(num_episodes):
-                # Simulated training loop
-                mean_reward = np.random.uniform(0, 10)
-                nash_distance = np.random.uniform(0.01, 0.5)
+                # Simulated training loop: metrics come from the policy's own rollouts
+                batch = self.rollout(num_episodes=self.config.get("episodes_per_iteration", 256), seed=episode)
+                mean_reward = float(batch["rewards"].sum(axis=1).mean())
+                outcomes = self.evaluate_outcomes(batch)
                 
                 self.logger.log_metrics({
                     "mean_reward": mean_reward,
-                    "nash_distance": nash_distance
+                    "nash_distance": outcomes["nash_distance"]
                 }, step=episode)
+                self.logger.log_bargaining_metrics(outcomes, step=episode)
                 
                 if episode % 100 == 0:
                     print(f"Episode {episode}: Mean Reward = {mean_reward:.2f}")
@@ -1,9 +1,7 @@
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-import json
-import asyncio
 import os
 import sys
 
@@ -12,16 +10,26 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 
 from src.environment.negotiator_env import NegotiatorEnv
 from src.agents.hybrid_agent import HybridAgent
+from src.llm.llm_client import LLMClient
+from src.llm.response_cache import ResponseCache
+from src.llm.scheduler import LLMScheduler
+from src.api.session_index import SessionIndex
+from src.api.session_recorder import SessionRecorder
+from src.api.session_archive import load_session, convert_session_file
+from src.api.batch_runner import BatchNegotiationRequest, stream_batch, shutdown_batch_pool
+from src.api.state_backend import ConnectionManager, create_state_backend, SESSION_ID_PATTERN
+from src.api.fanout import SpectatorHub
+from src.api.replay import ReplayStream, open_replay_source
+from src.api.offload import run_io, offload_stats, shutdown_offload
+from src.utils import telemetry
+from src.api.negotiation_session import NegotiationSession, resolve_pacing, DEFAULT_PACING
 from fastapi import Request
 from fastapi.responses import JSONResponse
 import logging
 import time
-import glob
 from datetime import datetime
-import numpy as np
-import re
 from starlette.middleware.base import BaseHTTPMiddleware
-from typing import Union, List
+from typing import Optional
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -66,6 +74,23 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
 
 app.add_middleware(SecurityHeadersMiddleware)
 
+# Request latency by route template (not raw path, to keep label cardinality bounded)
+class MetricsMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        started = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            route = request.scope.get("route")
+            telemetry.HTTP_REQUEST_SECONDS.labels(
+                request.method, getattr(route, "path", "unmatched"), str(status)
+            ).observe(time.perf_counter() - started)
+
+app.add_middleware(MetricsMiddleware)
+
 # Enable CORS with restrictions
 ALLOWED_ORIGINS = os.getenv("ALLOWED_ORIGINS", "http://localhost:8000,http://localhost:3000,http://127.0.0.1:8000").split(",")
 app.add_middleware(
@@ -76,32 +101,57 @@ app.add_middleware(
     allow_headers=["Content-Type", "Authorization"],
 )
 
-class ConnectionManager:
-    def __init__(self, max_connections: int = 100):
-        self.active_connections: list[WebSocket] = []
-        self.max_connections = max_connections
-
-    async def connect(self, websocket: WebSocket):
-        if len(self.active_connections) >= self.max_connections:
-            await websocket.close(code=1008, reason="Server at capacity")
-            security_logger.warning(f"Connection rejected: max capacity ({self.max_connections}) reached")
-            return False
-        await websocket.accept()
-        self.active_connections.append(websocket)
-        return True
-
-    def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
-
-    async def broadcast(self, message: dict):
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.warning(f"Failed to broadcast to connection: {e}")
-
-manager = ConnectionManager()
+# Shared state (session ids, global connection count, broadcast) for multi-worker deployments
+state_backend = create_state_backend()
+manager = ConnectionManager(state_backend, max_connections=int(os.getenv("EQX_MAX_CONNECTIONS", "100")))
+spectators = SpectatorHub(state_backend)
+
+# LLM response cache: memory LRU, plus a SQLite tier when EQX_LLM_CACHE_PATH is set
+llm_cache = None
+if os.getenv("EQX_LLM_CACHE", "1") != "0":
+    llm_cache = ResponseCache(
+        max_entries=int(os.getenv("EQX_LLM_CACHE_SIZE", "10000")),
+        ttl=float(os.getenv("EQX_LLM_CACHE_TTL", "3600")),
+        disk_path=os.getenv("EQX_LLM_CACHE_PATH") or None,
+        price_bucket=float(os.getenv("EQX_LLM_CACHE_PRICE_BUCKET", "25")),
+    )
+
+# One pooled LLM client shared by every agent on this worker
+llm_client = LLMClient(
+    cache=llm_cache,
+    base_url=os.getenv("OLLAMA_URL", "http://localhost:11434"),
+    mock_mode=os.getenv("EQX_MOCK_LLM", "1") != "0",
+    max_connections=int(os.getenv("EQX_LLM_MAX_CONNECTIONS", "100")),
+    max_connections_per_host=int(os.getenv("EQX_LLM_MAX_CONNECTIONS_PER_HOST", "32")),
+    connect_timeout=float(os.getenv("EQX_LLM_CONNECT_TIMEOUT", "5")),
+    read_timeout=float(os.getenv("EQX_LLM_READ_TIMEOUT", "60")),
+)
+# Bounds concurrent generations on the model server; live sessions are served before batch work
+llm_scheduler = LLMScheduler(llm_client, max_in_flight=int(os.getenv("EQX_LLM_MAX_IN_FLIGHT", "4")))
+
+lag_monitor = telemetry.EventLoopLagMonitor(telemetry.EVENT_LOOP_LAG_SECONDS, telemetry.EVENT_LOOP_LAG_LAST)
+
+def _offload_gauge(pool, state):
+    return lambda: offload_stats().get(pool, {}).get(state, 0)
+
+for _pool in ("io", "cpu"):
+    for _state in ("waiting", "queued", "running"):
+        telemetry.OFFLOAD_QUEUE.labels(_pool, _state).set_function(_offload_gauge(_pool, _state))
+
+telemetry.LLM_SCHEDULER_DEPTH.labels("in_flight").set_function(lambda: llm_scheduler.stats()["in_flight"])
+for _priority in ("interactive", "batch"):
+    telemetry.LLM_SCHEDULER_DEPTH.labels(f"queued_{_priority}").set_function(
+        lambda p=_priority: llm_scheduler.stats()["queued"][p])
+
+def session_opened(kind):
+    telemetry.SESSIONS_STARTED.labels(kind).inc()
+    telemetry.ACTIVE_SESSIONS.labels(kind).inc()
+
+def session_closed(kind):
+    telemetry.ACTIVE_SESSIONS.labels(kind).dec()
+
+def live_session_key(session_id):
+    return f"live:{session_id}"
 
 # Mount static files (CSS, JS)
 frontend_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "frontend")
@@ -112,34 +162,90 @@ async def root():
     return FileResponse(os.path.join(frontend_path, "index.html"))
 
 # --- Session Management ---
-SESSIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data", "sessions")
-os.makedirs(SESSIONS_DIR, exist_ok=True)
+SESSIONS_DIR = os.getenv(
+    "EQX_SESSIONS_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data", "sessions")
+)
+
+# Session catalog: one summary row per saved session, so listing never opens session files.
+# Opened on first use, so importing the app never touches SESSIONS_DIR.
+session_index = None
+
+def get_session_index():
+    global session_index
+    if session_index is None:
+        os.makedirs(SESSIONS_DIR, exist_ok=True)
+        session_index = SessionIndex(os.path.join(SESSIONS_DIR, "index.sqlite3"))
+    return session_index
+
+@app.on_event("startup")
+async def start_worker_services():
+    await manager.start()
+    lag_monitor.start()
+    added = await run_io(get_session_index().rebuild, SESSIONS_DIR)
+    if added:
+        logger.info(f"Indexed {added} existing session files")
+
+@app.on_event("shutdown")
+async def stop_worker_pools():
+    await lag_monitor.stop()
+    await llm_scheduler.aclose()
+    await llm_client.aclose()
+    if llm_cache is not None:
+        llm_cache.close()
+    await spectators.close()
+    await manager.stop()
+    await state_backend.close()
+    shutdown_batch_pool()
+    shutdown_offload()
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus text exposition of this worker's metrics."""
+    return PlainTextResponse(telemetry.REGISTRY.render(), media_type=telemetry.CONTENT_TYPE)
+
+@app.get("/api/llm/stats")
+async def get_llm_stats():
+    """LLM scheduler queue/wait statistics and response cache counters."""
+    return {
+        "scheduler": llm_scheduler.stats(),
+        "cache": llm_cache.stats() if llm_cache is not None else None,
+    }
+
+@app.get("/api/offload")
+async def get_offload_stats():
+    """Queue depth and timing of the I/O and CPU offload pools."""
+    return offload_stats()
+
+@app.post("/api/negotiations/batch")
+async def run_negotiation_batch(request: BatchNegotiationRequest):
+    """Run `count` headless negotiations on the process pool; NDJSON episodes, then a summary line."""
+    return StreamingResponse(stream_batch(request), media_type="application/x-ndjson")
 
 @app.get("/api/sessions")
-async def list_sessions():
-    files = glob.glob(os.path.join(SESSIONS_DIR, "*.json"))
-    sessions = []
-    for f in files:
-        try:
-            with open(f, "r") as jf:
-                data = json.load(jf)
-                sessions.append({
-                    "id": data.get("id"),
-                    "timestamp": data.get("timestamp"),
-                    "rounds": len(data.get("turns", [])),
-                    "result": "Deal" if data.get("deal_price") else "No Deal"
-                })
-        except (json.JSONDecodeError, KeyError, IOError) as e:
-            logger.warning(f"Skipping malformed session file: {f} - {e}")
-            continue
-    # Sort by timestamp descending
-    sessions.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
-    return sessions
+async def list_sessions(
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    result: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    num_items: Optional[int] = None,
+):
+    limit = max(1, min(limit, 500))
+    try:
+        sessions, next_cursor = await run_io(
+            get_session_index().query,
+            limit=limit, cursor=cursor, result=result,
+            date_from=date_from, date_to=date_to, num_items=num_items
+        )
+    except ValueError:
+        return JSONResponse(status_code=400, content={"message": "Invalid cursor"})
+    return {"sessions": sessions, "next_cursor": next_cursor}
 
 @app.get("/api/sessions/{session_id}")
-async def get_session(session_id: str, request: Request):
+async def get_session(session_id: str, request: Request, start: int = 0, stop: Optional[int] = None):
     # Security: Validate session_id format to prevent path traversal
-    if not re.match(r'^session_\d+$', session_id):
+    if not SESSION_ID_PATTERN.match(session_id):
         security_logger.warning(f"Invalid session ID attempted from {request.client.host}: {session_id}")
         return JSONResponse(status_code=400, content={"message": "Invalid session ID format"})
     
@@ -150,11 +256,12 @@ async def get_session(session_id: str, request: Request):
         security_logger.error(f"Path traversal attempt from {request.client.host}: {session_id}")
         return JSONResponse(status_code=403, content={"message": "Access denied"})
     
-    if os.path.exists(file_path):
-        security_logger.info(f"Session {session_id} accessed from {request.client.host}")
-        with open(file_path, "r") as f:
-            return json.load(f)
-    return JSONResponse(status_code=404, content={"message": "Session not found"})
+    # Archive first, then the live JSONL log, then legacy JSON; start/stop select a turn range
+    session = await run_io(load_session, SESSIONS_DIR, session_id, max(start, 0), stop)
+    if session is None:
+        return JSONResponse(status_code=404, content={"message": "Session not found"})
+    security_logger.info(f"Session {session_id} accessed from {request.client.host}")
+    return session
 
 @app.websocket("/ws/negotiate")
 async def websocket_negotiate(websocket: WebSocket):
@@ -163,117 +270,62 @@ async def websocket_negotiate(websocket: WebSocket):
     if not connected:
         return  # Connection rejected due to capacity
     
+    recorder = None
+    session = None
+    sender = manager.sender(websocket)
+    session_opened("negotiate")
     try:
+        try:
+            pacing = resolve_pacing(websocket.query_params.get("pacing"))
+        except ValueError:
+            pacing = DEFAULT_PACING
+
         # 1. Initialize logic
         num_items = 3
         env = NegotiatorEnv(config={"max_rounds": 10, "num_items": num_items})
         obs, info = env.reset()
         
-        supplier = HybridAgent(role="Supplier", persona="aggressive", mock_llm=True)
-        retailer = HybridAgent(role="Retailer", persona="cooperative", mock_llm=True)
+        supplier = HybridAgent(role="Supplier", persona="aggressive", llm_client=llm_client, scheduler=llm_scheduler)
+        retailer = HybridAgent(role="Retailer", persona="cooperative", llm_client=llm_client, scheduler=llm_scheduler)
         # Inject num_items for demo purpose
         supplier.num_items = num_items
         retailer.num_items = num_items
         
         agents = {"supplier": supplier, "retailer": retailer}
         
-        manual_mode = False
-        
-        session_id = f"session_{int(time.time())}"
-        session_data = {
-            "id": session_id,
-            "timestamp": datetime.now().isoformat(),
-            "config": {"num_items": num_items, "max_rounds": env.max_rounds},
-            "initial_state": {
-                "val_s": env.val_s.tolist(),
-                "val_r": env.val_r.tolist()
-            },
-            "turns": []
-        }
+        session_id = await state_backend.new_session_id()
+        # Turns are streamed to an append-only log instead of being held in memory
+        recorder = SessionRecorder(
+            os.path.join(SESSIONS_DIR, f"{session_id}.jsonl"),
+            {
+                "id": session_id,
+                "timestamp": datetime.now().isoformat(),
+                "config": {"num_items": num_items, "max_rounds": env.max_rounds},
+                "initial_state": {
+                    "val_s": env.val_s.tolist(),
+                    "val_r": env.val_r.tolist()
+                },
+            }
+        )
+        await recorder.start()
 
-        await websocket.send_json({
+        # Frames go through the connection's send queue and are published for spectators
+        session = NegotiationSession(websocket, env, agents, recorder, pacing=pacing,
+                                     sender=sender, hub=spectators, session_id=session_id)
+        init_payload = {
             "type": "init",
+            "session_id": session_id,
             "val_s": env.val_s.tolist(),
             "val_r": env.val_r.tolist(),
             "max_rounds": env.max_rounds,
             "num_items": num_items
-        })
-
-        # 2. Negotiation Loop
-        done = False
-        while not done:
-            # Check for control messages from client
-            try:
-                control_msg = await asyncio.wait_for(websocket.receive_json(), timeout=0.1)
-                if control_msg.get("type") == "toggle_manual":
-                    manual_mode = control_msg.get("value", False)
-                    await websocket.send_json({"type": "log", "message": f"Manual Mode: {'ON' if manual_mode else 'OFF'}"})
-                elif control_msg.get("type") == "human_action" and manual_mode:
-                    pass
-            except asyncio.TimeoutError:
-                pass
-
-            proposer_id = env.current_proposer
-            agent = agents[proposer_id]
-            
-            action_type = None
-            prices = None
-            message = ""
-
-            if manual_mode:
-                # Wait for human input
-                await websocket.send_json({"type": "wait_for_human", "agent": proposer_id})
-                human_data = await websocket.receive_json()
-                if human_data.get("type") == "human_action":
-                    action_type = int(human_data["action"])
-                    # Support both single float and list for backward compatibility with current UI
-                    raw_price = human_data.get("price", 0)
-                    if isinstance(raw_price, (int, float)):
-                        prices = np.array([raw_price] * num_items, dtype=np.float32)
-                    else:
-                        prices = np.array(raw_price, dtype=np.float32)
-                    
-                    message = human_data.get("message", "")
-                    action_data = {"type": action_type, "price": prices}
-                else:
-                    action_data = agent.get_strategic_action(obs[proposer_id])
-                    action_type = action_data["type"]
-                    prices = action_data["price"]
-            else:
-                # RL Strategy
-                action_data = agent.get_strategic_action(obs[proposer_id])
-                action_type = action_data["type"]
-                prices = action_data["price"]
-                # LLM Message
-                if action_type == 1:
-                    message = await agent.speak(prices)
-            
-            # Step Env
-            actions = {proposer_id: action_data}
-            obs, rewards, terminations, truncations, infos = env.step(actions)
-            
-            # Use average price for the main chart, or first price?
-            # Let's send the whole list to the frontend
-            payload = {
-                "type": "turn",
-                "round": env.current_round,
-                "agent": proposer_id,
-                "action": ["ACCEPT", "COUNTER", "QUIT"][action_type],
-                "price": prices.tolist() if isinstance(prices, np.ndarray) else prices,
-                "message": message,
-                "surplus": rewards
-            }
-            session_data["turns"].append(payload)
-            await websocket.send_json(payload)
-            
-            # Switch turn history for agents
-            other_id = "retailer" if proposer_id == "supplier" else "supplier"
-            agents[other_id].update_history(prices)
-            
-            done = any(terminations.values()) or any(truncations.values())
-            
-            if not manual_mode:
-                await asyncio.sleep(1.5)
+        }
+        # Spectators joining mid-session start from the init frame
+        await state_backend.set_value(live_session_key(session_id), init_payload, ttl=3600)
+        await session.send(init_payload)
+
+        # 2. Negotiation Loop: a reader task feeds controls, the driver reacts to events
+        rewards = await session.run(obs)
 
         # 3. Final Result
         final_payload = {
@@ -281,24 +333,100 @@ async def websocket_negotiate(websocket: WebSocket):
             "deal_price": env.deal_prices.tolist() if env.deal_prices is not None else None,
             "final_rewards": rewards
         }
-        session_data.update(final_payload)
         
         # Save Session
-        with open(os.path.join(SESSIONS_DIR, f"{session_id}.json"), "w") as f:
-            json.dump(session_data, f, indent=4)
+        save_started = time.perf_counter()
+        await recorder.close(final_payload)
+        await run_io(get_session_index().add, recorder.summary())
+        # Compact the finished log into a columnar archive for replay
+        try:
+            await run_io(convert_session_file, recorder.path, True)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to archive {session_id}: {e}")
+        telemetry.SESSION_SAVE_SECONDS.observe(time.perf_counter() - save_started)
             
-        await websocket.send_json(final_payload)
+        await session.send(final_payload)
 
     except WebSocketDisconnect:
         logger.info("Client disconnected normally.")
-        manager.disconnect(websocket)
     except Exception as e:
         logger.error(f"Error in WebSocket session: {e}", exc_info=True)
-        try:
-            await websocket.send_json({"type": "error", "message": "Session crashed", "detail": str(e)})
-        except:
-            pass
-        manager.disconnect(websocket)
+        sender.send_json({"type": "error", "message": "Session crashed", "detail": str(e)})
+    finally:
+        session_closed("negotiate")
+        await manager.disconnect(websocket)
+        if session is not None:
+            await state_backend.delete_value(live_session_key(session.session_id))
+        # Disconnected or crashed sessions still get their end record and catalog entry
+        if recorder is not None and not recorder.closed:
+            await recorder.close({"deal_price": None, "final_rewards": None}, status="disconnected")
+            await run_io(get_session_index().add, recorder.summary())
+            if session is not None:
+                await spectators.publish_if_watched(session.session_id, {"type": "end", "deal_price": None,
+                                                                         "final_rewards": None, "status": "disconnected"})
+        if session is not None:
+            spectators.forget(session.session_id)
+
+@app.websocket("/ws/replay/{session_id}")
+async def websocket_replay(websocket: WebSocket, session_id: str):
+    """
+    Stream a stored session turn by turn. Query: speed (1.0 = 0.8s per turn),
+    start (turn index), overview (LTTB points for the price chart overview).
+    """
+    if not SESSION_ID_PATTERN.match(session_id):
+        await websocket.close(code=1008, reason="Invalid session ID format")
+        return
+    connected = await manager.connect(websocket)
+    if not connected:
+        return
+    sender = manager.sender(websocket)
+    params = websocket.query_params
+    session_opened("replay")
+    try:
+        source = await run_io(open_replay_source, SESSIONS_DIR, session_id)
+        if source is None:
+            sender.send_json({"type": "error", "message": "Session not found"})
+            return
+        stream = ReplayStream(websocket, sender, source, speed=params.get("speed", 1.0),
+                              start_index=int(params.get("start", 0) or 0))
+        overview_points = int(params.get("overview", 0) or 0)
+        await stream.run(overview_points=min(max(overview_points, 0), 5000))
+    except WebSocketDisconnect:
+        pass
+    except (ValueError, OSError) as e:
+        logger.warning(f"Replay of {session_id} failed: {e}")
+        sender.send_json({"type": "error", "message": "Replay failed"})
+    finally:
+        session_closed("replay")
+        await manager.disconnect(websocket)
+
+@app.websocket("/ws/spectate/{session_id}")
+async def websocket_spectate(websocket: WebSocket, session_id: str):
+    """Watch a live session from any worker; slow spectators skip stale turn frames."""
+    if not SESSION_ID_PATTERN.match(session_id):
+        await websocket.close(code=1008, reason="Invalid session ID format")
+        return
+    connected = await manager.connect(websocket)
+    if not connected:
+        return
+    sender = manager.sender(websocket)
+    session_opened("spectate")
+    try:
+        init_payload = await state_backend.get_value(live_session_key(session_id))
+        if init_payload is None:
+            sender.send_json({"type": "error", "message": "Session is not live"})
+            return
+        sender.send_json({**init_payload, "spectator": True})
+        spectators.join(session_id, sender)
+        # Spectators only listen; wait for the client to leave
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        spectators.leave(session_id, sender)
+        session_closed("spectate")
+        await manager.disconnect(websocket)
 
 if __name__ == "__main__":
     import uvicorn
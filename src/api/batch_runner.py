@@ -0,0 +1,246 @@
+import asyncio
+import json
+import multiprocessing
+import os
+import secrets
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+import numpy as np
+from pydantic import AliasChoices, BaseModel, Field, field_validator
+
+from src.agents.hybrid_agent import HybridAgent
+from src.environment.negotiator_env import (
+    NegotiatorEnv,
+    COUNTER,
+    RESULT_NONE, RESULT_DEAL, RESULT_QUIT, RESULT_INVALID_ACCEPT, RESULT_TIMEOUT,
+)
+from src.llm.llm_client import LLMClient
+from src.llm.prompts import NEGOTIATION_PERSONAS
+
+MAX_BATCH_COUNT = 100000
+
+RESULT_NAMES = {
+    RESULT_NONE: "none",
+    RESULT_DEAL: "deal",
+    RESULT_QUIT: "quit",
+    RESULT_INVALID_ACCEPT: "invalid_accept",
+    RESULT_TIMEOUT: "timeout",
+}
+
+class BatchNegotiationRequest(BaseModel):
+    """Config for POST /api/negotiations/batch."""
+    num_agents: int = Field(2, ge=2, le=10)
+    num_items: int = Field(1, ge=1, le=64)
+    max_rounds: int = Field(20, ge=1, le=1000)
+    personas: Optional[List[str]] = None  # one per agent, cycled if shorter; default neutral
+    count: int = Field(100, ge=1, le=MAX_BATCH_COUNT)
+    seed: Optional[int] = Field(None, ge=0)
+    # Batch runs never call a model: messages are the mock client's template text.
+    # "include_messages" is the old, still accepted name.
+    include_mock_messages: bool = Field(
+        False,
+        validation_alias=AliasChoices("include_mock_messages", "include_messages"),
+        description="Attach mock (template, not model-generated) LLM messages to each episode record",
+    )
+    chunk_size: int = Field(250, ge=1, le=10000)
+
+    @field_validator("personas")
+    @classmethod
+    def known_personas(cls, personas):
+        if personas is not None:
+            unknown = [p for p in personas if p not in NEGOTIATION_PERSONAS]
+            if unknown or not personas:
+                raise ValueError(f"Unknown personas: {unknown}; choose from {list(NEGOTIATION_PERSONAS)}")
+        return personas
+
+def episode_seed(base_seed, index):
+    """Independent, reproducible 32-bit seed for episode `index` of a batch."""
+    return int(np.random.SeedSequence([base_seed, index]).generate_state(1)[0])
+
+def _play_episode(env, agents, seed, include_messages, loop):
+    obs, _ = env.reset(seed=seed)
+    # HybridAgent draws its actions from the global NumPy RNG
+    np.random.seed(seed)
+    for agent in agents.values():
+        agent.history = []
+
+    messages = []
+    rewards = {}
+    done = False
+    while not done:
+        proposer_id = env.current_proposer
+        agent = agents[proposer_id]
+        action_data = agent.get_strategic_action(obs[proposer_id])
+        if action_data["type"] == COUNTER:
+            if include_messages:
+                message = loop.run_until_complete(agent.speak(action_data["price"]))
+                messages.append({"round": env.current_round + 1, "agent": proposer_id, "message": message})
+            else:
+                agent.record_offer(action_data["price"])
+        obs, rewards, terminations, truncations, _ = env.step({proposer_id: action_data})
+        for other_id, other in agents.items():
+            if other_id != proposer_id:
+                other.update_history(action_data["price"])
+        done = any(terminations.values()) or any(truncations.values())
+
+    record = {
+        "type": "episode",
+        "seed": seed,
+        "result": RESULT_NAMES[env.last_result],
+        "rounds": env.current_round,
+        "deal_prices": env.deal_prices.tolist() if env.last_result == RESULT_DEAL else None,
+        "rewards": {a: float(r) for a, r in rewards.items()},
+        "valuations": {a: env.valuations[a].tolist() for a in env.possible_agents},
+    }
+    if include_messages:
+        record["messages"] = messages
+    return record
+
+def run_chunk(config, base_seed, start, stop):
+    """
+    Play episodes [start, stop) of a batch in a worker process.
+    Returns (ndjson, partial) where ndjson holds one line per episode and partial
+    is a BatchStats.merge()-able dict, so the server does no per-episode work.
+    """
+    request = BatchNegotiationRequest(**config)
+    env = NegotiatorEnv(config={
+        "num_agents": request.num_agents,
+        "num_items": request.num_items,
+        "max_rounds": request.max_rounds,
+    })
+    personas = request.personas or ["neutral"]
+    # Messages are mock text generated in this worker process: batch runs never
+    # reach the model server or the API process's LLM scheduler
+    client = LLMClient(mock_mode=True)
+    agents = {}
+    for i, name in enumerate(env.possible_agents):
+        agent = HybridAgent(role=name, persona=personas[i % len(personas)], llm_client=client)
+        agent.num_items = request.num_items
+        agents[name] = agent
+
+    loop = asyncio.new_event_loop() if request.include_mock_messages else None
+    stats = BatchStats(env.possible_agents, request.num_items)
+    lines = []
+    try:
+        for index in range(start, stop):
+            record = _play_episode(env, agents, episode_seed(base_seed, index), request.include_mock_messages, loop)
+            record["index"] = index
+            stats.add(record)
+            lines.append(json.dumps(record))
+    finally:
+        if loop is not None:
+            loop.run_until_complete(client.aclose())
+            loop.close()
+    return "\n".join(lines) + "\n", stats.partial()
+
+class BatchStats:
+    """Running aggregates over episode records (outcome counts, rounds, rewards, deal prices)."""
+    def __init__(self, agents, num_items):
+        self.agents = list(agents)
+        self.count = 0
+        self.results = {name: 0 for name in RESULT_NAMES.values() if name != "none"}
+        self.rounds_sum = 0
+        self.reward_sum = np.zeros(len(self.agents))
+        self.deal_price_sum = np.zeros(num_items)
+
+    def add(self, record):
+        self.count += 1
+        self.results[record["result"]] = self.results.get(record["result"], 0) + 1
+        self.rounds_sum += record["rounds"]
+        self.reward_sum += [record["rewards"].get(a, 0.0) for a in self.agents]
+        if record["deal_prices"] is not None:
+            self.deal_price_sum += record["deal_prices"]
+
+    def partial(self):
+        return {
+            "count": self.count,
+            "results": dict(self.results),
+            "rounds_sum": self.rounds_sum,
+            "reward_sum": self.reward_sum.tolist(),
+            "deal_price_sum": self.deal_price_sum.tolist(),
+        }
+
+    def merge(self, partial):
+        self.count += partial["count"]
+        for name, n in partial["results"].items():
+            self.results[name] = self.results.get(name, 0) + n
+        self.rounds_sum += partial["rounds_sum"]
+        self.reward_sum += partial["reward_sum"]
+        self.deal_price_sum += partial["deal_price_sum"]
+
+    def summary(self):
+        count = max(self.count, 1)
+        deals = self.results.get("deal", 0)
+        return {
+            "type": "summary",
+            "count": self.count,
+            "results": dict(self.results),
+            "deal_rate": deals / count,
+            "mean_rounds": self.rounds_sum / count,
+            "mean_rewards": dict(zip(self.agents, (self.reward_sum / count).tolist())),
+            "mean_deal_prices": (self.deal_price_sum / deals).tolist() if deals else None,
+        }
+
+_pool = None
+_pool_workers = 0
+
+def get_batch_pool():
+    """
+    Process pool shared by all batch requests (size from EQX_BATCH_WORKERS, default
+    CPU count). Workers are spawned, not forked: the API process runs an event loop
+    and threads whose state a forked child would inherit half-copied.
+    """
+    global _pool, _pool_workers
+    if _pool is None:
+        _pool_workers = int(os.getenv("EQX_BATCH_WORKERS", "0")) or os.cpu_count() or 1
+        _pool = ProcessPoolExecutor(max_workers=_pool_workers, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+def shutdown_batch_pool():
+    global _pool, _pool_workers
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+        _pool_workers = 0
+
+async def stream_batch(request, executor=None, workers=1):
+    """
+    Async NDJSON generator for a batch: episode lines in index order, then one
+    summary line. Chunks run on the process pool with a bounded number in flight
+    (twice the pool's workers), so a 100k sweep never materializes all results at
+    once. `workers` sizes a caller-supplied executor.
+    """
+    if executor is None:
+        executor, workers = get_batch_pool(), _pool_workers
+    loop = asyncio.get_running_loop()
+    base_seed = request.seed if request.seed is not None else secrets.randbits(32)
+    config = request.model_dump()
+    env_agents = NegotiatorEnv(config={"num_agents": request.num_agents}).possible_agents
+    stats = BatchStats(env_agents, request.num_items)
+    max_in_flight = 2 * max(workers, 1)
+
+    bounds = [(s, min(s + request.chunk_size, request.count)) for s in range(0, request.count, request.chunk_size)]
+    pending = []
+    started = time.perf_counter()
+    try:
+        for start, stop in bounds:
+            pending.append(loop.run_in_executor(executor, run_chunk, config, base_seed, start, stop))
+            if len(pending) >= max_in_flight:
+                lines, partial = await pending.pop(0)
+                stats.merge(partial)
+                yield lines
+        while pending:
+            lines, partial = await pending.pop(0)
+            stats.merge(partial)
+            yield lines
+    finally:
+        # Client went away: drop chunks that have not started yet
+        for future in pending:
+            future.cancel()
+
+    elapsed = time.perf_counter() - started
+    summary = stats.summary()
+    summary.update({"seed": base_seed, "elapsed_s": elapsed, "episodes_per_s": stats.count / max(elapsed, 1e-9)})
+    yield json.dumps(summary) + "\n"
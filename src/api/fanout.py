@@ -0,0 +1,194 @@
+import asyncio
+import collections
+import json
+import logging
+import time
+
+logger = logging.getLogger("EquilibriumX.Fanout")
+
+# Message types a slow consumer may miss: newer turns supersede older ones
+DROPPABLE_TYPES = frozenset({"turn", "log", "message_delta"})
+
+class ConnectionSender:
+    """
+    Bounded outgoing queue for one websocket, drained by its own writer task.
+
+    send() never awaits the network, so a slow client only delays itself. Frames
+    are pre-serialized text, so a broadcast encodes each message once. When the
+    queue is full the oldest droppable frame (stale turn updates) is discarded to
+    make room; other frames (init, end, errors) are always delivered.
+    """
+    def __init__(self, websocket, max_queue=64):
+        self.websocket = websocket
+        self.max_queue = max_queue
+        self._frames = collections.deque()
+        self._ready = asyncio.Event()
+        self._space = asyncio.Event()
+        self._closing = False
+        self._writer_task = None
+        self.sent = 0
+        self.dropped = 0
+        self.failed = False
+
+    def start(self):
+        if self._writer_task is None:
+            self._writer_task = asyncio.create_task(self._writer())
+
+    def send(self, text, droppable=False):
+        """Queue one serialized frame; returns False if it was dropped."""
+        if self._closing or self.failed:
+            return False
+        if len(self._frames) >= self.max_queue:
+            for i, (_, can_drop) in enumerate(self._frames):
+                if can_drop:
+                    del self._frames[i]
+                    self.dropped += 1
+                    break
+            else:
+                if droppable:
+                    self.dropped += 1
+                    return False
+        self._frames.append((text, droppable))
+        self._ready.set()
+        return True
+
+    def send_json(self, message):
+        return self.send(json.dumps(message), droppable=message.get("type") in DROPPABLE_TYPES)
+
+    async def wait_for_space(self):
+        """Backpressure for producers that must not drop: wait until the queue has room."""
+        while len(self._frames) >= self.max_queue and not self.failed and not self._closing:
+            self._space.clear()
+            await self._space.wait()
+
+    @property
+    def queued(self):
+        return len(self._frames)
+
+    async def _writer(self):
+        while True:
+            if not self._frames:
+                if self._closing:
+                    return
+                self._ready.clear()
+                await self._ready.wait()
+                continue
+            text, _ = self._frames.popleft()
+            self._space.set()
+            try:
+                await self.websocket.send_text(text)
+                self.sent += 1
+            except Exception as e:
+                logger.debug(f"Send failed, dropping connection output: {e}")
+                self.failed = True
+                self._frames.clear()
+                self._space.set()
+                return
+
+    async def close(self, timeout=5.0):
+        """Flush what is queued (up to `timeout` seconds) and stop the writer."""
+        self._closing = True
+        self._ready.set()
+        if self._writer_task is not None:
+            try:
+                await asyncio.wait_for(self._writer_task, timeout)
+            except asyncio.TimeoutError:
+                self._writer_task.cancel()
+
+def session_channel(session_id):
+    return f"session:{session_id}"
+
+def watched_key(session_id):
+    return f"watched:{session_id}"
+
+# A worker with spectators of a session refreshes its watched key every WATCH_REFRESH
+# seconds; publishers re-check the key at most every WATCH_CHECK_INTERVAL seconds
+WATCH_TTL = 15
+WATCH_REFRESH = 5.0
+WATCH_CHECK_INTERVAL = 1.0
+
+class SpectatorHub:
+    """
+    Per-worker fan-out of live sessions to spectator connections.
+
+    The session driver publishes each payload once on the state backend channel
+    for its session. Each worker keeps one subscription per watched session, encodes
+    every message once and enqueues the same frame on all local spectators'
+    senders, so viewers on any worker see any session.
+
+    Publishing is skipped for sessions nobody watches: workers with spectators keep
+    a short-lived "watched" key alive on the backend, and publishers check it at most
+    once per WATCH_CHECK_INTERVAL (so a new spectator sees frames within a second).
+    """
+    def __init__(self, backend):
+        self.backend = backend
+        self._spectators = {}
+        self._tasks = {}
+        self._watched = {}
+
+    async def is_watched(self, session_id):
+        """Whether any worker has spectators for session_id (cached for WATCH_CHECK_INTERVAL)."""
+        if self._spectators.get(session_id):
+            return True
+        now = time.monotonic()
+        cached = self._watched.get(session_id)
+        if cached is None or now - cached[0] >= WATCH_CHECK_INTERVAL:
+            cached = (now, await self.backend.get_value(watched_key(session_id)) is not None)
+            self._watched[session_id] = cached
+        return cached[1]
+
+    def forget(self, session_id):
+        """Drop the cached watched flag of a finished session."""
+        self._watched.pop(session_id, None)
+
+    async def publish(self, session_id, message):
+        await self.backend.publish(session_channel(session_id), message)
+
+    async def publish_if_watched(self, session_id, message):
+        if await self.is_watched(session_id):
+            await self.publish(session_id, message)
+
+    def spectator_count(self, session_id):
+        return len(self._spectators.get(session_id, ()))
+
+    def join(self, session_id, sender):
+        self._spectators.setdefault(session_id, set()).add(sender)
+        if session_id not in self._tasks:
+            self._tasks[session_id] = asyncio.create_task(self._relay(session_id))
+
+    def leave(self, session_id, sender):
+        spectators = self._spectators.get(session_id)
+        if spectators is None:
+            return
+        spectators.discard(sender)
+        if not spectators:
+            del self._spectators[session_id]
+            task = self._tasks.pop(session_id, None)
+            if task is not None:
+                task.cancel()
+
+    async def _keep_watched(self, session_id):
+        while True:
+            await self.backend.set_value(watched_key(session_id), 1, ttl=WATCH_TTL)
+            await asyncio.sleep(WATCH_REFRESH)
+
+    async def _relay(self, session_id):
+        keepalive = asyncio.create_task(self._keep_watched(session_id))
+        try:
+            async for message in self.backend.subscribe(session_channel(session_id)):
+                text = json.dumps(message)
+                droppable = message.get("type") in DROPPABLE_TYPES
+                for sender in list(self._spectators.get(session_id, ())):
+                    sender.send(text, droppable)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Spectator relay for {session_id} stopped: {e}")
+        finally:
+            keepalive.cancel()
+
+    async def close(self):
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+        self._spectators.clear()
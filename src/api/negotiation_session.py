@@ -0,0 +1,243 @@
+import asyncio
+import json
+import logging
+import time
+
+import numpy as np
+from fastapi import WebSocketDisconnect
+
+from src.api.offload import run_cpu
+from src.api.turn_pipeline import TurnPipeline
+from src.utils.telemetry import TURN_SECONDS
+
+_TURN_TIMERS = {"auto": TURN_SECONDS.labels("auto"), "human": TURN_SECONDS.labels("human")}
+
+logger = logging.getLogger("EquilibriumX.Session")
+
+ACTION_NAMES = ["ACCEPT", "COUNTER", "QUIT"]
+
+# Artificial delay between automated turns, in seconds
+PACING_PRESETS = {"turbo": 0.0, "fast": 0.3, "normal": 1.5, "slow": 3.0}
+DEFAULT_PACING = "normal"
+
+def resolve_pacing(value):
+    """Preset name or number of seconds -> delay in seconds (clamped to [0, 10])."""
+    if value is None:
+        return PACING_PRESETS[DEFAULT_PACING]
+    if isinstance(value, str) and value in PACING_PRESETS:
+        return PACING_PRESETS[value]
+    try:
+        return min(max(float(value), 0.0), 10.0)
+    except (TypeError, ValueError):
+        raise ValueError(f"Unknown pacing: {value}")
+
+class NegotiationSession:
+    """
+    Event-driven driver for one websocket negotiation.
+
+    A reader task owns websocket.receive_json() and feeds every client message into
+    a control queue, so the driver never polls the socket: it plays automated turns
+    back to back and only waits on the queue, either for the pacing delay between
+    turns (interruptible by controls) or for a human action in manual mode. With
+    "turbo" pacing there is no artificial delay at all.
+
+    Control messages: toggle_manual {value}, set_pacing {value: preset or seconds},
+    human_action {action, price, message}.
+
+    With a ConnectionSender, frames to the player are queued instead of awaited;
+    with a SpectatorHub, every frame is also published for spectators of session_id.
+
+    Turns are pipelined (TurnPipeline): once an agent has decided, its LLM message
+    generates in the background while the env steps and the next agent decides, and
+    turn frames are still sent in order. Up to `pipeline_depth` turns may be waiting
+    on their messages; the pacing delay runs between decisions. Manual mode flushes
+    the pipeline before asking the human, so they always see the latest turn.
+
+    With stream_messages, agent messages are forwarded while they are generated as
+    {"type": "message_delta", "round", "agent", "delta"} frames ahead of the turn
+    frame; the turn frame (and the recording) still carries the full message.
+    """
+    def __init__(self, websocket, env, agents, recorder=None, pacing=DEFAULT_PACING,
+                 sender=None, hub=None, session_id=None, stream_messages=True, pipeline_depth=2):
+        self.websocket = websocket
+        self.sender = sender
+        self.hub = hub
+        self.session_id = session_id
+        self.env = env
+        self.agents = agents
+        self.recorder = recorder
+        self.stream_messages = stream_messages
+        self.pipeline = TurnPipeline(self._emit_turn, self._emit_delta if stream_messages else None,
+                                     max_pending=pipeline_depth)
+        self.delay = resolve_pacing(pacing)
+        self.manual_mode = False
+        self.controls = asyncio.Queue()
+        self._reader_task = None
+        self.rewards = {}
+
+    async def _reader(self):
+        try:
+            while True:
+                self.controls.put_nowait(await self.websocket.receive_json())
+        except WebSocketDisconnect:
+            pass
+        except Exception as e:
+            logger.warning(f"Websocket reader stopped: {e}")
+        # Sentinel: the client is gone
+        self.controls.put_nowait(None)
+
+    async def send(self, payload):
+        if self.sender is not None:
+            # The player never misses frames; only spectators get stale turns dropped.
+            # Wait for room instead, so a slow client can't grow the queue without bound
+            await self.sender.wait_for_space()
+            self.sender.send(json.dumps(payload))
+        else:
+            await self.websocket.send_json(payload)
+        if self.hub is not None:
+            await self.hub.publish_if_watched(self.session_id, payload)
+
+    async def _next_control(self, timeout=None):
+        """Next control message, or None on timeout. Raises WebSocketDisconnect when the client left."""
+        if timeout is not None and timeout <= 0:
+            if self.controls.empty():
+                return None
+            msg = self.controls.get_nowait()
+        else:
+            try:
+                msg = await asyncio.wait_for(self.controls.get(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        if msg is None:
+            raise WebSocketDisconnect()
+        return msg
+
+    async def _apply_control(self, msg):
+        """Handle session-level controls; returns the message if it is a human action."""
+        kind = msg.get("type")
+        if kind == "toggle_manual":
+            self.manual_mode = bool(msg.get("value", False))
+            await self.send({"type": "log", "message": f"Manual Mode: {'ON' if self.manual_mode else 'OFF'}"})
+        elif kind == "set_pacing":
+            try:
+                self.delay = resolve_pacing(msg.get("value"))
+                await self.send({"type": "log", "message": f"Pacing: {self.delay:.2f}s"})
+            except ValueError as e:
+                await self.send({"type": "log", "message": str(e)})
+        elif kind == "human_action":
+            return msg
+        return None
+
+    async def _drain_controls(self):
+        while (msg := await self._next_control(0)) is not None:
+            await self._apply_control(msg)
+
+    async def _pace(self):
+        """Wait out the pacing delay, reacting to controls as they arrive."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.delay
+        if self.delay <= 0:
+            # Turbo: still yield so the reader and other sessions get to run
+            await asyncio.sleep(0)
+        while True:
+            msg = await self._next_control(deadline - loop.time())
+            if msg is None:
+                return
+            await self._apply_control(msg)
+            if self.manual_mode:
+                # Hand the next turn to the human right away
+                return
+
+    async def _wait_for_human(self, proposer_id):
+        """Block on the control queue until a human action arrives or manual mode is switched off."""
+        await self.send({"type": "wait_for_human", "agent": proposer_id})
+        while self.manual_mode:
+            human = await self._apply_control(await self._next_control())
+            if human is not None:
+                return human
+        return None
+
+    async def _emit_turn(self, payload):
+        if self.recorder is not None:
+            self.recorder.record(payload)
+        await self.send(payload)
+
+    async def _emit_delta(self, payload, delta):
+        await self.send({"type": "message_delta", "round": payload["round"], "agent": payload["agent"], "delta": delta})
+
+    def _human_action(self, human):
+        num_items = self.env.num_items
+        action_type = int(human["action"])
+        # Support both single float and list for backward compatibility with current UI
+        raw_price = human.get("price", 0)
+        if isinstance(raw_price, (int, float)):
+            prices = np.array([raw_price] * num_items, dtype=np.float32)
+        else:
+            prices = np.array(raw_price, dtype=np.float32)
+        return {"type": action_type, "price": prices}, human.get("message", "")
+
+    async def play_turn(self, obs):
+        env = self.env
+        proposer_id = env.current_proposer
+        agent = self.agents[proposer_id]
+
+        human = None
+        if self.manual_mode:
+            await self.pipeline.drain()
+            human = await self._wait_for_human(proposer_id)
+        # Turn latency (decision to frame sent) excludes time spent waiting for a human
+        started = time.perf_counter()
+        draft = None
+        if human is not None:
+            action_data, message = self._human_action(human)
+        else:
+            # RL Strategy: NumPy policies take microseconds, so they run inline; a thread
+            # pool hop would cost more than it saves. Flagged heavy policies are offloaded.
+            if getattr(agent, "expensive_policy", False):
+                action_data = await run_cpu(agent.get_strategic_action, obs[proposer_id])
+            else:
+                action_data = agent.get_strategic_action(obs[proposer_id])
+            message = ""
+            # LLM Message: generates while the env steps and the next agent decides
+            if action_data["type"] == 1:
+                draft = agent.draft(action_data["price"], stream=self.stream_messages)
+        action_type, prices = action_data["type"], action_data["price"]
+
+        obs, rewards, terminations, truncations, infos = env.step({proposer_id: action_data})
+        self.rewards = rewards
+
+        payload = {
+            "type": "turn",
+            "round": env.current_round,
+            "agent": proposer_id,
+            "action": ACTION_NAMES[action_type],
+            "price": prices.tolist() if isinstance(prices, np.ndarray) else prices,
+            "message": message,
+            "surplus": rewards
+        }
+        await self.pipeline.submit(payload, draft, started=started,
+                                   timer=_TURN_TIMERS["auto" if human is None else "human"])
+
+        # Switch turn history for agents
+        for other_id, other in self.agents.items():
+            if other_id != proposer_id:
+                other.update_history(prices)
+
+        done = any(terminations.values()) or any(truncations.values())
+        return obs, done
+
+    async def run(self, obs):
+        """Play the negotiation to the end; returns the final rewards."""
+        self._reader_task = asyncio.create_task(self._reader())
+        try:
+            done = False
+            while not done:
+                await self._drain_controls()
+                obs, done = await self.play_turn(obs)
+                if not done and not self.manual_mode:
+                    await self._pace()
+            await self.pipeline.drain()
+            return self.rewards
+        finally:
+            self._reader_task.cancel()
+            await self.pipeline.close()
@@ -0,0 +1,142 @@
+import asyncio
+import functools
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+class OffloadPool:
+    """
+    Bounded executor for blocking work called from async handlers.
+
+    run() waits for an admission slot (at most max_pending calls queued or running
+    per event loop), then runs the call on the executor. Stats report queue depth
+    (calls waiting for admission, calls admitted but not started), in-flight work
+    and mean queue/run times, so saturation shows up before event-loop lag does.
+
+    kind="thread" suits file I/O and stateful CPU work (env step, policy inference);
+    kind="process" only accepts picklable functions and arguments.
+    """
+    def __init__(self, name, max_workers, max_pending, kind="thread"):
+        self.name = name
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        if kind == "process":
+            self._executor = ProcessPoolExecutor(max_workers=max_workers)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"eqx-{name}")
+        self._semaphores = weakref.WeakKeyDictionary()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.waiting = 0
+        self.pending = 0
+        self.running = 0
+        self._running_lock = threading.Lock()
+        self.max_pending_seen = 0
+        self.queue_time_total = 0.0
+        self.run_time_total = 0.0
+
+    def _semaphore(self):
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_pending)
+        return semaphore
+
+    def _timed(self, fn, args, kwargs):
+        with self._running_lock:
+            self.running += 1
+        started = time.perf_counter()
+        try:
+            return started, fn(*args, **kwargs)
+        finally:
+            with self._running_lock:
+                self.running -= 1
+
+    async def run(self, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) on the pool and await its result."""
+        semaphore = self._semaphore()
+        self.waiting += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.submitted += 1
+        self.pending += 1
+        self.max_pending_seen = max(self.max_pending_seen, self.pending)
+        loop = asyncio.get_running_loop()
+        queued = time.perf_counter()
+        try:
+            if self.kind == "process":
+                result = await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+                started = queued
+            else:
+                started, result = await loop.run_in_executor(self._executor, self._timed, fn, args, kwargs)
+            self.completed += 1
+            self.queue_time_total += started - queued
+            self.run_time_total += time.perf_counter() - started
+            return result
+        except BaseException:
+            self.failed += 1
+            raise
+        finally:
+            self.pending -= 1
+            semaphore.release()
+
+    def stats(self):
+        done = max(self.completed, 1)
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "waiting": self.waiting,
+            "pending": self.pending,
+            "queued": max(self.pending - self.running, 0),
+            "running": self.running,
+            "max_pending_seen": self.max_pending_seen,
+            "mean_queue_ms": 1000.0 * self.queue_time_total / done,
+            "mean_run_ms": 1000.0 * self.run_time_total / done,
+        }
+
+    def shutdown(self, wait=False):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+_pools = {}
+
+def _env_int(name, default):
+    return int(os.getenv(name, "0")) or default
+
+def get_io_pool():
+    """Thread pool for file and database I/O (EQX_IO_THREADS, EQX_IO_MAX_PENDING)."""
+    if "io" not in _pools:
+        _pools["io"] = OffloadPool("io", _env_int("EQX_IO_THREADS", 8), _env_int("EQX_IO_MAX_PENDING", 256))
+    return _pools["io"]
+
+def get_cpu_pool():
+    """
+    Thread pool for env and policy work (EQX_CPU_WORKERS, EQX_CPU_MAX_PENDING).
+    Threads, not processes: envs and agents are per-session state that must not be copied.
+    """
+    if "cpu" not in _pools:
+        _pools["cpu"] = OffloadPool("cpu", _env_int("EQX_CPU_WORKERS", os.cpu_count() or 1), _env_int("EQX_CPU_MAX_PENDING", 1024))
+    return _pools["cpu"]
+
+async def run_io(fn, *args, **kwargs):
+    return await get_io_pool().run(fn, *args, **kwargs)
+
+async def run_cpu(fn, *args, **kwargs):
+    return await get_cpu_pool().run(fn, *args, **kwargs)
+
+def offload_stats():
+    return {name: pool.stats() for name, pool in _pools.items()}
+
+def shutdown_offload():
+    for pool in _pools.values():
+        pool.shutdown()
+    _pools.clear()
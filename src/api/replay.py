@@ -0,0 +1,206 @@
+import asyncio
+import json
+import logging
+import os
+
+import numpy as np
+from fastapi import WebSocketDisconnect
+
+from src.api.offload import run_io
+from src.api.session_archive import SessionArchive, session_paths, load_session
+from src.utils.downsampling import lttb_indices
+
+logger = logging.getLogger("EquilibriumX.Replay")
+
+# Delay between turns at speed 1.0, matching the old client-side replay
+BASE_TURN_DELAY = 0.8
+MIN_SPEED, MAX_SPEED = 0.1, 100.0
+READ_AHEAD = 32
+
+class _LoadedSession:
+    """Replay source for JSONL logs and legacy JSON: the session is decoded once, in memory."""
+    def __init__(self, session):
+        self.meta = {k: v for k, v in session.items() if k != "turns"}
+        self._turns = session.get("turns", [])
+        self.num_turns = len(self._turns)
+
+    def turns(self, start=0, stop=None):
+        return self._turns[start:stop]
+
+    def rounds(self):
+        return np.array([t.get("round", 0) for t in self._turns], dtype=np.int64)
+
+    def prices(self):
+        num_items = (self.meta.get("config") or {}).get("num_items") or 1
+        return np.array([np.broadcast_to(np.asarray(t.get("price", 0.0), dtype=np.float64), (num_items,))
+                         for t in self._turns]).reshape(self.num_turns, num_items)
+
+class _ArchiveSession:
+    """Replay source for columnar archives: turns are decoded a range at a time."""
+    def __init__(self, archive):
+        self._archive = archive
+        self.meta = archive.meta
+        self.num_turns = archive.num_turns
+
+    def turns(self, start=0, stop=None):
+        return self._archive.turns(start, stop)
+
+    def rounds(self):
+        return self._archive.columns["round"]
+
+    def prices(self):
+        return self._archive.price_series()
+
+def open_replay_source(sessions_dir, session_id):
+    """Replay source for a stored session, or None when it does not exist."""
+    archive_path = session_paths(sessions_dir, session_id)[0]
+    if os.path.exists(archive_path):
+        return _ArchiveSession(SessionArchive(archive_path))
+    session = load_session(sessions_dir, session_id)
+    return _LoadedSession(session) if session is not None else None
+
+def overview(source, points):
+    """LTTB-downsampled price series: at most `points` (turn index, round, prices) samples."""
+    prices = source.prices()
+    if len(prices) == 0:
+        return {"type": "overview", "index": [], "round": [], "price": []}
+    idx = lttb_indices(prices, points)
+    return {
+        "type": "overview",
+        "num_turns": source.num_turns,
+        "index": idx.tolist(),
+        "round": np.asarray(source.rounds())[idx].tolist(),
+        "price": np.asarray(prices)[idx].tolist(),
+    }
+
+def clamp_speed(value):
+    try:
+        return min(max(float(value), MIN_SPEED), MAX_SPEED)
+    except (TypeError, ValueError):
+        return 1.0
+
+class ReplayStream:
+    """
+    Streams a stored session over a websocket, a few turns read ahead at a time.
+
+    Client controls: pause, resume, set_speed {value}, seek {round} (or {index}).
+    After a seek the server sends {"type": "seek", "index", "round"} so the client
+    can reset its view, then continues from the first turn at or after that round.
+    The stream stays open at the end, so the client can still seek back.
+    """
+    def __init__(self, websocket, sender, source, speed=1.0, start_index=0):
+        self.websocket = websocket
+        self.sender = sender
+        self.source = source
+        self.speed = clamp_speed(speed)
+        self.position = min(max(int(start_index), 0), source.num_turns)
+        self.paused = False
+        self.controls = asyncio.Queue()
+        self._buffer = []
+        self._buffer_start = 0
+
+    async def _reader(self):
+        try:
+            while True:
+                self.controls.put_nowait(await self.websocket.receive_json())
+        except WebSocketDisconnect:
+            pass
+        except Exception as e:
+            logger.warning(f"Replay reader stopped: {e}")
+        self.controls.put_nowait(None)
+
+    async def send(self, payload):
+        await self.sender.wait_for_space()
+        self.sender.send(json.dumps(payload))
+
+    def init_payload(self):
+        meta = self.source.meta
+        initial = meta.get("initial_state") or {}
+        config = meta.get("config") or {}
+        return {
+            "type": "init",
+            "replay": True,
+            "session_id": meta.get("id"),
+            "val_s": initial.get("val_s"),
+            "val_r": initial.get("val_r"),
+            "max_rounds": config.get("max_rounds"),
+            "num_items": config.get("num_items", 1),
+            "num_turns": self.source.num_turns,
+            "speed": self.speed,
+        }
+
+    def end_payload(self):
+        meta = self.source.meta
+        return {"type": "end", "replay": True, "deal_price": meta.get("deal_price"),
+                "final_rewards": meta.get("final_rewards")}
+
+    async def _next_turn(self):
+        offset = self.position - self._buffer_start
+        if not 0 <= offset < len(self._buffer):
+            self._buffer_start = self.position
+            self._buffer = await run_io(self.source.turns, self.position, self.position + READ_AHEAD)
+            offset = 0
+        turn = {**self._buffer[offset], "index": self.position}
+        self.position += 1
+        return turn
+
+    async def _seek(self, msg):
+        if "index" in msg:
+            index = int(msg["index"])
+        else:
+            rounds = np.asarray(self.source.rounds())
+            index = int(np.searchsorted(rounds, int(msg.get("round", 0)), side="left")) if len(rounds) else 0
+        self.position = min(max(index, 0), self.source.num_turns)
+        self._buffer = []
+        turns = await run_io(self.source.turns, self.position, self.position + 1)
+        await self.send({"type": "seek", "index": self.position,
+                         "round": turns[0]["round"] if turns else None})
+
+    async def _apply(self, msg):
+        kind = msg.get("type")
+        if kind == "pause":
+            self.paused = True
+        elif kind == "resume":
+            self.paused = False
+        elif kind == "set_speed":
+            self.speed = clamp_speed(msg.get("value"))
+        elif kind == "seek":
+            await self._seek(msg)
+
+    async def _wait(self, timeout=None):
+        """Apply controls until `timeout` passes (or forever when None). Raises on disconnect."""
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while True:
+            remaining = None if deadline is None else deadline - loop.time()
+            if remaining is not None and remaining <= 0:
+                return
+            try:
+                msg = await asyncio.wait_for(self.controls.get(), remaining)
+            except asyncio.TimeoutError:
+                return
+            if msg is None:
+                raise WebSocketDisconnect()
+            await self._apply(msg)
+            if deadline is None or msg.get("type") == "seek":
+                return
+
+    async def run(self, overview_points=None):
+        reader = asyncio.create_task(self._reader())
+        try:
+            await self.send(self.init_payload())
+            if overview_points:
+                await self.send(await run_io(overview, self.source, int(overview_points)))
+            ended = False
+            while True:
+                if self.paused or self.position >= self.source.num_turns:
+                    if self.position >= self.source.num_turns and not ended:
+                        await self.send(self.end_payload())
+                        ended = True
+                    await self._wait()
+                    continue
+                ended = False
+                await self.send(await self._next_turn())
+                await self._wait(BASE_TURN_DELAY / self.speed)
+        finally:
+            reader.cancel()
@@ -0,0 +1,180 @@
+import json
+import os
+import struct
+
+import numpy as np
+
+from src.api.session_recorder import read_session_log
+
+MAGIC = b"EQXSESS1"
+ALIGNMENT = 64
+ARCHIVE_EXT = ".eqxs"
+ACTIONS = ["ACCEPT", "COUNTER", "QUIT"]
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+def write_archive(path, session):
+    """
+    Write a classic session dict (header fields + turns) as a columnar archive.
+
+    Layout: magic, little-endian u64 header length, JSON header, then 64-byte aligned
+    column blocks: round (int32), agent (int8), action (int8), price (float32, T x items),
+    surplus (float64, T x agents), message_offsets (int64, T + 1) and message_data
+    (utf-8 string table).
+    """
+    turns = session.get("turns", [])
+    num_items = (session.get("config") or {}).get("num_items") or 1
+    agents = []
+    for turn in turns:
+        for name in [turn.get("agent")] + list((turn.get("surplus") or {}).keys()):
+            if name is not None and name not in agents:
+                agents.append(name)
+
+    T = len(turns)
+    encoded = [(turn.get("message") or "").encode("utf-8") for turn in turns]
+    message_offsets = np.zeros(T + 1, dtype=np.int64)
+    np.cumsum([len(m) for m in encoded], out=message_offsets[1:])
+    columns = {
+        "round": np.array([turn.get("round", 0) for turn in turns], dtype=np.int32),
+        "agent": np.array([agents.index(turn["agent"]) for turn in turns], dtype=np.int8),
+        "action": np.array([ACTIONS.index(turn["action"]) for turn in turns], dtype=np.int8),
+        "price": np.array(
+            [np.broadcast_to(np.asarray(turn.get("price", 0.0), dtype=np.float32), (num_items,)) for turn in turns],
+            dtype=np.float32,
+        ).reshape(T, num_items),
+        "surplus": np.array(
+            [[(turn.get("surplus") or {}).get(a, 0.0) for a in agents] for turn in turns], dtype=np.float64
+        ).reshape(T, len(agents)),
+        "message_offsets": message_offsets,
+        "message_data": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+    }
+
+    meta = {k: v for k, v in session.items() if k != "turns"}
+    header = {"version": 1, "session": meta, "agents": agents, "num_turns": T, "num_items": num_items, "columns": {}}
+    # Two passes: offsets depend on the header length, which depends on the offsets
+    for _ in range(2):
+        header_bytes = json.dumps(header).encode("utf-8")
+        offset = _align(len(MAGIC) + 8 + len(header_bytes) + ALIGNMENT)
+        for name, array in columns.items():
+            header["columns"][name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+            offset = _align(offset + array.nbytes)
+    header_bytes = json.dumps(header).encode("utf-8")
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header_bytes)))
+        f.write(header_bytes)
+        for name, array in columns.items():
+            f.seek(header["columns"][name]["offset"])
+            f.write(np.ascontiguousarray(array).tobytes())
+    os.replace(tmp_path, path)
+
+class SessionArchive:
+    """
+    Memory-mapped reader for a columnar session archive.
+
+    Opening maps the file and parses only the JSON header; columns are NumPy views
+    into the map, and turns(start, stop) decodes just the requested range, including
+    only that slice of the message string table.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Not a session archive: {path}")
+            (header_len,) = struct.unpack("<Q", f.read(8))
+            self.header = json.loads(f.read(header_len))
+        self._map = np.memmap(path, dtype=np.uint8, mode="r")
+        self.columns = {}
+        for name, spec in self.header["columns"].items():
+            dtype = np.dtype(spec["dtype"])
+            shape = tuple(spec["shape"])
+            count = int(np.prod(shape)) if shape else 1
+            self.columns[name] = np.ndarray(shape, dtype=dtype, buffer=self._map, offset=spec["offset"]) if count else np.zeros(shape, dtype=dtype)
+        self.agents = self.header["agents"]
+        self.num_turns = self.header["num_turns"]
+        self.meta = self.header["session"]
+
+    def __len__(self):
+        return self.num_turns
+
+    def turns(self, start=0, stop=None):
+        """Decode turn payloads [start, stop) without touching the rest of the archive."""
+        start, stop, _ = slice(start, stop).indices(self.num_turns)
+        if start >= stop:
+            return []
+        c = self.columns
+        offsets = c["message_offsets"][start:stop + 1]
+        blob = c["message_data"][offsets[0]:offsets[-1]].tobytes()
+        base = int(offsets[0])
+        rounds = c["round"][start:stop].tolist()
+        agent_ids = c["agent"][start:stop].tolist()
+        actions = c["action"][start:stop].tolist()
+        prices = c["price"][start:stop].tolist()
+        surplus = c["surplus"][start:stop].tolist()
+        bounds = offsets.tolist()
+        return [
+            {
+                "type": "turn",
+                "round": rounds[i],
+                "agent": self.agents[agent_ids[i]],
+                "action": ACTIONS[actions[i]],
+                "price": prices[i],
+                "message": blob[bounds[i] - base:bounds[i + 1] - base].decode("utf-8"),
+                "surplus": dict(zip(self.agents, surplus[i])),
+            }
+            for i in range(stop - start)
+        ]
+
+    def price_series(self):
+        """(T, num_items) price column as a memory-mapped view."""
+        return self.columns["price"]
+
+    def to_session(self, start=0, stop=None):
+        """Classic session dict; with a range, only those turns are included."""
+        return {**self.meta, "num_turns": self.num_turns, "turns": self.turns(start, stop)}
+
+def session_paths(sessions_dir, session_id):
+    """Candidate files for a session, most compact format first."""
+    return [
+        os.path.join(sessions_dir, f"{session_id}{ARCHIVE_EXT}"),
+        os.path.join(sessions_dir, f"{session_id}.jsonl"),
+        os.path.join(sessions_dir, f"{session_id}.json"),
+    ]
+
+def load_session(sessions_dir, session_id, start=0, stop=None):
+    """
+    Load a session from whichever format exists (archive, JSONL log, legacy JSON).
+    Returns None when no file exists. With a turn range, only archives avoid decoding
+    the full session.
+    """
+    for path in session_paths(sessions_dir, session_id):
+        if not os.path.exists(path):
+            continue
+        if path.endswith(ARCHIVE_EXT):
+            return SessionArchive(path).to_session(start, stop)
+        if path.endswith(".jsonl"):
+            session = read_session_log(path)
+        else:
+            with open(path, "r") as f:
+                session = json.load(f)
+        session["num_turns"] = len(session.get("turns", []))
+        session["turns"] = session.get("turns", [])[start:stop]
+        return session
+    return None
+
+def convert_session_file(path, remove_source=False):
+    """Convert a .json or .jsonl session file to an archive next to it. Returns the archive path."""
+    base, ext = os.path.splitext(path)
+    if ext == ".jsonl":
+        session = read_session_log(path)
+    else:
+        with open(path, "r") as f:
+            session = json.load(f)
+    archive_path = base + ARCHIVE_EXT
+    write_archive(archive_path, session)
+    if remove_source:
+        os.remove(path)
+    return archive_path
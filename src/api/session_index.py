@@ -0,0 +1,163 @@
+import base64
+import glob
+import json
+import logging
+import os
+import sqlite3
+import threading
+
+from src.api.session_recorder import read_session_log
+from src.api.session_archive import ARCHIVE_EXT, SessionArchive
+
+logger = logging.getLogger("EquilibriumX.SessionIndex")
+
+class SessionIndex:
+    """
+    Embedded SQLite catalog of recorded sessions.
+
+    One summary row per session (id, timestamp, rounds, result, num_items, config,
+    final rewards) is written when a session is saved, so listing never opens
+    session files. Pages are fetched with keyset pagination on (timestamp, id),
+    which costs the same whatever the size of the archive.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS sessions (
+                    id TEXT PRIMARY KEY,
+                    timestamp TEXT NOT NULL,
+                    rounds INTEGER NOT NULL,
+                    result TEXT NOT NULL,
+                    num_items INTEGER,
+                    config TEXT,
+                    final_rewards TEXT
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_order ON sessions (timestamp DESC, id DESC)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_result ON sessions (result, timestamp DESC)")
+
+    @staticmethod
+    def summarize(session_data):
+        """Catalog row for a full session dict (as saved by the websocket handler)."""
+        config = session_data.get("config") or {}
+        return {
+            "id": session_data.get("id"),
+            "timestamp": session_data.get("timestamp", ""),
+            "rounds": session_data.get("rounds", len(session_data.get("turns", []))),
+            "result": "Deal" if session_data.get("deal_price") else "No Deal",
+            "num_items": config.get("num_items"),
+            "config": config,
+            "final_rewards": session_data.get("final_rewards"),
+        }
+
+    def add(self, session_data):
+        self.add_summary(self.summarize(session_data))
+
+    def add_summary(self, row):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (id, timestamp, rounds, result, num_items, config, final_rewards) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (row["id"], row["timestamp"], row["rounds"], row["result"], row["num_items"],
+                 json.dumps(row["config"]), json.dumps(row["final_rewards"])),
+            )
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def contains(self, session_id):
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM sessions WHERE id = ?", (session_id,)).fetchone() is not None
+
+    @staticmethod
+    def encode_cursor(timestamp, session_id):
+        return base64.urlsafe_b64encode(json.dumps([timestamp, session_id]).encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor):
+        try:
+            timestamp, session_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            return str(timestamp), str(session_id)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
+
+    def query(self, limit=50, cursor=None, result=None, date_from=None, date_to=None, num_items=None):
+        """
+        Newest-first page of session summaries.
+        Returns (sessions, next_cursor); next_cursor is None on the last page.
+        """
+        clauses, params = [], []
+        if cursor:
+            timestamp, session_id = self.decode_cursor(cursor)
+            clauses.append("(timestamp < ? OR (timestamp = ? AND id < ?))")
+            params += [timestamp, timestamp, session_id]
+        if result:
+            clauses.append("result = ?")
+            params.append(result)
+        if date_from:
+            clauses.append("timestamp >= ?")
+            params.append(date_from)
+        if date_to:
+            clauses.append("timestamp <= ?")
+            params.append(date_to)
+        if num_items is not None:
+            clauses.append("num_items = ?")
+            params.append(num_items)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = f"SELECT * FROM sessions {where} ORDER BY timestamp DESC, id DESC LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(sql, params + [limit + 1]).fetchall()
+
+        sessions = [self._row_to_dict(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = sessions[-1]
+            next_cursor = self.encode_cursor(last["timestamp"], last["id"])
+        return sessions, next_cursor
+
+    @staticmethod
+    def _row_to_dict(row):
+        return {
+            "id": row["id"],
+            "timestamp": row["timestamp"],
+            "rounds": row["rounds"],
+            "result": row["result"],
+            "num_items": row["num_items"],
+            "config": json.loads(row["config"]) if row["config"] else None,
+            "final_rewards": json.loads(row["final_rewards"]) if row["final_rewards"] else None,
+        }
+
+    def rebuild(self, sessions_dir):
+        """Backfill the catalog from session files that are not indexed yet. Returns rows added."""
+        added = 0
+        paths = (glob.glob(os.path.join(sessions_dir, f"*{ARCHIVE_EXT}"))
+                 + glob.glob(os.path.join(sessions_dir, "*.jsonl"))
+                 + glob.glob(os.path.join(sessions_dir, "*.json")))
+        for path in paths:
+            session_id = os.path.splitext(os.path.basename(path))[0]
+            if self.contains(session_id):
+                continue
+            try:
+                if path.endswith(ARCHIVE_EXT):
+                    # Header only: the turn columns are never read
+                    archive = SessionArchive(path)
+                    self.add({**archive.meta, "rounds": archive.num_turns})
+                elif path.endswith(".jsonl"):
+                    self.add(read_session_log(path))
+                else:
+                    with open(path, "r") as f:
+                        self.add(json.load(f))
+                added += 1
+            except (json.JSONDecodeError, KeyError, ValueError, IOError) as e:
+                logger.warning(f"Skipping malformed session file: {path} - {e}")
+        return added
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
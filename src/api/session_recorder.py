@@ -0,0 +1,119 @@
+import asyncio
+import json
+import logging
+
+from src.api.offload import run_io
+
+logger = logging.getLogger("EquilibriumX.Recorder")
+
+class SessionRecorder:
+    """
+    Append-only JSONL recorder for one negotiation session.
+
+    The first line is a header (id, timestamp, config, initial state), then one line
+    per turn payload as it happens, then an end record written on completion or on
+    disconnect. record() only enqueues; a background task batches queued records and
+    writes them on the I/O offload pool, so memory per session stays constant and the
+    async path never blocks on disk.
+    """
+    def __init__(self, path, header, batch_size=32, flush_interval=0.2):
+        self.path = path
+        self.header = {"type": "header", **header}
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.turns_recorded = 0
+        self.end_record = None
+        self._queue = asyncio.Queue()
+        self._file = None
+        self._writer_task = None
+        self.closed = False
+
+    async def start(self):
+        self._file = await run_io(open, self.path, "a", encoding="utf-8")
+        self._queue.put_nowait(self.header)
+        self._writer_task = asyncio.create_task(self._writer())
+
+    def record(self, payload):
+        """Queue one turn payload; never blocks."""
+        if self.closed:
+            return
+        self.turns_recorded += 1
+        self._queue.put_nowait(payload)
+
+    async def close(self, end_payload, status="completed"):
+        """Write the end record, flush everything still queued and close the file."""
+        if self.closed:
+            return
+        self.closed = True
+        self.end_record = {**end_payload, "type": "end", "status": status}
+        self._queue.put_nowait(self.end_record)
+        self._queue.put_nowait(None)
+        if self._writer_task is not None:
+            await self._writer_task
+        if self._file is not None:
+            await run_io(self._file.close)
+
+    def summary(self):
+        """Session summary for the SessionIndex (no turn bodies needed)."""
+        end = self.end_record or {}
+        return {
+            "id": self.header.get("id"),
+            "timestamp": self.header.get("timestamp"),
+            "config": self.header.get("config"),
+            "rounds": self.turns_recorded,
+            "deal_price": end.get("deal_price"),
+            "final_rewards": end.get("final_rewards"),
+        }
+
+    async def _writer(self):
+        done = False
+        while not done:
+            batch = [await self._queue.get()]
+            # Gather whatever else arrives within the flush window, up to batch_size
+            deadline = asyncio.get_running_loop().time() + self.flush_interval
+            while len(batch) < self.batch_size and batch[-1] is not None:
+                timeout = deadline - asyncio.get_running_loop().time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            if batch[-1] is None:
+                batch.pop()
+                done = True
+            if batch:
+                lines = "".join(json.dumps(record) + "\n" for record in batch)
+                try:
+                    await run_io(self._write, lines)
+                except OSError as e:
+                    logger.error(f"Failed to append to session log {self.path}: {e}")
+
+    def _write(self, lines):
+        self._file.write(lines)
+        self._file.flush()
+
+def read_session_log(path):
+    """
+    Rebuild the classic session dict from a JSONL log.
+    Logs without an end record (crashed server) are returned with status "incomplete".
+    """
+    session = {"turns": [], "deal_price": None, "final_rewards": None, "status": "incomplete"}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # Torn final line after a crash
+                break
+            kind = record.get("type")
+            if kind == "header":
+                session.update({k: v for k, v in record.items() if k != "type"})
+            elif kind == "end":
+                session.update({k: v for k, v in record.items() if k != "type"})
+            else:
+                session["turns"].append(record)
+    return session
@@ -0,0 +1,294 @@
+import asyncio
+import itertools
+import json
+import logging
+import os
+import re
+import time
+import uuid
+
+from src.api.fanout import ConnectionSender
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
+logger = logging.getLogger("EquilibriumX.StateBackend")
+
+BROADCAST_CHANNEL = "broadcast"
+
+# session_{unix_ms}_{sequence}_{origin}; ids written before the origin suffix are still valid
+SESSION_ID_PATTERN = re.compile(r'^session_\d+(_\d+)?(_[0-9a-f]{8})?$')
+
+# A connection slot expires unless its worker refreshes it, so a killed worker's slots free up
+SLOT_TTL = 60.0
+SLOT_REFRESH = 20.0
+
+class InMemoryStateBackend:
+    """
+    Process-local state backend: the single-worker default and the test stand-in.
+
+    Session ids are session_{unix_ms}_{sequence}_{origin}: the sequence makes ids
+    started in the same millisecond distinct, and the random per-process origin keeps
+    workers that each run this backend from handing out the same id. Connection slots
+    and pub/sub only cover this process, so use RedisStateBackend when running
+    several workers or replicas.
+    """
+    def __init__(self):
+        self._sequence = itertools.count(1)
+        self._origin = uuid.uuid4().hex[:8]
+        self._slots = set()
+        self._subscribers = {}
+        self._values = {}
+
+    async def new_session_id(self):
+        return f"session_{int(time.time() * 1000)}_{next(self._sequence)}_{self._origin}"
+
+    async def acquire_slot(self, limit, slot_id):
+        """Reserve a connection slot under `slot_id`; False when `limit` slots are taken."""
+        if len(self._slots) >= limit:
+            return False
+        self._slots.add(slot_id)
+        return True
+
+    async def release_slot(self, slot_id):
+        self._slots.discard(slot_id)
+
+    async def refresh_slots(self, slot_ids):
+        # Slots live and die with this process; nothing can leak them
+        pass
+
+    async def active_connections(self):
+        return len(self._slots)
+
+    async def set_value(self, key, value, ttl=None):
+        expires = time.monotonic() + ttl if ttl else None
+        self._values[key] = (value, expires)
+
+    async def get_value(self, key):
+        value, expires = self._values.get(key, (None, None))
+        if expires is not None and time.monotonic() > expires:
+            self._values.pop(key, None)
+            return None
+        return value
+
+    async def delete_value(self, key):
+        self._values.pop(key, None)
+
+    async def publish(self, channel, message):
+        for queue in list(self._subscribers.get(channel, ())):
+            queue.put_nowait(message)
+
+    async def subscribe(self, channel):
+        """Async iterator over messages published to `channel` from now on."""
+        queue = asyncio.Queue()
+        self._subscribers.setdefault(channel, set()).add(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._subscribers.get(channel, set()).discard(queue)
+
+    async def close(self):
+        self._subscribers.clear()
+
+# Slots are a sorted set of slot id -> expiry (Redis server time). Expired slots are
+# dropped and the count checked and taken in one round trip, so two workers cannot
+# both take the last slot.
+_ACQUIRE_SLOT = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('ZADD', KEYS[1], now + tonumber(ARGV[3]), ARGV[2])
+return 1
+"""
+
+# Push the expiry of the slots that still exist (XX: a released slot stays released)
+_REFRESH_SLOTS = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+for i = 2, #ARGV do
+    redis.call('ZADD', KEYS[1], 'XX', now + tonumber(ARGV[1]), ARGV[i])
+end
+return redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+"""
+
+_COUNT_SLOTS = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+return redis.call('ZCOUNT', KEYS[1], '(' .. now, '+inf')
+"""
+
+class RedisStateBackend:
+    """
+    Redis state shared by every API worker: a global id sequence, global
+    connection slots and pub/sub channels for cross-worker broadcast.
+
+    Each slot expires SLOT_TTL seconds after it was taken or last refreshed
+    (ConnectionManager refreshes its own), so a worker that dies without releasing
+    its slots stops counting against the limit once they expire.
+    """
+    def __init__(self, url, prefix="eqx"):
+        if aioredis is None:
+            raise RuntimeError("RedisStateBackend requires the 'redis' package (pip install redis)")
+        self.url = url
+        self.prefix = prefix
+        self._redis = aioredis.from_url(url, decode_responses=True)
+        self._acquire = self._redis.register_script(_ACQUIRE_SLOT)
+        self._refresh = self._redis.register_script(_REFRESH_SLOTS)
+        self._count = self._redis.register_script(_COUNT_SLOTS)
+
+    def _key(self, name):
+        return f"{self.prefix}:{name}"
+
+    async def new_session_id(self):
+        sequence = await self._redis.incr(self._key("session_seq"))
+        return f"session_{int(time.time() * 1000)}_{sequence}"
+
+    async def acquire_slot(self, limit, slot_id):
+        return bool(await self._acquire(keys=[self._key("slots")], args=[limit, slot_id, SLOT_TTL]))
+
+    async def release_slot(self, slot_id):
+        await self._redis.zrem(self._key("slots"), slot_id)
+
+    async def refresh_slots(self, slot_ids):
+        if slot_ids:
+            await self._refresh(keys=[self._key("slots")], args=[SLOT_TTL, *slot_ids])
+
+    async def active_connections(self):
+        return int(await self._count(keys=[self._key("slots")]))
+
+    async def set_value(self, key, value, ttl=None):
+        await self._redis.set(self._key(key), json.dumps(value), ex=ttl)
+
+    async def get_value(self, key):
+        raw = await self._redis.get(self._key(key))
+        return json.loads(raw) if raw is not None else None
+
+    async def delete_value(self, key):
+        await self._redis.delete(self._key(key))
+
+    async def publish(self, channel, message):
+        await self._redis.publish(self._key(channel), json.dumps(message))
+
+    async def subscribe(self, channel):
+        pubsub = self._redis.pubsub()
+        await pubsub.subscribe(self._key(channel))
+        try:
+            async for item in pubsub.listen():
+                if item.get("type") == "message":
+                    yield json.loads(item["data"])
+        finally:
+            await pubsub.unsubscribe(self._key(channel))
+            await pubsub.aclose()
+
+    async def close(self):
+        await self._redis.aclose()
+
+def create_state_backend(url=None):
+    """
+    Backend from EQX_STATE_BACKEND: unset or "memory" for the in-process backend,
+    a redis:// or rediss:// URL for Redis.
+    """
+    url = url if url is not None else os.getenv("EQX_STATE_BACKEND", "memory")
+    if url in ("", "memory"):
+        return InMemoryStateBackend()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisStateBackend(url)
+    raise ValueError(f"Unknown state backend: {url}")
+
+class ConnectionManager:
+    """
+    Websocket bookkeeping for one worker on top of a shared state backend.
+
+    The capacity limit is enforced on the backend's global connection slots; each
+    connection holds one slot, refreshed every SLOT_REFRESH seconds while this
+    worker is alive. broadcast() publishes on the backend so every worker delivers the message to
+    its own connections. Every connection gets a ConnectionSender, and a broadcast
+    is serialized once and queued on each sender without awaiting any client.
+    """
+    def __init__(self, backend, max_connections: int = 100, max_queue: int = 64):
+        self.backend = backend
+        self.active_connections = []
+        self.senders = {}
+        self.slots = {}
+        self.max_connections = max_connections
+        self.max_queue = max_queue
+        self.worker_id = uuid.uuid4().hex[:8]
+        self._listener = None
+        self._heartbeat = None
+
+    async def start(self):
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+        if self._heartbeat is None:
+            self._heartbeat = asyncio.create_task(self._refresh_slots())
+
+    async def stop(self):
+        for task in (self._listener, self._heartbeat):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._listener = None
+        self._heartbeat = None
+
+    async def connect(self, websocket):
+        slot_id = f"{self.worker_id}:{uuid.uuid4().hex}"
+        if not await self.backend.acquire_slot(self.max_connections, slot_id):
+            await websocket.close(code=1008, reason="Server at capacity")
+            logging.getLogger("EquilibriumX.Security").warning(
+                f"Connection rejected: max capacity ({self.max_connections}) reached")
+            return False
+        try:
+            await websocket.accept()
+        except BaseException:
+            await self.backend.release_slot(slot_id)
+            raise
+        self.slots[websocket] = slot_id
+        self.active_connections.append(websocket)
+        sender = self.senders[websocket] = ConnectionSender(websocket, self.max_queue)
+        sender.start()
+        return True
+
+    def sender(self, websocket):
+        return self.senders[websocket]
+
+    async def disconnect(self, websocket):
+        if websocket in self.active_connections:
+            self.active_connections.remove(websocket)
+            sender = self.senders.pop(websocket, None)
+            if sender is not None:
+                await sender.close()
+            await self.backend.release_slot(self.slots.pop(websocket))
+
+    async def broadcast(self, message: dict):
+        await self.backend.publish(BROADCAST_CHANNEL, message)
+
+    def deliver_local(self, message: dict):
+        text = json.dumps(message)
+        for sender in list(self.senders.values()):
+            sender.send(text)
+
+    async def _refresh_slots(self):
+        while True:
+            await asyncio.sleep(SLOT_REFRESH)
+            try:
+                await self.backend.refresh_slots(list(self.slots.values()))
+            except Exception as e:
+                logger.warning(f"Connection slot refresh failed: {e}")
+
+    async def _listen(self):
+        try:
+            async for message in self.backend.subscribe(BROADCAST_CHANNEL):
+                self.deliver_local(message)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Broadcast listener stopped: {e}")
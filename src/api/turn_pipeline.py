@@ -0,0 +1,114 @@
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger("EquilibriumX.TurnPipeline")
+
+class _PendingTurn:
+    """One turn whose message may still be generating. Deltas are buffered until it is emitted."""
+    def __init__(self, payload, draft, started, timer):
+        self.payload = payload
+        self.started = started
+        self.timer = timer
+        self.deltas = asyncio.Queue()
+        self.task = asyncio.create_task(self._generate(draft)) if draft is not None else None
+
+    async def _generate(self, draft):
+        try:
+            if hasattr(draft, "__aiter__"):
+                chunks = []
+                async for chunk in draft:
+                    chunks.append(chunk)
+                    self.deltas.put_nowait(chunk)
+                return "".join(chunks).strip()
+            return await draft
+        finally:
+            self.deltas.put_nowait(None)
+
+class TurnPipeline:
+    """
+    Emits negotiation turns in order while their LLM messages generate concurrently.
+
+    The driver submits each turn as soon as its action is decided and the env has
+    stepped, together with the agent's pending message (HybridAgent.draft): an
+    awaitable, or an async iterator of chunks. An emitter task sends turns strictly
+    in submission order: it forwards the head turn's chunks through `on_delta`
+    (chunks of later turns wait their turn), fills in payload["message"] and awaits
+    `emit(payload)`. Meanwhile the driver moves on to the next env step and policy
+    inference. At most `max_pending` turns are in flight; submit() waits for room.
+
+    emit(payload) and on_delta(payload, chunk) are coroutines.
+    """
+    def __init__(self, emit, on_delta=None, max_pending=2):
+        self.emit = emit
+        self.on_delta = on_delta
+        self._pending = asyncio.Queue(maxsize=max_pending)
+        self._emitter = None
+        self._current = None
+
+    async def _guard(self, awaitable):
+        """Await `awaitable`, re-raising if the emitter fails first (so callers never hang on it)."""
+        task = asyncio.ensure_future(awaitable)
+        if self._emitter is None:
+            return await task
+        done, _ = await asyncio.wait({task, self._emitter}, return_when=asyncio.FIRST_COMPLETED)
+        if task not in done:
+            task.cancel()
+            # The emitter only exits on error or cancellation
+            self._emitter.result()
+            raise RuntimeError("Turn emitter stopped")
+        return task.result()
+
+    async def submit(self, payload, draft=None, started=None, timer=None):
+        """
+        Queue a turn; `draft` is its pending message (None when payload["message"] is
+        final). `timer` (a histogram child) observes the time from `started` to emit.
+        """
+        turn = _PendingTurn(payload, draft, time.perf_counter() if started is None else started, timer)
+        if self._emitter is None:
+            self._emitter = asyncio.create_task(self._emit_loop())
+        try:
+            await self._guard(self._pending.put(turn))
+        except BaseException:
+            if turn.task is not None:
+                turn.task.cancel()
+            raise
+
+    async def drain(self):
+        """Wait until every submitted turn has been emitted."""
+        await self._guard(self._pending.join())
+
+    async def _emit_loop(self):
+        while True:
+            turn = self._current = await self._pending.get()
+            try:
+                if turn.task is not None:
+                    while (chunk := await turn.deltas.get()) is not None:
+                        if self.on_delta is not None:
+                            await self.on_delta(turn.payload, chunk)
+                    try:
+                        turn.payload["message"] = await turn.task
+                    except Exception as e:
+                        logger.error(f"Message generation failed: {e}")
+                        turn.payload["message"] = ""
+                await self.emit(turn.payload)
+                if turn.timer is not None:
+                    turn.timer.observe(time.perf_counter() - turn.started)
+            finally:
+                self._current = None
+                self._pending.task_done()
+
+    async def close(self):
+        """Stop emitting and cancel messages still generating."""
+        current = self._current
+        if self._emitter is not None:
+            self._emitter.cancel()
+            await asyncio.gather(self._emitter, return_exceptions=True)
+            self._emitter = None
+        if current is not None and current.task is not None:
+            current.task.cancel()
+        while not self._pending.empty():
+            turn = self._pending.get_nowait()
+            self._pending.task_done()
+            if turn.task is not None:
+                turn.task.cancel()
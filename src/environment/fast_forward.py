@@ -0,0 +1,160 @@
+import numpy as np
+
+from src.environment.negotiator_env import (
+    NegotiatorEnv,
+    ACCEPT, COUNTER, QUIT,
+    RESULT_DEAL, RESULT_QUIT, RESULT_INVALID_ACCEPT, RESULT_TIMEOUT,
+)
+from src.environment.scenarios import sample_valuations
+from src.environment.settlement import weight_matrix, settle_bundle
+
+# A strategy is a vectorized function
+#     strategy(round, history, valuation, rng) -> (action_type (b,), prices (b, num_items))
+# round: int, the same for every episode in the call
+# history: (b, max(history_lag, 1), num_items) raw offers, most recent first, zero padded
+# valuation: (b, num_items) the acting agent's own valuations
+
+def hybrid_random_strategy(low=4500.0, high=8500.0, min_history=4, accept_prob=0.2, quit_prob=0.05):
+    """
+    Vectorized HybridAgent.get_strategic_action: random COUNTER offers, then random
+    ACCEPT/QUIT once `min_history` offers have been exchanged (one per round).
+    """
+    def strategy(round_, history, valuation, rng):
+        b, num_items = valuation.shape
+        types = np.full(b, COUNTER, dtype=np.int64)
+        if round_ >= min_history:
+            rand = rng.random(b)
+            types[rand > 1.0 - accept_prob] = ACCEPT
+            types[rand < quit_prob] = QUIT
+        prices = rng.uniform(low, high, size=(b, num_items)).astype(np.float32)
+        return types, prices
+    return strategy
+
+def time_dependent_strategy(seller, max_rounds, beta=1.0, start_margin=0.5, end_margin=0.0):
+    """
+    Time-dependent concession curve (beta < 1: Boulware, beta > 1: Conceder).
+
+    The margin over (seller) or under (buyer) the agent's own valuation moves from
+    start_margin to end_margin as (round / max_rounds) ** (1 / beta). The agent
+    accepts the standing offer when its bundle total is at least as good as the
+    offer it would make next.
+    """
+    def strategy(round_, history, valuation, rng):
+        progress = (round_ / max_rounds) ** (1.0 / beta)
+        margin = start_margin + (end_margin - start_margin) * progress
+        target = valuation * (1.0 + margin) if seller else valuation * (1.0 - margin)
+        prices = target.astype(np.float32)
+        standing = history[:, 0].sum(axis=1)
+        wanted = prices.sum(axis=1)
+        acceptable = standing >= wanted if seller else standing <= wanted
+        types = np.where(acceptable & (round_ > 0), ACCEPT, COUNTER)
+        return types, prices
+    return strategy
+
+def simulate_episodes(strategies, config=None, num_episodes=None, valuations=None, seed=None, chunk_size=65536):
+    """
+    Play whole episodes for a batch of negotiations between fixed strategies.
+
+    Because every non-COUNTER action ends an episode, round r is always proposed by
+    agent r % n_agents, so each round is one vectorized strategy call over the
+    episodes still running. Outcomes follow NegotiatorEnv.step exactly.
+
+    strategies: one strategy per agent (list in possible_agents order, or dict by name)
+    valuations: optional (B, n_agents, num_items); sampled (or drawn from the config's
+                scenario bank) with a Generator seeded by `seed` otherwise
+
+    Returns a dict of arrays: result (B,) outcome codes, deal_round (B,) round of the
+    agreement or -1, deal_prices (B, num_items) NaN without a deal, rewards (B, n_agents),
+    rounds (B,) final round counter, and valuations.
+    """
+    env = NegotiatorEnv(config)
+    agents = env.possible_agents
+    n_agents, num_items = len(agents), env.num_items
+    if isinstance(strategies, dict):
+        strategies = [strategies[a] for a in agents]
+    if len(strategies) != n_agents:
+        raise ValueError(f"Expected {n_agents} strategies, got {len(strategies)}")
+
+    rng = np.random.default_rng(seed)
+    if valuations is None:
+        if num_episodes is None:
+            raise ValueError("Pass num_episodes or valuations")
+        if env.scenario_bank is not None:
+            valuations = env.scenario_bank.draw(rng, num_episodes)
+        else:
+            valuations = sample_valuations(rng, env._val_low, env._val_high, num_episodes, num_items, env._feasible_pair)
+    valuations = np.asarray(valuations, dtype=np.float64)
+    total = len(valuations)
+
+    out = {
+        "result": np.zeros(total, dtype=np.int8),
+        "deal_round": np.full(total, -1, dtype=np.int64),
+        "deal_prices": np.full((total, num_items), np.nan, dtype=np.float32),
+        "rewards": np.zeros((total, n_agents), dtype=np.float64),
+        "rounds": np.zeros(total, dtype=np.int64),
+        "valuations": valuations,
+    }
+    weights = weight_matrix(env.item_weights, n_agents, num_items)
+    for start in range(0, total, chunk_size):
+        stop = min(start + chunk_size, total)
+        _simulate_chunk(env, strategies, weights, valuations[start:stop], rng, out, start)
+    return out
+
+def _simulate_chunk(env, strategies, weights, vals, rng, out, offset):
+    B = len(vals)
+    n_agents, num_items, max_rounds = len(strategies), env.num_items, env.max_rounds
+    max_price = 10000.0
+    lag = max(env.history_lag, 1)
+
+    offers = np.zeros((B, max_rounds, num_items), dtype=np.float32)
+    standing = np.zeros((B, num_items), dtype=np.float32)
+    result = out["result"][offset:offset + B]
+    rewards = out["rewards"][offset:offset + B]
+    active = np.arange(B)
+
+    for r in range(max_rounds):
+        if len(active) == 0:
+            break
+        proposer = r % n_agents
+        history = np.zeros((len(active), lag, num_items), dtype=np.float32)
+        k = min(r, lag)
+        if k:
+            history[:, :k] = offers[active, r - k:r][:, ::-1]
+        types, prices = strategies[proposer](r, history, vals[active, proposer], rng)
+        types = np.asarray(types)
+
+        accept = types == ACCEPT
+        quit_ = types == QUIT
+        counter = ~(accept | quit_)
+
+        if accept.any():
+            idx = active[accept]
+            if r == 0:
+                # ACCEPT with no standing offer
+                rewards[idx, proposer] = -0.5
+                result[idx] = RESULT_INVALID_ACCEPT
+            else:
+                deal_prices = standing[idx]
+                rewards[idx] = settle_bundle(deal_prices, vals[idx], weights, env.role_signs, r, max_price)
+                result[idx] = RESULT_DEAL
+                out["deal_round"][offset + idx] = r
+                out["deal_prices"][offset + idx] = deal_prices
+            out["rounds"][offset + idx] = r
+
+        if quit_.any():
+            idx = active[quit_]
+            rewards[idx] = -0.1
+            result[idx] = RESULT_QUIT
+            out["rounds"][offset + idx] = r
+
+        idx = active[counter]
+        new_prices = np.clip(np.asarray(prices, dtype=np.float32)[counter], 0, max_price)
+        standing[idx] = new_prices
+        offers[idx, r] = new_prices
+        active = idx
+
+    # Whoever is still negotiating ran out of rounds on their last COUNTER
+    if len(active):
+        rewards[active] = -0.05
+        result[active] = RESULT_TIMEOUT
+        out["rounds"][offset + active] = max_rounds
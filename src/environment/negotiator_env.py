@@ -1,6 +1,44 @@
 import gymnasium as gym
 from pettingzoo import ParallelEnv
 import numpy as np
+import time
+from collections.abc import MutableMapping
+
+from src.environment.settlement import role_signs, weight_matrix, settle_bundle
+from src.environment.scenarios import ScenarioBank, sample_valuations
+from src.utils.telemetry import ENV_STEP_SECONDS
+
+_ENV_STEP_TIMER = ENV_STEP_SECONDS.labels()
+
+# Action types shared by every environment flavour
+ACCEPT, COUNTER, QUIT = 0, 1, 2
+
+# Episode outcome codes used by the array-based APIs
+RESULT_NONE, RESULT_DEAL, RESULT_QUIT, RESULT_INVALID_ACCEPT, RESULT_TIMEOUT = 0, 1, 2, 3, 4
+
+class _ValuationView(MutableMapping):
+    """
+    {agent: valuations} mapping backed by the env's (n_agents, num_items) valuation matrix.
+    Reads return row views; assignments write through and refresh the observation buffer.
+    """
+    def __init__(self, env):
+        self._env = env
+
+    def __getitem__(self, agent):
+        return self._env.valuation_matrix[self._env._agent_index[agent]]
+
+    def __setitem__(self, agent, values):
+        self._env.valuation_matrix[self._env._agent_index[agent]] = values
+        self._env._write_valuation_obs()
+
+    def __delitem__(self, agent):
+        raise TypeError("Agents cannot be removed from the valuation matrix")
+
+    def __iter__(self):
+        return iter(self._env.possible_agents)
+
+    def __len__(self):
+        return len(self._env.possible_agents)
 
 class NegotiatorEnv(ParallelEnv):
     metadata = {"render_modes": ["human"], "name": "negotiator_v1"}
@@ -41,13 +79,46 @@ class NegotiatorEnv(ParallelEnv):
         # [2*num_items + 1]: Who is proposing? (1=Me, 0=Opponent)
         # [2*num_items + 2:]: History lag (last N prices)
         obs_size = (self.num_items * 2) + 2 + (self.num_items * self.history_lag)
+        self.obs_size = obs_size
         self.observation_spaces = {
             agent: gym.spaces.Box(low=0, high=1, shape=(obs_size,), dtype=np.float32)
             for agent in self.possible_agents
         }
         
+        # Preallocated observation buffer: one float32 row per agent, returned as row views.
+        # Set "copy_obs" for callers that hold observations across steps.
+        self.copy_obs = self.config.get("copy_obs", False)
+        self._agent_index = {agent: i for i, agent in enumerate(self.possible_agents)}
+        self._obs_buf = np.zeros((len(self.possible_agents), obs_size), dtype=np.float32)
+        self._obs_views = {agent: self._obs_buf[i] for agent, i in self._agent_index.items()}
+        self._rewards = np.zeros(len(self.possible_agents), dtype=np.float64)
+        self._terminations = np.zeros(len(self.possible_agents), dtype=bool)
+        self._truncations = np.zeros(len(self.possible_agents), dtype=bool)
+        self._time_col = 2 * self.num_items
+        self._turn_col = 2 * self.num_items + 1
+        self._hist_col = 2 * self.num_items + 2
+        
         self.state = None
         self.item_weights = self.config.get("item_weights", [1.0] * self.num_items)
+        self.role_signs = role_signs(self.possible_agents)
+        
+        # Backward compatibility: 2-agent supplier/retailer mode exposes val_s / val_r
+        self._feasible_pair = None
+        if self._n_agents == 2 and "supplier" in self.possible_agents and "retailer" in self.possible_agents:
+            self._feasible_pair = (self._agent_index["supplier"], self._agent_index["retailer"])
+        
+        # Per-agent valuation bounds, drawn with the env's own seeded Generator
+        ranges = np.array([self._get_valuation_range(a) for a in self.possible_agents], dtype=np.float64)
+        self._val_low = ranges[:, 0:1]
+        self._val_high = ranges[:, 1:2]
+        self.np_random = None
+        
+        # Optional pre-sampled scenarios (ScenarioBank or path to a saved .npy bank)
+        self.scenario_bank = self.config.get("scenario_bank", None)
+        if isinstance(self.scenario_bank, str):
+            self.scenario_bank = ScenarioBank.load(self.scenario_bank)
+        if self.scenario_bank is not None:
+            self.scenario_bank.check_compatible(len(self.possible_agents), self.num_items)
     
     @property
     def agents(self):
@@ -88,39 +159,47 @@ class NegotiatorEnv(ParallelEnv):
         self.current_round = 0
         
         # 1. Initialize Valuations for all items and all agents
-        self.valuations = {}
-        for agent in self.possible_agents:
-            val_range = self._get_valuation_range(agent)
-            self.valuations[agent] = np.random.uniform(val_range[0], val_range[1], size=(self.num_items,))
-        
-        # Backward compatibility: Keep val_s and val_r for 2-agent mode
-        if self._n_agents == 2 and "supplier" in self.possible_agents and "retailer" in self.possible_agents:
-            self.val_s = self.valuations["supplier"]
-            self.val_r = self.valuations["retailer"]
-            
-            # Ensure feasible zone for each item
-            for i in range(self.num_items):
-                if self.val_s[i] > self.val_r[i]:
-                    self.val_s[i], self.val_r[i] = self.val_r[i], self.val_s[i]
-                    self.valuations["supplier"][i] = self.val_s[i]
-                    self.valuations["retailer"][i] = self.val_r[i]
+        if seed is not None or self.np_random is None:
+            self.np_random = np.random.default_rng(seed)
+        self.valuations = _ValuationView(self)
+        if self.scenario_bank is not None:
+            # O(1) draw from the bank; options={"scenario_index": i} replays a specific scenario
+            index = (options or {}).get("scenario_index")
+            if index is None:
+                index = self.np_random.integers(len(self.scenario_bank))
+            self.valuation_matrix = np.array(self.scenario_bank[index], dtype=np.float64)
+        else:
+            # Feasible zone per item is enforced in 2-agent mode (val_s <= val_r)
+            self.valuation_matrix = sample_valuations(
+                self.np_random, self._val_low, self._val_high, 1, self.num_items, self._feasible_pair
+            )[0]
         
         self.max_price = 10000.0
+        self._weights = weight_matrix(self.item_weights, len(self.possible_agents), self.num_items)
         
         # 2. Initialize State
         self.current_prices = np.zeros(self.num_items, dtype=np.float32)
         self.deal_prices = None
-        self.price_history = np.zeros((self.history_lag, self.num_items), dtype=np.float32)
+        # Price history ring: rows are written twice (head and head + lag) so the
+        # ordered window is always the contiguous slice [head, head + lag)
+        self._hist_ring = np.zeros((2 * self.history_lag, self.num_items), dtype=np.float32)
+        self._hist_head = 0
+        self._hist_dirty = True
         
-        # Round-robin turn assignment for N agents
-        self.current_proposer = self.possible_agents[0]
+        # Round-robin turn assignment for N agents (integer ids internally)
         self.proposal_order = self.possible_agents[:]  # Can be customized for coalitions later
+        self._order = [self._agent_index[a] for a in self.proposal_order]
+        self._turn = 0
+        self._proposer_idx = self._order[0]
+        self.last_result = RESULT_NONE
         
+        self._write_valuation_obs()
         observations = self._get_obs()
         infos = {agent: {} for agent in self.possible_agents}
         return observations, infos
 
     def step(self, actions):
+        """PettingZoo dict API: thin facade over step_arrays."""
         if not actions or not self.agents:
             return {}, {}, {}, {}, {}
 
@@ -133,16 +212,57 @@ class NegotiatorEnv(ParallelEnv):
             return self._get_obs(), {a:0.0 for a in self.possible_agents}, {a:False for a in self.possible_agents}, {a:False for a in self.possible_agents}, {a:{} for a in self.possible_agents}
 
         action = actions[agent_name]
-        action_type = action["type"] # 0: ACCEPT, 1: COUNTER, 2: QUIT
-        proposed_prices = np.array(action["price"], dtype=np.float32)
+        # Timed here only: step_arrays stays bare for trainers and the vectorized envs
+        started = time.perf_counter()
+        _, rewards, terminations, truncations, _ = self.step_arrays(action["type"], action["price"])
+        _ENV_STEP_TIMER.observe(time.perf_counter() - started)
+        
+        agents = self.possible_agents
+        infos = {a: {} for a in agents}
+        if self.last_result == RESULT_DEAL:
+            for a in agents:
+                infos[a]["result"] = "deal"
+            infos["deal_prices"] = self.deal_prices.tolist()
+        elif self.last_result == RESULT_QUIT:
+            infos = {a: {"result": "quit"} for a in agents}
         
-        rewards = {a: 0.0 for a in self.possible_agents}
-        terminations = {a: False for a in self.possible_agents}
-        truncations = {a: False for a in self.possible_agents}
-        infos = {a: {} for a in self.possible_agents}
+        # Note: In PettingZoo ParallelEnv, agents property is read-only
+        # No need to manually clear agents list on termination
+        
+        return (
+            self._get_obs(refresh=False),
+            dict(zip(agents, rewards.tolist())),
+            dict(zip(agents, terminations.tolist())),
+            dict(zip(agents, truncations.tolist())),
+            infos,
+        )
+
+    def step_arrays(self, action_type, prices):
+        """
+        Array-native step for custom trainers: the current proposer plays
+        action_type (0: ACCEPT, 1: COUNTER, 2: QUIT) with the given prices.
+
+        Returns (observations (n_agents, obs_size), rewards (n_agents,),
+        terminations (n_agents,), truncations (n_agents,), proposer index).
+        Arrays are reused between steps unless copy_obs is set; the outcome
+        code of the step is kept in self.last_result.
+
+        A COUNTER only writes one row of the price history ring; the ordered
+        history columns of the observations are rendered when they are read
+        (observation_array() or the dict API), so the per-step cost does not
+        grow with history_lag. With copy_obs the returned copy is complete.
+        """
+        agent_idx = self._proposer_idx
+        rewards = self._rewards
+        terminations = self._terminations
+        truncations = self._truncations
+        rewards.fill(0.0)
+        terminations.fill(False)
+        truncations.fill(False)
+        self.last_result = RESULT_NONE
         
         # --- LOGIC ---
-        if action_type == 0: # ACCEPT
+        if action_type == ACCEPT:
             # Agreement reached on PREVIOUS price?
             # If Round 0 (Supplier starts) and says ACCEPT -> Accept what?
             # Typically, Proposer makes an offer. ACCEPT is a response.
@@ -152,78 +272,139 @@ class NegotiatorEnv(ParallelEnv):
                 # Invalid accept at start. Penalize or treat as walkaway?
                 # Let's treat as "Accepting 0" (bad for supplier) or just Invalid.
                 # Simplification: Treat as Quit
-                terminations = {a: True for a in self.possible_agents}
-                rewards[agent_name] = -0.5
+                terminations.fill(True)
+                rewards[agent_idx] = -0.5
+                self.last_result = RESULT_INVALID_ACCEPT
             else:
-                self.deal_prices = self.current_prices
-                deal_prices = self.deal_prices
+                self.deal_prices = self.current_prices.copy()
                 
-                # Bundle Profit (weighted sum)
-                r_sup_total = 0
-                r_ret_total = 0
-                for i in range(self.num_items):
-                    r_sup_total += self.item_weights[i] * (deal_prices[i] - self.val_s[i]) / self.max_price
-                    r_ret_total += self.item_weights[i] * (self.val_r[i] - deal_prices[i]) / self.max_price
+                # Bundle Profit: discounted weighted surplus of every agent in one matrix op
+                rewards[:] = settle_bundle(
+                    self.deal_prices, self.valuation_matrix, self._weights,
+                    self.role_signs, self.current_round, self.max_price
+                )
                 
-                # Discount
-                discount = 0.99 ** self.current_round
-                rewards["supplier"] = r_sup_total * discount
-                rewards["retailer"] = r_ret_total * discount
-                
-                terminations = {a: True for a in self.possible_agents}
-                infos["supplier"]["result"] = "deal"
-                infos["retailer"]["result"] = "deal"
-                infos["deal_prices"] = deal_prices.tolist()
-
-        elif action_type == 2: # QUIT
-            rewards = {a: -0.1 for a in self.possible_agents}
-            terminations = {a: True for a in self.possible_agents}
-            infos = {a: {"result": "quit"} for a in self.possible_agents}
+                terminations.fill(True)
+                self.last_result = RESULT_DEAL
+
+        elif action_type == QUIT:
+            rewards.fill(-0.1)
+            terminations.fill(True)
+            self.last_result = RESULT_QUIT
             
         else: # COUNTER (Make a new offer)
             # Update Price
-            self.current_prices = np.clip(proposed_prices, 0, self.max_price)
+            np.clip(np.asarray(prices, dtype=np.float32), 0, self.max_price, out=self.current_prices)
             
             # Update History
-            self.price_history = np.roll(self.price_history, 1, axis=0)
-            self.price_history[0] = self.current_prices / self.max_price
+            self._push_history(self.current_prices)
             
             self.current_round += 1
             
             # Check Timeout
             if self.current_round >= self.max_rounds:
-                truncations = {a: True for a in self.possible_agents}
-                rewards = {a: -0.05 for a in self.possible_agents}
+                truncations.fill(True)
+                rewards.fill(-0.05)
+                self.last_result = RESULT_TIMEOUT
             else:
                 # Switch Turn: Round-robin through all agents
-                current_idx = self.proposal_order.index(self.current_proposer)
-                next_idx = (current_idx + 1) % len(self.proposal_order)
-                self.current_proposer = self.proposal_order[next_idx]
+                self._turn = (self._turn + 1) % len(self._order)
+                self._proposer_idx = self._order[self._turn]
 
-        observations = self._get_obs()
+        self._refresh_obs()
+        if self.copy_obs:
+            self._render_history()
+            return self._obs_buf.copy(), rewards.copy(), terminations.copy(), truncations.copy(), self._proposer_idx
+        return self._obs_buf, rewards, terminations, truncations, self._proposer_idx
+
+    @property
+    def current_proposer(self):
+        """Name of the agent whose turn it is."""
+        return self.possible_agents[self._proposer_idx]
+
+    @current_proposer.setter
+    def current_proposer(self, agent):
+        self._proposer_idx = self._agent_index[agent]
+        self._turn = self._order.index(self._proposer_idx)
+
+    @property
+    def val_s(self):
+        """Supplier valuations (2-agent supplier/retailer mode only)."""
+        if self._feasible_pair is None:
+            raise AttributeError("val_s is only defined in 2-agent supplier/retailer mode")
+        return self.valuation_matrix[self._feasible_pair[0]]
+
+    @val_s.setter
+    def val_s(self, values):
+        self.valuations["supplier"] = values
+
+    @property
+    def val_r(self):
+        """Retailer valuations (2-agent supplier/retailer mode only)."""
+        if self._feasible_pair is None:
+            raise AttributeError("val_r is only defined in 2-agent supplier/retailer mode")
+        return self.valuation_matrix[self._feasible_pair[1]]
+
+    @val_r.setter
+    def val_r(self, values):
+        self.valuations["retailer"] = values
+
+    @property
+    def price_history(self):
+        """Last history_lag normalized offers, most recent first (view into the ring)."""
+        return self._hist_ring[self._hist_head:self._hist_head + self.history_lag]
+
+    def _push_history(self, prices):
+        """O(num_items) ring write; replaces np.roll over the whole history matrix."""
+        lag = self.history_lag
+        if lag == 0:
+            return
+        head = (self._hist_head - 1) % lag
+        np.divide(prices, self.max_price, out=self._hist_ring[head])
+        self._hist_ring[head + lag] = self._hist_ring[head]
+        self._hist_head = head
+        self._hist_dirty = True
+
+    def _write_valuation_obs(self):
+        """Valuations are static for the episode: write their slice of the buffer once."""
+        np.divide(self.valuation_matrix, self.max_price, out=self._obs_buf[:, self.num_items:self._time_col])
+
+    def observation_array(self):
+        """(n_agents, obs_size) observations with the history columns up to date."""
+        self._render_history()
+        return self._obs_buf.copy() if self.copy_obs else self._obs_buf
+
+    def _get_obs(self, refresh=True):
+        """
+        Returns {agent: row view} of the observation buffer, or per-agent copies
+        when copy_obs is set.
+        """
+        if refresh:
+            self._refresh_obs()
+        self._render_history()
+        if self.copy_obs:
+            return {agent: row.copy() for agent, row in self._obs_views.items()}
+        return self._obs_views
+
+    def _refresh_obs(self):
+        """Refresh the per-step columns of the observation buffer in place (not the history)."""
+        buf = self._obs_buf
+        n = self.num_items
         
-        # Note: In PettingZoo ParallelEnv, agents property is read-only
-        # No need to manually clear agents list on termination
+        # Shared columns: prices, time and history are identical for every agent
+        np.divide(self.current_prices, self.max_price, out=buf[0, :n])
+        buf[1:, :n] = buf[0, :n]
+        buf[:, self._time_col] = self.current_round / self.max_rounds
         
-        return observations, rewards, terminations, truncations, infos
+        # Turn flag: 1 for the proposer, 0 for everyone else
+        buf[:, self._turn_col] = 0.0
+        buf[self._proposer_idx, self._turn_col] = 1.0
 
-    def _get_obs(self):
-        obs_dict = {}
-        for agent in self.possible_agents:
-            # Get this agent's valuation
-            my_vals = self.valuations.get(agent, np.zeros(self.num_items))
-            is_my_turn = 1.0 if self.current_proposer == agent else 0.0
-            
-            # Construct flattened observation vector
-            obs_parts = [
-                self.current_prices / self.max_price,       # num_items
-                my_vals / self.max_price,                    # num_items
-                np.array([self.current_round / self.max_rounds], dtype=np.float32), # 1
-                np.array([is_my_turn], dtype=np.float32),   # 1
-                self.price_history.flatten()                 # num_items * history_lag
-            ]
-            obs_dict[agent] = np.concatenate(obs_parts)
-        return obs_dict
+    def _render_history(self):
+        """Copy the ordered history window into every observation row, once per change."""
+        if self._hist_dirty:
+            self._obs_buf[:, self._hist_col:] = self.price_history.reshape(-1)
+            self._hist_dirty = False
 
     def render(self):
         prices_str = ", ".join([f"{p:.2f}" for p in self.current_prices])
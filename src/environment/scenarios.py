@@ -0,0 +1,69 @@
+import numpy as np
+
+def sample_valuations(rng, low, high, count, num_items, feasible_pair=None):
+    """
+    Draw `count` valuation matrices of shape (n_agents, num_items) in one call.
+
+    low/high: (n_agents, 1) bounds per agent, or (n_agents, num_items) bounds per item.
+    feasible_pair: optional (seller, buyer) row indices; their values are ordered
+    per item so the seller's cost never exceeds the buyer's value.
+    """
+    low = np.asarray(low, dtype=np.float64)
+    vals = rng.uniform(low, high, size=(count, low.shape[0], num_items))
+    if feasible_pair is not None:
+        s, r = feasible_pair
+        seller = np.minimum(vals[:, s], vals[:, r])
+        buyer = np.maximum(vals[:, s], vals[:, r])
+        vals[:, s], vals[:, r] = seller, buyer
+    return vals
+
+class ScenarioBank:
+    """
+    Pre-sampled bank of feasible valuation matrices, shape (num_scenarios, n_agents, num_items).
+
+    Resets draw a row in O(1) instead of sampling. Banks can be saved as .npy and
+    loaded memory-mapped, so large evaluation sweeps share one file across processes
+    and stay reproducible.
+    """
+    def __init__(self, valuations):
+        valuations = np.asanyarray(valuations)
+        if valuations.ndim != 3:
+            raise ValueError(f"Scenario bank must be 3-D (scenarios, agents, items), got shape {valuations.shape}")
+        self.valuations = valuations
+
+    @classmethod
+    def generate(cls, config=None, num_scenarios=10000, seed=None):
+        """Sample a bank for the given NegotiatorEnv config."""
+        from src.environment.negotiator_env import NegotiatorEnv
+        env = NegotiatorEnv(config)
+        rng = np.random.default_rng(seed)
+        return cls(sample_valuations(rng, env._val_low, env._val_high, num_scenarios, env.num_items, env._feasible_pair))
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        return cls(np.load(path, mmap_mode="r" if mmap else None))
+
+    def save(self, path):
+        np.save(path, np.ascontiguousarray(self.valuations))
+
+    @property
+    def shape(self):
+        return self.valuations.shape
+
+    def __len__(self):
+        return len(self.valuations)
+
+    def __getitem__(self, index):
+        return self.valuations[index]
+
+    def check_compatible(self, n_agents, num_items):
+        if self.valuations.shape[1:] != (n_agents, num_items):
+            raise ValueError(
+                f"Scenario bank holds {self.valuations.shape[1:]} matrices, env expects {(n_agents, num_items)}"
+            )
+
+    def draw(self, rng, count=None):
+        """Random scenario (or `count` scenarios) chosen with `rng`."""
+        if count is None:
+            return self.valuations[rng.integers(len(self.valuations))]
+        return self.valuations[rng.integers(len(self.valuations), size=count)]
@@ -0,0 +1,36 @@
+import numpy as np
+
+def role_signs(agents):
+    """
+    Direction of each agent's surplus in the deal price.
+    Suppliers profit from higher prices (+1), buyers/retailers from lower prices (-1).
+    """
+    return np.array([1.0 if "supplier" in agent.lower() else -1.0 for agent in agents])
+
+def weight_matrix(item_weights, n_agents, num_items):
+    """
+    Expand item weights to an (n_agents, num_items) matrix.
+    Accepts shared weights of shape (num_items,) or per-agent weights of shape (n_agents, num_items).
+    """
+    weights = np.asarray(item_weights, dtype=np.float64)
+    if weights.shape not in ((num_items,), (n_agents, num_items)):
+        raise ValueError(
+            f"item_weights must have shape ({num_items},) or ({n_agents}, {num_items}), got {weights.shape}"
+        )
+    return np.broadcast_to(weights, (n_agents, num_items))
+
+def settle_bundle(deal_prices, valuations, weights, signs, current_round, max_price=10000.0):
+    """
+    Discounted weighted bundle surplus of every agent for an agreed price vector.
+
+    deal_prices: (..., num_items)
+    valuations: (..., n_agents, num_items)
+    weights: (n_agents, num_items), signs: (n_agents,)
+    current_round: scalar or (...,) round of agreement, discounted by 0.99 ** round
+
+    Returns rewards of shape (..., n_agents).
+    """
+    deal_prices = np.asarray(deal_prices)
+    surplus = (deal_prices[..., None, :] - valuations) * signs[:, None]
+    discount = 0.99 ** np.asarray(current_round, dtype=np.float64)
+    return (surplus * weights).sum(axis=-1) / max_price * discount[..., None]
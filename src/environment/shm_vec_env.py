@@ -0,0 +1,215 @@
+import multiprocessing as mp
+import traceback
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from src.environment.vec_negotiator_env import VecNegotiatorEnv
+
+def _buffer_specs(num_envs, n_agents, num_items, obs_size):
+    """(name, shape, dtype) of every array exchanged between the pool and its workers."""
+    return [
+        ("action_type", (num_envs,), np.int64),
+        ("prices", (num_envs, num_items), np.float32),
+        ("observations", (num_envs, n_agents, obs_size), np.float32),
+        ("rewards", (num_envs, n_agents), np.float64),
+        ("terminations", (num_envs,), np.bool_),
+        ("truncations", (num_envs,), np.bool_),
+        ("result", (num_envs,), np.int8),
+        ("deal_prices", (num_envs, num_items), np.float32),
+        ("episode_rounds", (num_envs,), np.int64),
+        ("final_observation", (num_envs, n_agents, obs_size), np.float32),
+    ]
+
+def _attach(specs, shm_names):
+    blocks, arrays = [], {}
+    for (name, shape, dtype), shm_name in zip(specs, shm_names):
+        block = shared_memory.SharedMemory(name=shm_name)
+        blocks.append(block)
+        arrays[name] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+    return blocks, arrays
+
+def _worker(remote, parent_remote, config, start, stop, specs, shm_names):
+    """Runs one VecNegotiatorEnv slice; only short commands travel through the pipe."""
+    parent_remote.close()
+    blocks, arrays = _attach(specs, shm_names)
+    env = VecNegotiatorEnv(config, num_envs=stop - start)
+    own = {name: array[start:stop] for name, array in arrays.items()}
+    try:
+        while True:
+            cmd, data = remote.recv()
+            if cmd == "step":
+                obs, rewards, terms, truncs, infos = env.step(own["action_type"], own["prices"])
+                own["observations"][:] = obs
+                own["rewards"][:] = rewards
+                own["terminations"][:] = terms
+                own["truncations"][:] = truncs
+                own["result"][:] = infos["result"]
+                own["deal_prices"][:] = infos["deal_prices"]
+                own["episode_rounds"][:] = infos["episode_rounds"]
+                own["final_observation"][:] = infos["final_observation"]
+                remote.send(("ok", None))
+            elif cmd == "reset":
+                obs, _ = env.reset(seed=data)
+                own["observations"][:] = obs
+                remote.send(("ok", None))
+            elif cmd == "close":
+                remote.send(("ok", None))
+                break
+            else:
+                remote.send(("error", f"Unknown command: {cmd}"))
+    except KeyboardInterrupt:
+        pass
+    except Exception:
+        remote.send(("error", traceback.format_exc()))
+    finally:
+        del own, arrays
+        for block in blocks:
+            block.close()
+        remote.close()
+
+class SharedMemoryVecEnv:
+    """
+    Worker pool over VecNegotiatorEnv slices that uses every core for rollouts.
+
+    The batch of `num_envs` negotiations is split into contiguous slices, one per
+    subprocess. Actions, observations, rewards and infos live in
+    multiprocessing.shared_memory buffers; the pipes only carry short commands, so
+    nothing is pickled per step. Use step() synchronously, or step_async() /
+    step_wait() to overlap policy work with env stepping.
+
+    Returned arrays are views of the shared buffers and are overwritten by the next step.
+    """
+    def __init__(self, config=None, num_envs=4096, num_workers=None, context=None):
+        probe = VecNegotiatorEnv(config, num_envs=1)
+        self.config = probe.config
+        self.num_envs = num_envs
+        self.num_items = probe.num_items
+        self.possible_agents = probe.possible_agents
+        self.n_agents = probe.n_agents
+        self.obs_size = probe.obs_size
+        self.num_workers = min(num_workers or mp.cpu_count(), num_envs)
+
+        specs = _buffer_specs(num_envs, self.n_agents, self.num_items, self.obs_size)
+        self._blocks = []
+        for _, shape, dtype in specs:
+            nbytes = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+            self._blocks.append(shared_memory.SharedMemory(create=True, size=nbytes))
+        shm_names = [block.name for block in self._blocks]
+        self._arrays = {
+            name: np.ndarray(shape, dtype=dtype, buffer=block.buf)
+            for (name, shape, dtype), block in zip(specs, self._blocks)
+        }
+
+        ctx = mp.get_context(context)
+        bounds = np.linspace(0, num_envs, self.num_workers + 1).astype(int)
+        self._remotes, self._processes = [], []
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            remote, work_remote = ctx.Pipe()
+            process = ctx.Process(
+                target=_worker,
+                args=(work_remote, remote, self.config, int(start), int(stop), specs, shm_names),
+                daemon=True,
+            )
+            process.start()
+            work_remote.close()
+            self._remotes.append(remote)
+            self._processes.append(process)
+
+        self._waiting = False
+        self.closed = False
+
+    def _broadcast(self, cmd, data=None):
+        for remote in self._remotes:
+            remote.send((cmd, data))
+
+    def _gather(self):
+        """Read one reply from every worker, then raise the first error (no reply is left unread)."""
+        self._waiting = False
+        errors = []
+        for remote in self._remotes:
+            status, detail = remote.recv()
+            if status != "ok":
+                errors.append(detail)
+        if errors:
+            raise RuntimeError(f"SharedMemoryVecEnv worker failed:\n{errors[0]}")
+
+    def reset(self, seed=None, options=None):
+        """Reset every worker; worker i is seeded with seed + i."""
+        for i, remote in enumerate(self._remotes):
+            remote.send(("reset", None if seed is None else seed + i))
+        self._gather()
+        return self._arrays["observations"], {}
+
+    def step_async(self, action_type, prices):
+        """Publish actions to shared memory and start every worker."""
+        if self._waiting:
+            raise RuntimeError("step_async called while a step is already pending")
+        np.copyto(self._arrays["action_type"], action_type, casting="unsafe")
+        np.copyto(self._arrays["prices"], np.reshape(prices, (self.num_envs, self.num_items)), casting="unsafe")
+        self._broadcast("step")
+        self._waiting = True
+
+    def step_wait(self):
+        """Block until every worker finished; same return layout as VecNegotiatorEnv.step."""
+        if not self._waiting:
+            raise RuntimeError("step_wait called without a pending step_async")
+        self._gather()
+        a = self._arrays
+        infos = {
+            "result": a["result"],
+            "deal_prices": a["deal_prices"],
+            "episode_rounds": a["episode_rounds"],
+            "final_observation": a["final_observation"],
+        }
+        return a["observations"], a["rewards"], a["terminations"], a["truncations"], infos
+
+    def step(self, action_type, prices):
+        self.step_async(action_type, prices)
+        return self.step_wait()
+
+    def close(self):
+        """Stop the workers and free the shared memory, even if a worker has died."""
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            if self._waiting:
+                try:
+                    self._gather()
+                except (EOFError, OSError, RuntimeError):
+                    pass
+                self._waiting = False
+            for remote in self._remotes:
+                try:
+                    remote.send(("close", None))
+                    remote.recv()
+                except (EOFError, OSError):
+                    # Worker already gone
+                    pass
+                remote.close()
+            for process in self._processes:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+                    process.join(timeout=1)
+        finally:
+            self._arrays = {}
+            for block in self._blocks:
+                block.close()
+                try:
+                    block.unlink()
+                except FileNotFoundError:
+                    pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
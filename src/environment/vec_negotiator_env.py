@@ -0,0 +1,234 @@
+import numpy as np
+
+from src.environment.negotiator_env import (
+    NegotiatorEnv,
+    ACCEPT, QUIT,
+    RESULT_NONE, RESULT_DEAL, RESULT_QUIT, RESULT_INVALID_ACCEPT, RESULT_TIMEOUT,
+)
+from src.environment.settlement import weight_matrix, settle_bundle
+from src.environment.scenarios import sample_valuations
+
+class VecNegotiatorEnv:
+    """
+    Batched NegotiatorEnv that steps `num_envs` independent negotiations per call.
+
+    All state is kept as struct-of-arrays with a leading batch dimension B, so a
+    step is a handful of NumPy operations regardless of how many negotiations run.
+    Semantics match NegotiatorEnv.step slot by slot; finished slots are reset
+    automatically and their last observation is kept in infos["final_observation"].
+
+    Returned arrays are internal buffers that are overwritten by the next call.
+    Valuations and rewards are float64 like NegotiatorEnv's, so slot results
+    match the single env exactly. Price history uses the single env's ring
+    design, with one head pointer per slot: a COUNTER writes one row, and the
+    ordered window is rendered into the observations of the slots that changed.
+    """
+    def __init__(self, config=None, num_envs=1024):
+        # Reuse the single env for config parsing, roles and spaces
+        template = NegotiatorEnv(config)
+        self.config = template.config
+        self.num_envs = num_envs
+        self.num_items = template.num_items
+        self.max_rounds = template.max_rounds
+        self.history_lag = template.history_lag
+        self.possible_agents = template.possible_agents
+        self.n_agents = len(self.possible_agents)
+        self.observation_spaces = template.observation_spaces
+        self.action_spaces = template.action_spaces
+        self.max_price = 10000.0
+        self.obs_size = (self.num_items * 2) + 2 + (self.num_items * self.history_lag)
+
+        self._val_low = template._val_low
+        self._val_high = template._val_high
+        self.scenario_bank = template.scenario_bank
+
+        self.role_signs = template.role_signs
+        self.item_weights = template.item_weights
+        self._weights = weight_matrix(self.item_weights, self.n_agents, self.num_items)
+
+        # Backward compatibility: 2-agent supplier/retailer mode guarantees a feasible zone per item
+        self._feasible_pair = template._feasible_pair
+
+        B = num_envs
+        self.valuations = np.zeros((B, self.n_agents, self.num_items), dtype=np.float64)
+        self.current_prices = np.zeros((B, self.num_items), dtype=np.float32)
+        # Rows are written twice (head and head + lag): slot b's ordered window is
+        # ring[b, head[b]:head[b] + lag]
+        self._hist_ring = np.zeros((B, 2 * self.history_lag, self.num_items), dtype=np.float32)
+        self._hist_head = np.zeros(B, dtype=np.int64)
+        self._hist_offsets = np.arange(self.history_lag)
+        self.current_round = np.zeros(B, dtype=np.int64)
+        self.proposer = np.zeros(B, dtype=np.int64)
+
+        self._obs = np.zeros((B, self.n_agents, self.obs_size), dtype=np.float32)
+        self._final_obs = np.zeros_like(self._obs)
+        self._rewards = np.zeros((B, self.n_agents), dtype=np.float64)
+        self._terminations = np.zeros(B, dtype=bool)
+        self._truncations = np.zeros(B, dtype=bool)
+        self._result = np.zeros(B, dtype=np.int8)
+        self._deal_prices = np.full((B, self.num_items), np.nan, dtype=np.float32)
+        self._episode_rounds = np.zeros(B, dtype=np.int64)
+        self._batch_idx = np.arange(B)
+
+        self.np_random = None
+
+    def _sample_valuations(self, count):
+        if self.scenario_bank is not None:
+            return self.scenario_bank.draw(self.np_random, count)
+        return sample_valuations(
+            self.np_random, self._val_low, self._val_high, count, self.num_items, self._feasible_pair
+        )
+
+    def _reset_slots(self, idx):
+        self.valuations[idx] = self._sample_valuations(len(idx))
+        self.current_prices[idx] = 0.0
+        self._hist_ring[idx] = 0.0
+        self._hist_head[idx] = 0
+        self.current_round[idx] = 0
+        self.proposer[idx] = 0
+
+    def ordered_history(self, idx):
+        """(len(idx), history_lag, num_items) normalized offers of slots `idx`, most recent first."""
+        rows = self._hist_head[idx][:, None] + self._hist_offsets
+        return self._hist_ring[np.asarray(idx)[:, None], rows]
+
+    @property
+    def price_history(self):
+        """Ordered history of every slot (a copy rendered from the ring)."""
+        return self.ordered_history(self._batch_idx)
+
+    def _push_history(self, idx, prices):
+        """One ring row per slot in `idx`; replaces shifting the whole window."""
+        lag = self.history_lag
+        if lag == 0:
+            return
+        head = (self._hist_head[idx] - 1) % lag
+        row = prices / self.max_price
+        self._hist_ring[idx, head] = row
+        self._hist_ring[idx, head + lag] = row
+        self._hist_head[idx] = head
+
+    def _render_history(self, idx):
+        if self.history_lag and len(idx):
+            self._obs[idx, :, 2 * self.num_items + 2:] = self.ordered_history(idx).reshape(len(idx), 1, -1)
+
+    def _render_obs(self, idx=None):
+        """Every column but the history, which _render_history writes for the slots that changed."""
+        n = self.num_items
+        if idx is None:
+            obs, B = self._obs, self.num_envs
+            prices, vals = self.current_prices, self.valuations
+            rounds, proposer = self.current_round, self.proposer
+        else:
+            B = len(idx)
+            obs = np.empty((B, self.n_agents, 2 * n + 2), dtype=np.float32)
+            prices, vals = self.current_prices[idx], self.valuations[idx]
+            rounds, proposer = self.current_round[idx], self.proposer[idx]
+
+        obs[:, :, :n] = (prices / self.max_price)[:, None, :]
+        obs[:, :, n:2 * n] = vals / self.max_price
+        obs[:, :, 2 * n] = (rounds / self.max_rounds)[:, None]
+        obs[:, :, 2 * n + 1] = 0.0
+        obs[np.arange(B), proposer, 2 * n + 1] = 1.0
+
+        if idx is not None:
+            self._obs[idx, :, :2 * n + 2] = obs
+
+    def reset(self, seed=None, options=None):
+        """Reset every slot. Returns (observations (B, n_agents, obs_size), infos)."""
+        if seed is not None or self.np_random is None:
+            self.np_random = np.random.default_rng(seed)
+        self._reset_slots(self._batch_idx)
+        self._render_obs()
+        self._render_history(self._batch_idx)
+        return self._obs, {}
+
+    def step(self, action_type, prices):
+        """
+        Apply one action per slot, taken by that slot's current proposer.
+
+        action_type: (B,) ints (0: ACCEPT, 1: COUNTER, 2: QUIT)
+        prices: (B, num_items) proposed prices, used by COUNTER only
+
+        Returns (observations, rewards, terminations, truncations, infos) where
+        rewards is (B, n_agents) and the flags are (B,) booleans shared by all agents.
+        """
+        action_type = np.asarray(action_type)
+        prices = np.asarray(prices, dtype=np.float32).reshape(self.num_envs, self.num_items)
+        batch = self._batch_idx
+
+        rewards = self._rewards
+        rewards.fill(0.0)
+        result = self._result
+        result.fill(RESULT_NONE)
+        self._deal_prices.fill(np.nan)
+
+        accept = action_type == ACCEPT
+        quit_ = action_type == QUIT
+        counter = ~(accept | quit_)
+        opening = self.current_round == 0
+
+        # ACCEPT on the opening move has nothing to accept: penalize the proposer
+        invalid = accept & opening
+        if invalid.any():
+            rewards[batch[invalid], self.proposer[invalid]] = -0.5
+            result[invalid] = RESULT_INVALID_ACCEPT
+
+        # ACCEPT settles the bundle at the standing offer
+        deal = accept & ~opening
+        if deal.any():
+            deal_prices = self.current_prices[deal]
+            rewards[deal] = settle_bundle(
+                deal_prices, self.valuations[deal], self._weights,
+                self.role_signs, self.current_round[deal], self.max_price
+            )
+            self._deal_prices[deal] = deal_prices
+            result[deal] = RESULT_DEAL
+
+        if quit_.any():
+            rewards[quit_] = -0.1
+            result[quit_] = RESULT_QUIT
+
+        # COUNTER: new standing offer, one history ring row, advance the clock
+        counter_idx = batch[counter]
+        if len(counter_idx):
+            new_prices = np.clip(prices[counter], 0, self.max_price)
+            self.current_prices[counter] = new_prices
+            self._push_history(counter_idx, new_prices)
+            self.current_round[counter] += 1
+
+            timeout = counter & (self.current_round >= self.max_rounds)
+            rewards[timeout] = -0.05
+            result[timeout] = RESULT_TIMEOUT
+
+            rotate = counter & ~timeout
+            self.proposer[rotate] = (self.proposer[rotate] + 1) % self.n_agents
+
+        terminations = self._terminations
+        np.logical_or(invalid | deal, quit_, out=terminations)
+        truncations = self._truncations
+        np.equal(result, RESULT_TIMEOUT, out=truncations)
+
+        self._render_obs()
+        # Only slots that countered have a new history window
+        self._render_history(counter_idx)
+
+        done = terminations | truncations
+        self._episode_rounds[:] = self.current_round
+        if done.any():
+            done_idx = batch[done]
+            self._final_obs[done_idx] = self._obs[done_idx]
+            self._reset_slots(done_idx)
+            self._render_obs(done_idx)
+            self._render_history(done_idx)
+
+        infos = {
+            "result": result,
+            "deal_prices": self._deal_prices,
+            "episode_rounds": self._episode_rounds,
+            "final_observation": self._final_obs,
+        }
+        return self._obs, rewards, terminations, truncations, infos
+
+    def close(self):
+        pass
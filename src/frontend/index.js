@@ -10,6 +10,12 @@ const btnCounter = document.getElementById('btn-counter');
 const btnAccept = document.getElementById('btn-accept');
 const sessionList = document.getElementById('session-list');
 const displaySessionId = document.getElementById('display-session-id');
+const replayControls = document.getElementById('replay-controls');
+const replayPlay = document.getElementById('replay-play');
+const replaySeek = document.getElementById('replay-seek');
+const replayPosition = document.getElementById('replay-position');
+const replaySpeed = document.getElementById('replay-speed');
+const replayExit = document.getElementById('replay-exit');
 
 const ctx = document.getElementById('convergence-chart').getContext('2d');
 
@@ -85,7 +91,10 @@ function typeWriter(element, text, speed = 20) {
     type();
 }
 
-function addMessage(agent, text, action) {
+// Messages being streamed (message_delta frames), keyed by round and agent
+let streamingMessages = {};
+
+function addMessage(agent, text, action, streaming = false) {
     const msgDiv = document.createElement('div');
     msgDiv.className = `message ${agent}`;
 
@@ -94,7 +103,9 @@ function addMessage(agent, text, action) {
     meta.innerText = `${agent.toUpperCase()} | ${action}`;
 
     const content = document.createElement('div');
-    if (text) {
+    if (streaming) {
+        content.innerText = text;
+    } else if (text) {
         typeWriter(content, text);
     } else {
         content.innerText = action === "ACCEPT" ? "Deal accepted!" : "Negotiation ended.";
@@ -104,13 +115,32 @@ function addMessage(agent, text, action) {
     msgDiv.appendChild(content);
     chatStream.appendChild(msgDiv);
     chatStream.scrollTop = chatStream.scrollHeight;
+    return content;
+}
+
+function appendMessageDelta(data) {
+    const key = `${data.round}:${data.agent}`;
+    const content = streamingMessages[key];
+    if (content) {
+        content.innerText += data.delta;
+        chatStream.scrollTop = chatStream.scrollHeight;
+    } else {
+        streamingMessages[key] = addMessage(data.agent, data.delta, 'COUNTER', true);
+    }
 }
 
 function updateStats(data) {
     if (data.type === 'init') {
+        initChart(data.num_items || 1);
+        streamingMessages = {};
         if (data.session_id) {
             displaySessionId.innerText = data.session_id.toUpperCase();
         }
+        if (data.replay) {
+            replaySeek.max = data.num_turns || 0;
+            replaySpeed.value = String(data.speed || 1);
+            setReplayPosition(0);
+        }
 
         // Handle array or scalar valuations
         if (Array.isArray(data.val_s)) {
@@ -130,20 +160,31 @@ function updateStats(data) {
         document.getElementById('current-round').innerText = `${data.round} / 10`;
         document.getElementById('agreement-status').innerText = 'NEGOTIATING';
 
-        // Update Chart with prices (can be array or scalar)
-        chartData.labels.push(`R${data.round}`);
-        if (Array.isArray(data.price)) {
-            data.price.forEach((p, i) => {
-                if (chartData.datasets[i]) chartData.datasets[i].data.push(p);
-            });
-        } else {
-            chartData.datasets[0].data.push(data.price);
+        // Update Chart with prices (can be array or scalar); replays draw the overview instead
+        if (!replayOverview) {
+            chartData.labels.push(`R${data.round}`);
+            if (Array.isArray(data.price)) {
+                data.price.forEach((p, i) => {
+                    if (chartData.datasets[i]) chartData.datasets[i].data.push(p);
+                });
+            } else {
+                chartData.datasets[0].data.push(data.price);
+            }
+            chart.update();
         }
-        chart.update();
 
-        // Update Chat
-        addMessage(data.agent, data.message, data.action);
+        // Update Chat: a streamed message is already on screen, just settle its final text
+        const key = `${data.round}:${data.agent}`;
+        if (streamingMessages[key]) {
+            streamingMessages[key].innerText = data.message;
+            delete streamingMessages[key];
+        } else {
+            addMessage(data.agent, data.message, data.action);
+        }
         manualMessage.value = "";
+        if (isReplayMode) setReplayPosition(data.index + 1);
+    } else if (data.type === 'message_delta') {
+        appendMessageDelta(data);
     } else if (data.type === 'wait_for_human') {
         document.getElementById('agreement-status').innerText = `WAITING FOR ${data.agent.toUpperCase()}`;
         hitlControls.style.display = 'block';
@@ -159,25 +200,36 @@ function updateStats(data) {
             hitlControls.style.display = 'none';
             if (socket) socket.close();
             fetchSessions(); // Refresh history
+        } else {
+            // The replay socket stays open so the user can seek back or play again
+            replayEnded = true;
+            updateReplayControls();
         }
         document.getElementById('agreement-status').innerText = data.deal_price ? 'DEAL REACHED' : 'FAILED';
         document.getElementById('agreement-status').style.color = data.deal_price ? '#00ff00' : '#ff4b2b';
     }
 }
 
-async function fetchSessions() {
+let sessionsCursor = null;
+
+async function fetchSessions(append = false) {
     try {
-        const resp = await fetch('/api/sessions');
-        const sessions = await resp.json();
-        renderSessions(sessions);
+        const params = new URLSearchParams({ limit: 25 });
+        if (append && sessionsCursor) params.set('cursor', sessionsCursor);
+        const resp = await fetch(`/api/sessions?${params}`);
+        const page = await resp.json();
+        sessionsCursor = page.next_cursor;
+        renderSessions(page.sessions, append);
     } catch (e) {
         console.error("Failed to fetch sessions", e);
     }
 }
 
-function renderSessions(sessions) {
-    sessionList.innerHTML = '';
-    if (sessions.length === 0) {
+function renderSessions(sessions, append = false) {
+    if (!append) sessionList.innerHTML = '';
+    const more = sessionList.querySelector('.history-more');
+    if (more) more.remove();
+    if (!append && sessions.length === 0) {
         sessionList.innerHTML = '<div style="font-size: 0.8rem; opacity: 0.5;">No history yet.</div>';
         return;
     }
@@ -194,60 +246,138 @@ function renderSessions(sessions) {
         item.onclick = () => replaySession(s.id);
         sessionList.appendChild(item);
     });
+    if (sessionsCursor) {
+        const loadMore = document.createElement('div');
+        loadMore.className = 'history-item history-more';
+        loadMore.innerText = 'Load more...';
+        loadMore.onclick = () => fetchSessions(true);
+        sessionList.appendChild(loadMore);
+    }
+}
+
+// Server-side replay: turns stream from storage; the chart is drawn from a downsampled overview
+const REPLAY_OVERVIEW_POINTS = 200;
+let replayOverview = false;
+
+function drawOverview(data) {
+    chartData.labels = data.round.map(r => `R${r}`);
+    chartData.datasets.forEach((ds, i) => {
+        ds.data = data.price.map(p => p[i]);
+    });
+    chart.update();
+    replayOverview = true;
+}
+
+function replayControl(message) {
+    if (isReplayMode && socket && socket.readyState === WebSocket.OPEN) {
+        socket.send(JSON.stringify(message));
+    }
+}
+
+// Replay transport state: the server keeps playing until paused, and waits for a seek at the end
+let replayPaused = false;
+let replayEnded = false;
+let replayDragging = false;
+
+function setReplayPosition(index) {
+    if (!replayDragging) replaySeek.value = index;
+    replayPosition.innerText = `${index} / ${replaySeek.max}`;
+}
+
+function updateReplayControls() {
+    replayPlay.innerText = replayEnded ? 'REPLAY' : (replayPaused ? 'PLAY' : 'PAUSE');
+    const badge = document.querySelector('.replay-badge');
+    if (badge) badge.innerText = replayPaused ? 'REPLAY PAUSED' : 'REPLAY MODE';
 }
 
-async function replaySession(sessionId) {
+replayPlay.addEventListener('click', () => {
+    if (replayEnded) {
+        // Start over from the first turn
+        replayControl({ type: 'seek', index: 0 });
+        replayPaused = false;
+        replayControl({ type: 'resume' });
+    } else {
+        replayPaused = !replayPaused;
+        replayControl({ type: replayPaused ? 'pause' : 'resume' });
+    }
+    updateReplayControls();
+});
+
+replaySeek.addEventListener('input', () => {
+    replayDragging = true;
+    replayPosition.innerText = `${replaySeek.value} / ${replaySeek.max}`;
+});
+
+replaySeek.addEventListener('change', () => {
+    replayDragging = false;
+    replayControl({ type: 'seek', index: parseInt(replaySeek.value, 10) });
+});
+
+replaySpeed.addEventListener('change', () => {
+    replayControl({ type: 'set_speed', value: parseFloat(replaySpeed.value) });
+});
+
+replayExit.addEventListener('click', () => {
+    if (isReplayMode && socket) socket.close();
+});
+
+function replaySession(sessionId, speed = 1.0) {
     if (socket && socket.readyState === WebSocket.OPEN) socket.close();
     isReplayMode = true;
+    replayOverview = false;
     startBtn.disabled = true;
     startBtn.innerText = 'REPLAYING...';
     chatStream.innerHTML = '';
 
-    // Add replay badge
+    // Add replay badge and show the transport controls
     let badge = document.querySelector('.replay-badge');
     if (!badge) {
         badge = document.createElement('div');
         badge.className = 'replay-badge';
-        badge.innerText = 'REPLAY MODE';
         document.querySelector('.viz-area').appendChild(badge);
     }
-
-    try {
-        const resp = await fetch(`/api/sessions/${sessionId}`);
-        const data = await resp.json();
-
-        // Init
-        updateStats({
-            type: 'init',
-            val_s: data.initial_state.val_s,
-            val_r: data.initial_state.val_r,
-            num_items: data.config.num_items
-        });
-
-        // Play turns
-        for (const turn of data.turns) {
-            await new Promise(r => setTimeout(r, 800));
-            updateStats(turn);
+    replayPaused = false;
+    replayEnded = false;
+    replayDragging = false;
+    replaySpeed.value = String(speed);
+    replayControls.style.display = 'flex';
+    updateReplayControls();
+
+    const replaySocket = new WebSocket(
+        `ws://${window.location.host}/ws/replay/${encodeURIComponent(sessionId)}?speed=${speed}&overview=${REPLAY_OVERVIEW_POINTS}`
+    );
+    socket = replaySocket;
+
+    replaySocket.onmessage = (event) => {
+        const data = JSON.parse(event.data);
+        if (data.type === 'overview') {
+            drawOverview(data);
+        } else if (data.type === 'seek') {
+            chatStream.innerHTML = '';
+            streamingMessages = {};
+            replayEnded = false;
+            setReplayPosition(data.index);
+            updateReplayControls();
+        } else if (data.type === 'error') {
+            console.error("Replay failed", data.message);
+            replaySocket.close();
+        } else {
+            updateStats(data);
         }
+    };
 
-        // End
-        updateStats({
-            type: 'end',
-            deal_price: data.deal_price,
-            final_rewards: data.final_rewards
-        });
-
-    } catch (e) {
-        console.error("Replay failed", e);
-    } finally {
+    replaySocket.onclose = () => {
+        if (socket !== replaySocket) return;
         startBtn.disabled = false;
         startBtn.innerText = 'START LIVE SESSION';
         isReplayMode = false;
+        replayOverview = false;
+        replayControls.style.display = 'none';
         // Option to clear badge
         setTimeout(() => {
             if (!isReplayMode && badge) badge.remove();
         }, 3000);
-    }
+    };
 }
 
 startBtn.addEventListener('click', () => {
@@ -260,7 +390,9 @@ startBtn.addEventListener('click', () => {
     if (badge) badge.remove();
 
     // Reset chart will be handled in 'init' message handler
-    socket = new WebSocket(`ws://${window.location.host}/ws/negotiate`);
+    // Pacing preset (turbo, fast, normal, slow) can be chosen with ?pacing= on the page URL
+    const pacing = new URLSearchParams(window.location.search).get('pacing') || 'normal';
+    socket = new WebSocket(`ws://${window.location.host}/ws/negotiate?pacing=${encodeURIComponent(pacing)}`);
 
     socket.onopen = () => {
         connStatus.innerText = 'API CONNECTED';
@@ -310,5 +442,41 @@ btnAccept.addEventListener('click', () => {
     }
 });
 
+// Watch a live session read-only: open the page with ?spectate=<session_id>
+function spectateSession(sessionId) {
+    isReplayMode = false;
+    chatStream.innerHTML = '';
+    startBtn.disabled = true;
+    startBtn.innerText = 'SPECTATING...';
+
+    socket = new WebSocket(`ws://${window.location.host}/ws/spectate/${encodeURIComponent(sessionId)}`);
+
+    socket.onopen = () => {
+        connStatus.innerText = 'SPECTATING';
+        connStatus.style.background = 'rgba(0, 255, 0, 0.1)';
+        connStatus.style.color = '#00ff00';
+    };
+
+    socket.onmessage = (event) => {
+        const data = JSON.parse(event.data);
+        if (data.type === 'error') {
+            console.log("SERVER:", data.message);
+            startBtn.disabled = false;
+            startBtn.innerText = 'START LIVE SESSION';
+            return;
+        }
+        updateStats(data);
+    };
+
+    socket.onclose = () => {
+        connStatus.innerText = 'API DISCONNECTED';
+        connStatus.style.background = 'rgba(255, 0, 0, 0.1)';
+        connStatus.style.color = '#ff4b2b';
+    };
+}
+
 initChart(1);
 fetchSessions();
+
+const spectateId = new URLSearchParams(window.location.search).get('spectate');
+if (spectateId) spectateSession(spectateId);
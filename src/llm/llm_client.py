@@ -1,46 +1,232 @@
 import aiohttp
+import asyncio
 import json
 import logging
 import numpy as np
+import time
+
+from src.utils.telemetry import LLM_REQUEST_SECONDS, LLM_ERRORS, LLM_CACHE_LOOKUPS, LLM_FIRST_TOKEN_SECONDS
 
 class LLMClient:
     """
     Client for interacting with local Ollama API for natural language negotiation.
+
+    The client owns one pooled aiohttp session (keep-alive connections, bounded by
+    max_connections / max_connections_per_host), created on first use. One instance
+    can be shared by every HybridAgent in a process; pass `model` per call to serve
+    agents on different models. Close it with `await client.aclose()` or use it as
+    an async context manager.
+
+    With a ResponseCache, successful responses are reused for prompts with the same
+    normalized fingerprint (model, system prompt, prompt with bucketed prices).
     """
-    def __init__(self, base_url="http://localhost:11434", model="llama3", mock_mode=False):
+    def __init__(self, base_url="http://localhost:11434", model="llama3", mock_mode=False,
+                 max_connections=100, max_connections_per_host=32,
+                 connect_timeout=5.0, read_timeout=60.0, keepalive_timeout=30.0, cache=None):
         self.base_url = base_url
+        self.cache = cache
         self.model = model
         self.mock_mode = mock_mode
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.keepalive_timeout = keepalive_timeout
+        # total=None: long generations are bounded by the gap between reads, not overall time
+        self.timeout = aiohttp.ClientTimeout(total=None, connect=connect_timeout, sock_read=read_timeout)
         self.logger = logging.getLogger(__name__)
+        self._session = None
+        self._session_loop = None
 
-    async def generate_response(self, prompt: str, system_prompt: str = None) -> str:
-        """
-        Generates a negotiation message based on the strategic offer and persona.
-        """
-        if self.mock_mode:
-            return f"[Mock LLM Response for ${self.model}] Based on our internal valuation, this offer is the best we can do today."
+    async def _get_session(self):
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            # Sessions are bound to the loop that created them; close the one left on another loop
+            if self._session is not None and not self._session.closed:
+                await self._close_stale_session(self._session, self._session_loop)
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+            self._session_loop = loop
+        return self._session
+
+    async def _close_stale_session(self, session, loop):
+        if loop is not None and loop.is_running():
+            # Still serving another thread: close it there
+            await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(session.close(), loop))
+        else:
+            # Its loop is gone (e.g. an earlier asyncio.run): nothing is in flight on it
+            await session.close()
 
+    async def aclose(self):
+        """Close the pooled session and its connections (the cache is left open; it may be shared)."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    def _mock_response(self, model):
+        return f"[Mock LLM Response for ${model}] Based on our internal valuation, this offer is the best we can do today."
+
+    def _payload(self, prompt, system_prompt, model, stream):
         payload = {
-            "model": self.model,
+            "model": model,
             "prompt": prompt,
-            "stream": False
+            "stream": stream
         }
         if system_prompt:
             payload["system"] = system_prompt
+        return payload
+
+    async def _cache_get(self, key):
+        cached = await self.cache.aget(key)
+        LLM_CACHE_LOOKUPS.labels("hit" if cached is not None else "miss").inc()
+        return cached
+
+    async def cached_response(self, prompt: str, system_prompt: str = None, model: str = None):
+        """
+        The cached message for this prompt, or None (no cache, mock mode, or a miss).
+        Lets a caller such as LLMScheduler answer hits without queueing; it then calls
+        generate_response / stream_response with check_cache=False on a miss.
+        """
+        if self.cache is None or self.mock_mode:
+            return None
+        return await self._cache_get(self.cache.key(model or self.model, system_prompt, prompt))
 
+    async def generate_response(self, prompt: str, system_prompt: str = None, model: str = None,
+                                check_cache: bool = True) -> str:
+        """
+        Generates a negotiation message based on the strategic offer and persona.
+        """
+        model = model or self.model
+        started = time.perf_counter()
+        outcome = "mock" if self.mock_mode else "ok"
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(f"{self.base_url}/api/generate", json=payload) as resp:
+            if self.mock_mode:
+                return self._mock_response(model)
+
+            cache_key = self.cache.key(model, system_prompt, prompt) if self.cache is not None else None
+            if cache_key is not None and check_cache:
+                cached = await self._cache_get(cache_key)
+                if cached is not None:
+                    outcome = "cache"
+                    return cached
+
+            payload = self._payload(prompt, system_prompt, model, stream=False)
+
+            try:
+                async with (await self._get_session()).post(f"{self.base_url}/api/generate", json=payload) as resp:
                     if resp.status == 200:
                         data = await resp.json()
-                        return data.get("response", "").strip()
+                        message = data.get("response", "").strip()
+                        if cache_key is not None and message:
+                            await self.cache.aput(cache_key, message)
+                        return message
                     else:
                         error_text = await resp.text()
                         self.logger.error(f"Ollama API Error: {resp.status} - {error_text}")
+                        outcome = "error"
+                        LLM_ERRORS.labels(model, f"http_{resp.status}").inc()
                         return f"[Error: Ollama status {resp.status}]"
-        except Exception as e:
-            self.logger.error(f"Failed to connect to Ollama: {e}")
-            return f"[Error: Connection failed to local LLM at {self.base_url}]"
+            except asyncio.TimeoutError:
+                self.logger.error(f"Ollama request timed out at {self.base_url}")
+                outcome = "error"
+                LLM_ERRORS.labels(model, "timeout").inc()
+                return f"[Error: Local LLM at {self.base_url} timed out]"
+            except Exception as e:
+                self.logger.error(f"Failed to connect to Ollama: {e}")
+                outcome = "error"
+                LLM_ERRORS.labels(model, "connection").inc()
+                return f"[Error: Connection failed to local LLM at {self.base_url}]"
+        finally:
+            LLM_REQUEST_SECONDS.labels(model, outcome).observe(time.perf_counter() - started)
+
+    async def stream_response(self, prompt: str, system_prompt: str = None, model: str = None,
+                              check_cache: bool = True):
+        """
+        Async iterator over the message text as Ollama generates it (its NDJSON stream),
+        one chunk per token. "".join(chunks).strip() equals what generate_response would
+        return. Mock mode yields the mock message word by word; cache hits and errors
+        arrive as a single chunk.
+        """
+        model = model or self.model
+        started = time.perf_counter()
+        outcome = "mock" if self.mock_mode else "ok"
+        first_token = True
+        try:
+            if self.mock_mode:
+                for i, word in enumerate(self._mock_response(model).split(" ")):
+                    if first_token:
+                        LLM_FIRST_TOKEN_SECONDS.labels(model).observe(time.perf_counter() - started)
+                        first_token = False
+                    yield word if i == 0 else " " + word
+                    # Let the consumer forward the chunk before the next one
+                    await asyncio.sleep(0)
+                return
+
+            cache_key = self.cache.key(model, system_prompt, prompt) if self.cache is not None else None
+            if cache_key is not None and check_cache:
+                cached = await self._cache_get(cache_key)
+                if cached is not None:
+                    outcome = "cache"
+                    yield cached
+                    return
+
+            payload = self._payload(prompt, system_prompt, model, stream=True)
+            parts = []
+            try:
+                async with (await self._get_session()).post(f"{self.base_url}/api/generate", json=payload) as resp:
+                    if resp.status != 200:
+                        error_text = await resp.text()
+                        self.logger.error(f"Ollama API Error: {resp.status} - {error_text}")
+                        outcome = "error"
+                        LLM_ERRORS.labels(model, f"http_{resp.status}").inc()
+                        yield f"[Error: Ollama status {resp.status}]"
+                        return
+                    # One JSON object per line: {"response": "<token>", "done": false}, ...
+                    async for line in resp.content:
+                        if not line.strip():
+                            continue
+                        data = json.loads(line)
+                        if data.get("error"):
+                            raise RuntimeError(data["error"])
+                        token = data.get("response", "")
+                        if not parts:
+                            # Match generate_response, which strips the message
+                            token = token.lstrip()
+                        if token:
+                            if first_token:
+                                LLM_FIRST_TOKEN_SECONDS.labels(model).observe(time.perf_counter() - started)
+                                first_token = False
+                            parts.append(token)
+                            yield token
+                        if data.get("done"):
+                            break
+            except asyncio.TimeoutError:
+                self.logger.error(f"Ollama stream timed out at {self.base_url}")
+                outcome = "error"
+                LLM_ERRORS.labels(model, "timeout").inc()
+                yield f"[Error: Local LLM at {self.base_url} timed out]"
+                return
+            except (aiohttp.ClientError, OSError, ValueError, RuntimeError) as e:
+                self.logger.error(f"Ollama stream failed: {e}")
+                outcome = "error"
+                LLM_ERRORS.labels(model, "connection").inc()
+                yield f"[Error: Connection failed to local LLM at {self.base_url}]"
+                return
+
+            message = "".join(parts).strip()
+            if cache_key is not None and message:
+                await self.cache.aput(cache_key, message)
+        finally:
+            LLM_REQUEST_SECONDS.labels(model, outcome).observe(time.perf_counter() - started)
 
     def get_negotiation_prompt(self, agent_role: str, offer_prices: list, history: list, persona: str = "professional"):
         """
@@ -0,0 +1,217 @@
+import asyncio
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from src.api.offload import run_io
+
+_AMOUNT = re.compile(r"\$\s?(\d[\d,]*(?:\.\d+)?)")
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_prompt(text, price_bucket=25.0):
+    """
+    Canonical form of a prompt: whitespace collapsed and every $ amount snapped to
+    the nearest multiple of `price_bucket`, so offers a few dollars apart share
+    a cache entry. price_bucket <= 0 keeps amounts exact (to the cent).
+    """
+    def snap(match):
+        value = float(match.group(1).replace(",", ""))
+        if price_bucket > 0:
+            value = round(value / price_bucket) * price_bucket
+        return f"${value:.2f}"
+    return _WHITESPACE.sub(" ", _AMOUNT.sub(snap, text or "")).strip()
+
+def prompt_fingerprint(model, system_prompt, prompt, price_bucket=25.0):
+    """Stable cache key for (model, system prompt, normalized prompt)."""
+    parts = [model or "", normalize_prompt(system_prompt, price_bucket), normalize_prompt(prompt, price_bucket)]
+    return hashlib.sha256("\x00".join(parts).encode("utf-8")).hexdigest()
+
+class ResponseCache:
+    """
+    Two-tier cache for LLM responses keyed by prompt fingerprint.
+
+    Memory tier: LRU bounded by max_entries, entries expire after ttl seconds.
+    Disk tier (optional, disk_path): SQLite table that survives restarts, with its own
+    disk_ttl and max_disk_entries; disk hits are promoted to memory. The async
+    methods run disk access on the I/O offload pool, and the connection has its own
+    lock, so the event loop only ever holds the (short) memory-tier lock. Expired and
+    overflow rows are pruned by prune(), which aput schedules in the background every
+    `prune_every` disk writes.
+    """
+    def __init__(self, max_entries=10000, ttl=3600.0, disk_path=None, disk_ttl=7 * 24 * 3600.0,
+                 max_disk_entries=1000000, price_bucket=25.0, prune_every=1000):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_ttl = disk_ttl
+        self.max_disk_entries = max_disk_entries
+        self.price_bucket = price_bucket
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.prune_every = prune_every
+        self._disk = None
+        self._disk_lock = threading.Lock()
+        self._disk_writes = 0
+        self._prune_task = None
+        if disk_path:
+            self._disk = sqlite3.connect(disk_path, check_same_thread=False)
+            with self._disk_lock, self._disk:
+                self._disk.execute("PRAGMA journal_mode=WAL")
+                self._disk.execute(
+                    "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)"
+                )
+                self._disk.execute("CREATE INDEX IF NOT EXISTS idx_responses_created ON responses (created)")
+
+    def key(self, model, system_prompt, prompt):
+        return prompt_fingerprint(model, system_prompt, prompt, self.price_bucket)
+
+    # --- memory tier ---
+
+    def _memory_get(self, key, now):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires < now:
+                del self._memory[key]
+                self.expirations += 1
+                return None
+            self._memory.move_to_end(key)
+            return value
+
+    def _memory_put(self, key, value, now):
+        with self._lock:
+            self._memory[key] = (value, now + self.ttl)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+                self.evictions += 1
+
+    # --- disk tier ---
+
+    # Each method re-checks self._disk under the disk lock: close() may run in between
+
+    def _disk_get(self, key, now):
+        with self._disk_lock:
+            if self._disk is None:
+                return None
+            row = self._disk.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None or row[1] + self.disk_ttl < now:
+            return None
+        return row[0]
+
+    def _disk_put(self, key, value, now):
+        with self._disk_lock:
+            if self._disk is None:
+                return
+            with self._disk:
+                self._disk.execute("INSERT OR REPLACE INTO responses (key, value, created) VALUES (?, ?, ?)", (key, value, now))
+
+    def prune(self):
+        """Delete expired disk rows and the oldest rows beyond max_disk_entries (blocking)."""
+        with self._disk_lock:
+            if self._disk is None:
+                return
+            with self._disk:
+                self._disk.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.disk_ttl,))
+                self._disk.execute(
+                    "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY created DESC LIMIT -1 OFFSET ?)",
+                    (self.max_disk_entries,),
+                )
+
+    def _count(self, tier):
+        with self._lock:
+            if tier is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                if tier == "memory":
+                    self.memory_hits += 1
+                else:
+                    self.disk_hits += 1
+
+    # --- public API ---
+
+    def get(self, key):
+        now = time.time()
+        value = self._memory_get(key, now)
+        if value is not None:
+            self._count("memory")
+            return value
+        value = self._disk_get(key, now)
+        if value is not None:
+            self._count("disk")
+            self._memory_put(key, value, now)
+            return value
+        self._count(None)
+        return None
+
+    def put(self, key, value):
+        now = time.time()
+        self._memory_put(key, value, now)
+        self._disk_put(key, value, now)
+
+    async def aget(self, key):
+        now = time.time()
+        value = self._memory_get(key, now)
+        if value is not None:
+            self._count("memory")
+            return value
+        if self._disk is None:
+            self._count(None)
+            return None
+        value = await run_io(self._disk_get, key, now)
+        if value is None:
+            self._count(None)
+            return None
+        self._count("disk")
+        self._memory_put(key, value, now)
+        return value
+
+    async def aput(self, key, value):
+        now = time.time()
+        self._memory_put(key, value, now)
+        if self._disk is None:
+            return
+        await run_io(self._disk_put, key, value, now)
+        self._disk_writes += 1
+        # Pruning scans the table: run it now and then, in the background, never in the put path
+        if self._disk_writes % self.prune_every == 0 and (self._prune_task is None or self._prune_task.done()):
+            self._prune_task = asyncio.create_task(run_io(self.prune))
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "memory_entries": len(self._memory),
+            "disk": self._disk is not None,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        with self._disk_lock:
+            if self._disk is not None:
+                with self._disk:
+                    self._disk.execute("DELETE FROM responses")
+
+    def close(self):
+        with self._disk_lock:
+            if self._disk is not None:
+                self._disk.close()
+                self._disk = None
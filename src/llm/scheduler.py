@@ -0,0 +1,259 @@
+import asyncio
+import itertools
+import logging
+import time
+
+from src.utils.telemetry import LLM_QUEUE_WAIT_SECONDS, LLM_COALESCED
+
+logger = logging.getLogger("EquilibriumX.LLMScheduler")
+
+# Lower value is served first
+PRIORITIES = {"interactive": 0, "batch": 1}
+
+# End of a coalesced stream
+_END = object()
+
+class _Job:
+    __slots__ = ("key", "prompt", "system_prompt", "model", "future", "priority", "enqueued", "started",
+                 "stream", "chunks", "subscribers", "task")
+
+    def __init__(self, key, prompt, system_prompt, model, future, priority, stream=False):
+        self.key = key
+        self.prompt = prompt
+        self.system_prompt = system_prompt
+        self.model = model
+        self.future = future
+        self.priority = priority
+        self.enqueued = time.perf_counter()
+        self.started = False
+        self.stream = stream
+        # Streams: chunks so far (replayed to late joiners) and one queue per waiter
+        self.chunks = []
+        self.subscribers = set()
+        self.task = None
+
+class LLMScheduler:
+    """
+    Admission control in front of one LLMClient (one model server).
+
+    At most `max_in_flight` requests reach the backend at once; the rest wait in a
+    priority queue, interactive sessions ahead of batch jobs, FIFO within a
+    priority. Cache hits (the client's ResponseCache) are answered before queueing,
+    so they never wait behind slow generations.
+
+    Identical requests (model, system prompt, prompt) that are queued or running
+    share one generation: generate_response() waiters share one future, and
+    stream_response() waiters share one stream, with chunks fanned out to each
+    (a late joiner first gets the chunks produced so far). A duplicate with a higher
+    priority than the queued original moves it forward. A stream nobody listens to
+    any more is cancelled.
+
+    generate_response() and stream_response() mirror the LLMClient methods with an
+    extra `priority` ("interactive" or "batch").
+    """
+    def __init__(self, client, max_in_flight=4):
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        self.client = client
+        self.max_in_flight = max_in_flight
+        self._seq = itertools.count()
+        self._loop = None
+        self._queue = None
+        self._slots = None
+        self._dispatcher = None
+        self._jobs = {}
+        self._running = set()
+        self.submitted = 0
+        self.coalesced = 0
+        self.cache_hits = 0
+        self.completed = 0
+        self.failed = 0
+        self._wait_total = {name: 0.0 for name in PRIORITIES}
+        self._wait_max = {name: 0.0 for name in PRIORITIES}
+        self._dispatched = {name: 0 for name in PRIORITIES}
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Queue, semaphore and futures belong to the loop that created them
+            self._loop = loop
+            self._queue = asyncio.PriorityQueue()
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+            self._jobs = {}
+            self._running = set()
+            self._dispatcher = None
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = loop.create_task(self._dispatch())
+
+    def _enqueue(self, job, priority):
+        self._queue.put_nowait((PRIORITIES[priority], next(self._seq), priority, job))
+
+    async def _admit(self, prompt, system_prompt, model, priority, stream):
+        """Cache hit as (message, None), else (None, job) for a new or coalesced job."""
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority {priority!r}; expected one of {sorted(PRIORITIES)}")
+        self._ensure_started()
+        model = model or self.client.model
+        self.submitted += 1
+        cached = await self.client.cached_response(prompt, system_prompt, model=model)
+        if cached is not None:
+            self.cache_hits += 1
+            return cached, None
+        key = (model, system_prompt, prompt, stream)
+        job = self._jobs.get(key)
+        if job is not None:
+            self.coalesced += 1
+            LLM_COALESCED.inc()
+            if not job.started and PRIORITIES[priority] < PRIORITIES[job.priority]:
+                job.priority = priority
+                self._enqueue(job, priority)
+        else:
+            job = _Job(key, prompt, system_prompt, model, self._loop.create_future(), priority, stream)
+            self._jobs[key] = job
+            self._enqueue(job, priority)
+        return None, job
+
+    async def generate_response(self, prompt, system_prompt=None, model=None, priority="interactive"):
+        cached, job = await self._admit(prompt, system_prompt, model, priority, stream=False)
+        if job is None:
+            return cached
+        # Shielded: one waiter giving up must not cancel the request for the others
+        return await asyncio.shield(job.future)
+
+    async def stream_response(self, prompt, system_prompt=None, model=None, priority="interactive"):
+        cached, job = await self._admit(prompt, system_prompt, model, priority, stream=True)
+        if job is None:
+            yield cached
+            return
+        queue = asyncio.Queue()
+        for chunk in job.chunks:
+            queue.put_nowait(chunk)
+        if job.future.done():
+            queue.put_nowait(_END)
+        job.subscribers.add(queue)
+        try:
+            while (chunk := await queue.get()) is not _END:
+                yield chunk
+            if not job.future.cancelled() and job.future.exception() is not None:
+                raise job.future.exception()
+        finally:
+            job.subscribers.discard(queue)
+            if not job.subscribers and not job.future.done():
+                self._abandon(job)
+
+    def _abandon(self, job):
+        """Nobody is listening to this stream any more: drop it from the queue or stop it."""
+        if self._jobs.get(job.key) is job:
+            del self._jobs[job.key]
+        if job.task is not None:
+            job.task.cancel()
+        else:
+            # Still queued: the dispatcher skips finished futures
+            job.future.cancel()
+
+    def get_negotiation_prompt(self, *args, **kwargs):
+        return self.client.get_negotiation_prompt(*args, **kwargs)
+
+    async def _dispatch(self):
+        while True:
+            await self._slots.acquire()
+            _, _, priority, job = await self._queue.get()
+            if job.started or job.future.done():
+                # Stale entry left behind by a priority upgrade, or an abandoned stream
+                self._slots.release()
+                continue
+            job.started = True
+            waited = time.perf_counter() - job.enqueued
+            self._wait_total[priority] += waited
+            self._wait_max[priority] = max(self._wait_max[priority], waited)
+            self._dispatched[priority] += 1
+            LLM_QUEUE_WAIT_SECONDS.labels(priority).observe(waited)
+            job.task = asyncio.create_task(self._run_stream(job) if job.stream else self._run(job))
+            self._running.add(job.task)
+            job.task.add_done_callback(self._running.discard)
+            # A done callback, not the coroutine's finally: a task cancelled before its
+            # first step never runs its body, and would keep the slot forever
+            job.task.add_done_callback(lambda task, job=job: self._finish(job))
+
+    async def _run(self, job):
+        try:
+            result = await self.client.generate_response(
+                job.prompt, job.system_prompt, model=job.model, check_cache=False)
+        except Exception as e:
+            logger.error(f"LLM request failed: {e}")
+            self.failed += 1
+            if not job.future.done():
+                job.future.set_exception(e)
+        else:
+            self.completed += 1
+            if not job.future.done():
+                job.future.set_result(result)
+
+    async def _run_stream(self, job):
+        try:
+            async for chunk in self.client.stream_response(
+                    job.prompt, job.system_prompt, model=job.model, check_cache=False):
+                job.chunks.append(chunk)
+                for queue in job.subscribers:
+                    queue.put_nowait(chunk)
+        except asyncio.CancelledError:
+            job.future.cancel()
+            raise
+        except Exception as e:
+            logger.error(f"LLM stream failed: {e}")
+            self.failed += 1
+            job.future.set_exception(e)
+            # Retrieved by the subscribers; don't warn when there are none left
+            job.future.exception()
+        else:
+            self.completed += 1
+            job.future.set_result("".join(job.chunks))
+        finally:
+            for queue in job.subscribers:
+                queue.put_nowait(_END)
+
+    def _finish(self, job):
+        """Task done: free its slot, and fail waiters whose task was cancelled before it ran."""
+        if self._jobs.get(job.key) is job:
+            del self._jobs[job.key]
+        if not job.future.done():
+            job.future.cancel()
+            for queue in job.subscribers:
+                queue.put_nowait(_END)
+        self._slots.release()
+
+    def stats(self):
+        queued = {name: 0 for name in PRIORITIES}
+        for job in self._jobs.values():
+            if not job.started:
+                queued[job.priority] += 1
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": len(self._running),
+            "queued": queued,
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "cache_hits": self.cache_hits,
+            "completed": self.completed,
+            "failed": self.failed,
+            "mean_wait_ms": {
+                name: 1000.0 * self._wait_total[name] / self._dispatched[name] if self._dispatched[name] else 0.0
+                for name in PRIORITIES
+            },
+            "max_wait_ms": {name: 1000.0 * value for name, value in self._wait_max.items()},
+        }
+
+    async def aclose(self):
+        """Stop dispatching, cancel running requests and fail anything still waiting."""
+        tasks = [t for t in [self._dispatcher, *self._running] if t is not None and not t.done()]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        for job in self._jobs.values():
+            if not job.future.done():
+                job.future.cancel()
+            for queue in job.subscribers:
+                queue.put_nowait(_END)
+        self._jobs = {}
+        self._dispatcher = None
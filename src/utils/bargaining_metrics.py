@@ -0,0 +1,221 @@
+from collections import OrderedDict, deque
+
+import numpy as np
+
+from src.environment.settlement import role_signs, weight_matrix
+
+class BargainingMetrics:
+    """
+    Game-theoretic outcome metrics for batches of negotiations.
+
+    The market is reduced to its binding bilateral form: a price must cover every
+    seller's cost and stay under every buyer's value, so per item the ZOPA is
+    [max seller valuation, min buyer valuation], and each side's item weights are the
+    mean over its agents. Utilities are undiscounted surplus normalized by max_price.
+
+    Within the ZOPA, raising item i moves w_s[i] / w_b[i] units of seller utility per
+    unit of buyer utility, so the Pareto frontier is the polyline obtained by raising
+    items from the seller's to the buyer's reservation in decreasing order of that
+    ratio. The Nash bargaining solution maximizes (u_s - d_s)(u_b - d_b) on it in
+    closed form per segment. Solutions are cached per scenario.
+    """
+    def __init__(self, agents, item_weights=None, num_items=1, max_price=10000.0,
+                 disagreement=(0.0, 0.0), cache_size=100000):
+        self.num_items = num_items
+        self.max_price = max_price
+        self.disagreement = np.asarray(disagreement, dtype=np.float64)
+        signs = role_signs(agents)
+        if not ((signs > 0).any() and (signs < 0).any()):
+            raise ValueError("Bargaining metrics need at least one supplier and one buyer")
+        self._sellers = signs > 0
+        self._buyers = signs < 0
+        weights = weight_matrix(item_weights if item_weights is not None else np.ones(num_items), len(agents), num_items)
+        self.seller_weights = weights[self._sellers].mean(axis=0)
+        self.buyer_weights = weights[self._buyers].mean(axis=0)
+
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @classmethod
+    def from_env(cls, env, **kwargs):
+        return cls(env.possible_agents, env.item_weights, env.num_items, **kwargs)
+
+    def reservation_prices(self, valuations):
+        """Per-item (seller, buyer) reservation prices, each (B, num_items)."""
+        valuations = np.asarray(valuations, dtype=np.float64)
+        return valuations[:, self._sellers].max(axis=1), valuations[:, self._buyers].min(axis=1)
+
+    def utilities(self, valuations, prices):
+        """(B, 2) seller/buyer utilities of a price vector per episode."""
+        v_s, v_b = self.reservation_prices(valuations)
+        prices = np.asarray(prices, dtype=np.float64)
+        u_s = ((prices - v_s) * self.seller_weights).sum(axis=1)
+        u_b = ((v_b - prices) * self.buyer_weights).sum(axis=1)
+        return np.stack([u_s, u_b], axis=1) / self.max_price
+
+    def _solve_batch(self, valuations):
+        B, n = len(valuations), self.num_items
+        v_s, v_b = self.reservation_prices(valuations)
+        width = np.maximum(v_b - v_s, 0.0)
+        feasible = v_b > v_s
+
+        gain = self.seller_weights * width / self.max_price
+        loss = self.buyer_weights * width / self.max_price
+        ratio = np.where(loss > 0, self.seller_weights / np.maximum(self.buyer_weights, 1e-12), np.inf)
+        order = np.argsort(-ratio, axis=1, kind="stable")
+        gain_sorted = np.take_along_axis(gain, order, axis=1)
+        loss_sorted = np.take_along_axis(loss, order, axis=1)
+
+        # Frontier vertices: start with every price at the seller's reservation
+        vertices = np.zeros((B, n + 1, 2))
+        vertices[:, 0, 1] = loss.sum(axis=1)
+        vertices[:, 1:, 0] = np.cumsum(gain_sorted, axis=1)
+        vertices[:, 1:, 1] = vertices[:, 0:1, 1] - np.cumsum(loss_sorted, axis=1)
+
+        # Nash product maximum on each segment (closed form), then the best segment
+        a_s = vertices[:, :-1, 0] - self.disagreement[0]
+        a_b = vertices[:, :-1, 1] - self.disagreement[1]
+        G, L = gain_sorted, loss_sorted
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = (G * a_b - L * a_s) / (2 * G * L)
+        t = np.where(L == 0, 1.0, np.where(G == 0, 0.0, t))
+        t = np.clip(np.nan_to_num(t, nan=0.0), 0.0, 1.0)
+        product = (a_s + t * G) * (a_b - t * L)
+        best = np.argmax(product, axis=1)
+        rows = np.arange(B)
+        t_best = t[rows, best]
+        nash_utilities = np.stack([
+            vertices[rows, best, 0] + t_best * G[rows, best],
+            vertices[rows, best, 1] - t_best * L[rows, best],
+        ], axis=1)
+
+        # Nash prices: items ranked before the best segment sit at the buyer's reservation
+        fraction = np.zeros((B, n))
+        rank = np.arange(n)[None, :]
+        fraction_sorted = np.where(rank < best[:, None], 1.0, np.where(rank == best[:, None], t_best[:, None], 0.0))
+        np.put_along_axis(fraction, order, fraction_sorted, axis=1)
+        nash_prices = np.where(feasible, v_s + fraction * width, np.nan)
+
+        return {
+            "zopa_low": v_s,
+            "zopa_high": v_b,
+            "feasible": feasible,
+            "frontier": vertices,
+            "nash_utilities": nash_utilities,
+            "nash_prices": nash_prices,
+        }
+
+    def solve(self, valuations):
+        """
+        Closed-form ZOPA, Pareto frontier vertices (B, num_items + 1, 2) and Nash
+        solution (utilities and prices) for a batch of valuation matrices.
+        """
+        valuations = np.ascontiguousarray(valuations, dtype=np.float64)
+        if self.cache_size <= 0:
+            self.cache_misses += len(valuations)
+            return self._solve_batch(valuations)
+
+        keys = [row.tobytes() for row in valuations]
+        cached = [self._cache.get(key) for key in keys]
+        missing = [i for i, entry in enumerate(cached) if entry is None]
+        self.cache_hits += len(keys) - len(missing)
+        self.cache_misses += len(missing)
+        if missing:
+            fresh = self._solve_batch(valuations[missing])
+            for j, i in enumerate(missing):
+                entry = {name: value[j] for name, value in fresh.items()}
+                cached[i] = entry
+                self._cache[keys[i]] = entry
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return {name: np.stack([entry[name] for entry in cached]) for name in cached[0]}
+
+    def evaluate(self, valuations, deal_prices):
+        """
+        Per-episode metrics for realized deal prices (rows of NaN mean no deal).
+
+        nash_distance: distance in utility space to the Nash solution
+        nash_price_distance: RMS normalized price gap to the Nash prices over ZOPA items
+        pareto_distance: distance in utility space to the Pareto frontier
+        efficiency: realized joint utility over the best joint utility on the frontier
+        in_zopa: every feasible item priced inside its ZOPA
+        """
+        solution = self.solve(valuations)
+        deal_prices = np.asarray(deal_prices, dtype=np.float64)
+        realized = self.utilities(valuations, deal_prices)
+
+        nash_distance = np.linalg.norm(realized - solution["nash_utilities"], axis=1)
+        gaps = np.where(solution["feasible"], (deal_prices - solution["nash_prices"]) / self.max_price, 0.0)
+        n_feasible = np.maximum(solution["feasible"].sum(axis=1), 1)
+        nash_price_distance = np.sqrt((gaps ** 2).sum(axis=1) / n_feasible)
+
+        # Point-to-polyline distance over all frontier segments
+        start = solution["frontier"][:, :-1]
+        seg = solution["frontier"][:, 1:] - start
+        rel = realized[:, None, :] - start
+        seg_len2 = (seg ** 2).sum(axis=2)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = np.where(seg_len2 > 0, (rel * seg).sum(axis=2) / seg_len2, 0.0)
+        closest = start + np.clip(t, 0.0, 1.0)[..., None] * seg
+        pareto_distance = np.linalg.norm(realized[:, None, :] - closest, axis=2).min(axis=1)
+
+        best_joint = solution["frontier"].sum(axis=2).max(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            efficiency = np.where(best_joint > 0, realized.sum(axis=1) / best_joint, np.nan)
+
+        in_zopa = np.all(
+            ~solution["feasible"] | ((deal_prices >= solution["zopa_low"]) & (deal_prices <= solution["zopa_high"])),
+            axis=1,
+        )
+        deal = ~np.isnan(deal_prices).any(axis=1)
+        return {
+            "deal": deal,
+            "utilities": realized,
+            "nash_distance": nash_distance,
+            "nash_price_distance": nash_price_distance,
+            "pareto_distance": pareto_distance,
+            "efficiency": efficiency,
+            "in_zopa": in_zopa & deal,
+            "zopa_width": (np.maximum(solution["zopa_high"] - solution["zopa_low"], 0.0)).sum(axis=1) / self.max_price,
+        }
+
+    def summarize(self, valuations, deal_prices):
+        """Scalar means over deals, ready for MLflowLogger.log_bargaining_metrics."""
+        metrics = self.evaluate(valuations, deal_prices)
+        deal = metrics["deal"]
+        summary = {"deal_rate": float(deal.mean()) if len(deal) else 0.0}
+        summary["zopa_width"] = float(metrics["zopa_width"].mean()) if len(deal) else float("nan")
+        for name in ("nash_distance", "nash_price_distance", "pareto_distance", "efficiency"):
+            summary[name] = float(np.nanmean(metrics[name][deal])) if deal.any() else float("nan")
+        summary["in_zopa_rate"] = float(metrics["in_zopa"][deal].mean()) if deal.any() else float("nan")
+        return summary
+
+class EpisodeOutcomes:
+    """
+    Rolling window of a trainer's own finished episodes (valuation matrix, deal
+    prices) for BargainingMetrics. Call add_env(env) when an episode ends; episodes
+    without a deal are kept as NaN prices so they count against the deal rate.
+    """
+    def __init__(self, window=256):
+        self._valuations = deque(maxlen=window)
+        self._deal_prices = deque(maxlen=window)
+
+    def __len__(self):
+        return len(self._valuations)
+
+    def add(self, valuations, deal_prices=None):
+        valuations = np.asarray(valuations, dtype=np.float64)
+        self._valuations.append(valuations)
+        if deal_prices is None:
+            deal_prices = np.full(valuations.shape[-1], np.nan)
+        self._deal_prices.append(np.asarray(deal_prices, dtype=np.float64))
+
+    def add_env(self, env):
+        """Record the episode that just ended in a NegotiatorEnv."""
+        self.add(env.valuation_matrix, env.deal_prices)
+
+    def summarize(self, metrics):
+        """metrics.summarize() over the window (BargainingMetrics of the same env config)."""
+        return metrics.summarize(np.stack(self._valuations), np.stack(self._deal_prices))
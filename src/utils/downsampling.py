@@ -0,0 +1,46 @@
+import numpy as np
+
+def lttb_indices(y, threshold, x=None):
+    """
+    Largest-Triangle-Three-Buckets downsampling: indices of `threshold` points that
+    keep the visual shape of the series.
+
+    y: (T,) values, or (T, k) for several series sharing one x axis; multi-series
+       inputs are ranked on their mean so every series keeps the same sample points
+    x: optional (T,) x coordinates (default 0..T-1)
+
+    The first and last points are always kept. Series no longer than `threshold`
+    are returned whole.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    if y.ndim == 2:
+        y = y.mean(axis=1)
+    T = len(y)
+    if threshold >= T or T <= 2:
+        return np.arange(T)
+    if threshold < 3:
+        return np.array([0, T - 1])[:max(threshold, 1)]
+    x = np.arange(T, dtype=np.float64) if x is None else np.asarray(x, dtype=np.float64)
+
+    # threshold - 2 buckets between the fixed endpoints
+    edges = np.linspace(1, T - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, T - 1
+    a = 0
+    for b in range(threshold - 2):
+        start, stop = edges[b], max(edges[b + 1], edges[b] + 1)
+        # Third vertex: the average of the next bucket (or the last point)
+        if b + 2 < len(edges):
+            nxt = slice(edges[b + 1], max(edges[b + 2], edges[b + 1] + 1))
+            avg_x, avg_y = x[nxt].mean(), y[nxt].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+        area = np.abs((x[a] - avg_x) * (y[start:stop] - y[a]) - (x[a] - x[start:stop]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[b + 1] = a
+    return selected
+
+def lttb(x, y, threshold):
+    """Downsampled (x, y) pairs; see lttb_indices."""
+    idx = lttb_indices(y, threshold, x)
+    return np.asarray(x)[idx], np.asarray(y)[idx]
@@ -0,0 +1,163 @@
+import itertools
+import json
+import platform
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+from src.environment.negotiator_env import NegotiatorEnv, ACCEPT, COUNTER, QUIT
+
+DEFAULT_GRID = {
+    "num_agents": [2, 3, 5, 10],
+    "num_items": [1, 5, 20, 50],
+    "history_lag": [3, 32, 256],
+}
+
+METRICS_HIGHER_IS_BETTER = ("steps_per_sec", "resets_per_sec")
+METRICS_LOWER_IS_BETTER = ("alloc_bytes_per_step",)
+
+def random_policy(rng, num_items, steps):
+    """Uniformly random offers; mostly COUNTER with occasional ACCEPT/QUIT."""
+    types = rng.choice([ACCEPT, COUNTER, QUIT], size=steps, p=[0.1, 0.85, 0.05])
+    prices = rng.uniform(4000, 9000, size=(steps, num_items)).astype(np.float32)
+    return types, prices
+
+def scripted_policy(rng, num_items, steps, concession_rounds=8):
+    """Deterministic concession from 9000 towards 5000, accepting after `concession_rounds` offers."""
+    rounds = np.arange(steps) % (concession_rounds + 1)
+    types = np.where(rounds == concession_rounds, ACCEPT, COUNTER)
+    level = 9000.0 - 4000.0 * rounds / concession_rounds
+    prices = np.repeat(level[:, None], num_items, axis=1).astype(np.float32)
+    return types, prices
+
+POLICIES = {"random": random_policy, "scripted": scripted_policy}
+
+def case_key(case):
+    return f"{case['policy']}/agents={case['num_agents']}/items={case['num_items']}/lag={case['history_lag']}"
+
+def bench_case(num_agents, num_items, history_lag, policy="random", steps=2000, resets=500, alloc_samples=200, seed=0):
+    """
+    Measure one grid point through the PettingZoo dict API.
+
+    Actions are generated up front so policy cost is excluded. alloc_bytes_per_step
+    is the mean peak of memory allocated while a step runs (tracemalloc), i.e. what
+    a step allocates on top of the live state.
+    """
+    config = {"num_agents": num_agents, "num_items": num_items, "history_lag": history_lag, "max_rounds": 20}
+    env = NegotiatorEnv(config=config)
+    rng = np.random.default_rng(seed)
+    types, prices = POLICIES[policy](rng, num_items, steps)
+    actions = [{"type": int(t), "price": p} for t, p in zip(types, prices)]
+
+    # Resets
+    env.reset(seed=seed)
+    start = time.perf_counter()
+    for _ in range(resets):
+        env.reset()
+    resets_per_sec = resets / (time.perf_counter() - start)
+
+    # Steps (auto-reset time excluded)
+    env.reset(seed=seed)
+    step_time = 0.0
+    episodes = 0
+    for action in actions:
+        start = time.perf_counter()
+        _, _, terms, truncs, _ = env.step({env.current_proposer: action})
+        step_time += time.perf_counter() - start
+        if any(terms.values()) or any(truncs.values()):
+            episodes += 1
+            env.reset()
+    steps_per_sec = steps / step_time
+
+    # Allocations
+    env.reset(seed=seed)
+    samples = actions[:alloc_samples]
+    tracemalloc.start()
+    try:
+        allocated = 0
+        for action in samples:
+            proposer = env.current_proposer
+            current = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            _, _, terms, truncs, _ = env.step({proposer: action})
+            allocated += tracemalloc.get_traced_memory()[1] - current
+            if any(terms.values()) or any(truncs.values()):
+                env.reset()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "policy": policy,
+        "num_agents": num_agents,
+        "num_items": num_items,
+        "history_lag": history_lag,
+        "steps": steps,
+        "episodes": episodes,
+        "steps_per_sec": steps_per_sec,
+        "resets_per_sec": resets_per_sec,
+        "alloc_bytes_per_step": allocated / max(len(samples), 1),
+    }
+
+def run_grid(grid=None, policies=("random", "scripted"), steps=2000, resets=500, seed=0, progress=None):
+    """Benchmark every (policy, num_agents, num_items, history_lag) combination."""
+    grid = grid or DEFAULT_GRID
+    results = []
+    for policy, n_agents, n_items, lag in itertools.product(
+        policies, grid["num_agents"], grid["num_items"], grid["history_lag"]
+    ):
+        result = bench_case(n_agents, n_items, lag, policy=policy, steps=steps, resets=resets, seed=seed)
+        results.append(result)
+        if progress:
+            progress(result)
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "steps": steps,
+            "resets": resets,
+        },
+        "results": results,
+    }
+
+def compare_to_baseline(report, baseline, threshold=0.15):
+    """
+    List metrics that regressed by more than `threshold` (relative) against the baseline.
+    Throughput must not drop below (1 - threshold) x baseline; allocations must not exceed
+    (1 + threshold) x baseline. Cases missing from the baseline are ignored.
+    """
+    reference = {case_key(r): r for r in baseline.get("results", [])}
+    regressions = []
+    for result in report["results"]:
+        base = reference.get(case_key(result))
+        if base is None:
+            continue
+        for metric in METRICS_HIGHER_IS_BETTER:
+            if result[metric] < base[metric] * (1 - threshold):
+                regressions.append(_regression(result, base, metric))
+        for metric in METRICS_LOWER_IS_BETTER:
+            # Small absolute slack so near-zero allocation counts don't flap
+            if result[metric] > base[metric] * (1 + threshold) + 64:
+                regressions.append(_regression(result, base, metric))
+    return regressions
+
+def _regression(result, base, metric):
+    return {
+        "case": case_key(result),
+        "metric": metric,
+        "baseline": base[metric],
+        "current": result[metric],
+        "change": (result[metric] - base[metric]) / base[metric] if base[metric] else float("inf"),
+    }
+
+def save_report(report, path):
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+def load_report(path):
+    with open(path, "r") as f:
+        return json.load(f)
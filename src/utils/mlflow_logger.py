@@ -18,6 +18,12 @@ class MLflowLogger:
     def log_metrics(self, metrics: dict, step: int = None):
         mlflow.log_metrics(metrics, step=step)
         
+    def log_bargaining_metrics(self, summary: dict, step: int = None, prefix: str = "bargaining_"):
+        """Log a BargainingMetrics.summarize() dict; NaN entries (no deals) are skipped."""
+        metrics = {f"{prefix}{k}": v for k, v in summary.items() if v == v}
+        if metrics:
+            mlflow.log_metrics(metrics, step=step)
+        
     def log_model(self, model, artifact_path="model"):
         mlflow.pytorch.log_model(model, artifact_path)
         
@@ -0,0 +1,298 @@
+import asyncio
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+# Seconds; covers sub-millisecond env steps up to multi-second LLM calls
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+class _Sharded:
+    """
+    Per-thread shards: each thread updates its own list, so recording is a plain
+    list write with no lock. The lock is only taken when a thread creates its shard
+    and when the registry sums shards on scrape.
+    """
+    def __init__(self, size):
+        self._size = size
+        self._local = threading.local()
+        self._shards = []
+        self._lock = threading.Lock()
+
+    def shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = [0] * self._size
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def total(self):
+        with self._lock:
+            shards = list(self._shards)
+        return [sum(column) for column in zip(*shards)] if shards else [0] * self._size
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, help, labelnames=(), registry=None):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def labels(self, *values):
+        """Child metric for one label combination (cached; look it up once outside hot loops)."""
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _default(self):
+        if self.labelnames:
+            raise ValueError(f"{self.name} has labels {self.labelnames}; use .labels()")
+        return self.labels()
+
+    def collect(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in sorted(self._children.items()):
+            lines.extend(child.render(self.name, self.labelnames, values))
+        return lines
+
+class _CounterChild:
+    def __init__(self):
+        self._shards = _Sharded(1)
+
+    def inc(self, amount=1):
+        self._shards.shard()[0] += amount
+
+    def value(self):
+        return self._shards.total()[0]
+
+    def render(self, name, labelnames, values):
+        return [f"{name}_total{_labels(labelnames, values)} {_format_value(self.value())}"]
+
+class Counter(_Metric):
+    """Monotonic counter, exported as <name>_total."""
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1):
+        self._default().inc(amount)
+
+class _GaugeChild:
+    def __init__(self):
+        self._value = 0.0
+        self._function = None
+
+    def set(self, value):
+        self._value = value
+
+    def inc(self, amount=1):
+        self._value += amount
+
+    def dec(self, amount=1):
+        self._value -= amount
+
+    def set_function(self, fn):
+        """Read the value from fn() at scrape time."""
+        self._function = fn
+
+    def value(self):
+        return self._function() if self._function is not None else self._value
+
+    def render(self, name, labelnames, values):
+        return [f"{name}{_labels(labelnames, values)} {_format_value(self.value())}"]
+
+class Gauge(_Metric):
+    """
+    Point-in-time value. set/inc/dec are meant for the event loop thread (session
+    counts, queue depths); use set_function for values owned elsewhere.
+    """
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value):
+        self._default().set(value)
+
+    def inc(self, amount=1):
+        self._default().inc(amount)
+
+    def dec(self, amount=1):
+        self._default().dec(amount)
+
+    def set_function(self, fn):
+        self._default().set_function(fn)
+
+class _HistogramChild:
+    def __init__(self, buckets):
+        self._buckets = buckets
+        # Per bucket counts, then +Inf count, then sum
+        self._shards = _Sharded(len(buckets) + 2)
+
+    def observe(self, value):
+        shard = self._shards.shard()
+        shard[bisect.bisect_left(self._buckets, value)] += 1
+        shard[-1] += value
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def snapshot(self):
+        """(cumulative bucket counts including +Inf, count, sum)."""
+        totals = self._shards.total()
+        cumulative, running = [], 0
+        for n in totals[:-1]:
+            running += n
+            cumulative.append(running)
+        return cumulative, running, totals[-1]
+
+    def render(self, name, labelnames, values):
+        cumulative, count, total = self.snapshot()
+        lines = []
+        for bound, n in zip(list(self._buckets) + [math.inf], cumulative):
+            lines.append(f"{name}_bucket{_labels(labelnames, values, [('le', _format_value(bound))])} {n}")
+        lines.append(f"{name}_sum{_labels(labelnames, values)} {_format_value(float(total))}")
+        lines.append(f"{name}_count{_labels(labelnames, values)} {count}")
+        return lines
+
+class Histogram(_Metric):
+    """Bucketed distribution (seconds by default) with _bucket, _sum and _count series."""
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS, registry=None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self._default().observe(value)
+
+    def time(self):
+        return self._default().time()
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+class EventLoopLagMonitor:
+    """
+    Measures event-loop lag: how late a sleep(interval) wakes up. A loop that is
+    blocked by synchronous work shows up here long before requests time out.
+    """
+    def __init__(self, histogram, gauge, interval=0.25):
+        self.histogram = histogram
+        self.gauge = gauge
+        self.interval = interval
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(loop.time() - expected, 0.0)
+            self.histogram.observe(lag)
+            self.gauge.set(lag)
+
+# --- Metrics shared by the API, environment, agents and LLM client ---
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "eqx_http_request_duration_seconds", "HTTP request latency", ["method", "route", "status"])
+TURN_SECONDS = Histogram(
+    "eqx_turn_duration_seconds", "Websocket negotiation turn latency (decision, message, step, send)", ["mode"])
+ENV_STEP_SECONDS = Histogram("eqx_env_step_duration_seconds", "NegotiatorEnv.step latency")
+AGENT_ACTION_SECONDS = Histogram(
+    "eqx_agent_action_duration_seconds", "HybridAgent.get_strategic_action latency")
+LLM_REQUEST_SECONDS = Histogram(
+    "eqx_llm_request_duration_seconds", "LLMClient.generate_response latency", ["model", "outcome"])
+LLM_FIRST_TOKEN_SECONDS = Histogram(
+    "eqx_llm_first_token_seconds", "Time to the first streamed LLM token", ["model"])
+LLM_ERRORS = Counter("eqx_llm_errors", "LLM request failures", ["model", "reason"])
+LLM_QUEUE_WAIT_SECONDS = Histogram(
+    "eqx_llm_queue_wait_seconds", "Time an LLM request waited for a scheduler slot", ["priority"])
+LLM_SCHEDULER_DEPTH = Gauge(
+    "eqx_llm_scheduler_depth", "LLM scheduler requests by state (in_flight, or queued per priority)", ["state"])
+LLM_COALESCED = Counter("eqx_llm_coalesced", "LLM requests served by an identical in-flight request")
+LLM_CACHE_LOOKUPS = Counter("eqx_llm_cache_lookups", "LLM response cache lookups", ["result"])
+ACTIVE_SESSIONS = Gauge("eqx_active_sessions", "Open websocket sessions on this worker", ["kind"])
+SESSIONS_STARTED = Counter("eqx_sessions_started", "Websocket sessions started", ["kind"])
+EVENT_LOOP_LAG_SECONDS = Histogram(
+    "eqx_event_loop_lag_seconds", "Event loop wake-up delay",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5))
+EVENT_LOOP_LAG_LAST = Gauge("eqx_event_loop_lag_last_seconds", "Most recent event loop wake-up delay")
+SESSION_SAVE_SECONDS = Histogram(
+    "eqx_session_save_duration_seconds", "Time to close, index and archive a finished session")
+OFFLOAD_QUEUE = Gauge("eqx_offload_queue_depth", "Offload pool calls by state", ["pool", "state"])
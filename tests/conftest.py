@@ -0,0 +1,14 @@
+import os
+import shutil
+import tempfile
+
+import pytest
+
+# Sessions recorded by tests go to a scratch directory, never the repository's data/
+_SESSIONS_DIR = tempfile.mkdtemp(prefix="eqx-sessions-")
+os.environ["EQX_SESSIONS_DIR"] = _SESSIONS_DIR
+
+@pytest.fixture(scope="session", autouse=True)
+def _remove_scratch_sessions_dir():
+    yield
+    shutil.rmtree(_SESSIONS_DIR, ignore_errors=True)
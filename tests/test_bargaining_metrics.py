@@ -0,0 +1,67 @@
+import numpy as np
+from src.environment.negotiator_env import NegotiatorEnv
+from src.utils.bargaining_metrics import BargainingMetrics, EpisodeOutcomes
+
+def test_equal_weights_nash_is_midpoint():
+    metrics = BargainingMetrics(["supplier", "retailer"], num_items=2)
+    vals = np.array([[[4000.0, 5000.0], [8000.0, 6000.0]]])
+    solution = metrics.solve(vals)
+    assert np.allclose(solution["zopa_low"], [[4000.0, 5000.0]])
+    # Joint surplus 0.5, split evenly
+    assert np.allclose(solution["nash_utilities"], [[0.25, 0.25]])
+    assert np.allclose(metrics.utilities(vals, solution["nash_prices"]), [[0.25, 0.25]])
+
+    result = metrics.evaluate(vals, [[6000.0, 5500.0]])
+    # Any price in the ZOPA is Pareto efficient when weights agree
+    assert np.isclose(result["pareto_distance"][0], 0.0)
+    assert np.isclose(result["efficiency"][0], 1.0)
+    assert result["in_zopa"][0]
+    assert np.allclose(result["utilities"], [[0.25, 0.25]])
+
+def test_per_agent_weights_frontier():
+    # Seller cares about item 0 only, buyer about item 1 only
+    metrics = BargainingMetrics(["supplier", "retailer"], item_weights=[[1.0, 0.0], [0.0, 1.0]], num_items=2)
+    vals = np.array([[[4000.0, 4000.0], [6000.0, 6000.0]]])
+    solution = metrics.solve(vals)
+    # Seller gets item 0 at the buyer's reservation, buyer gets item 1 at the seller's: both 0.2
+    assert np.allclose(solution["nash_utilities"], [[0.2, 0.2]])
+    assert np.allclose(solution["nash_prices"], [[6000.0, 4000.0]])
+
+    result = metrics.evaluate(vals, [[5000.0, 5000.0]])
+    assert np.allclose(result["utilities"], [[0.1, 0.1]])
+    assert np.isclose(result["pareto_distance"][0], 0.1)
+    assert np.isclose(result["efficiency"][0], 0.5)
+
+def test_batch_cache_and_summary():
+    env = NegotiatorEnv({"num_agents": 4, "num_items": 3})
+    metrics = BargainingMetrics.from_env(env)
+    rng = np.random.default_rng(0)
+    vals = rng.uniform([[4000], [4000], [7000], [7000]], [[6000], [6000], [9000], [9000]], size=(32, 4, 3))
+    deals = rng.uniform(6000, 7000, size=(32, 3))
+    deals[::4] = np.nan
+
+    first = metrics.evaluate(vals, deals)
+    assert metrics.cache_misses == 32 and metrics.cache_hits == 0
+    second = metrics.evaluate(vals, deals)
+    assert metrics.cache_hits == 32
+    assert np.array_equal(first["pareto_distance"], second["pareto_distance"], equal_nan=True)
+
+    summary = metrics.summarize(vals, deals)
+    assert np.isclose(summary["deal_rate"], 0.75)
+    assert np.isclose(summary["efficiency"], 1.0)
+    assert summary["in_zopa_rate"] == 1.0
+
+def test_episode_outcomes_from_env():
+    env = NegotiatorEnv({"num_items": 2, "max_rounds": 4})
+    metrics = BargainingMetrics.from_env(env)
+    outcomes = EpisodeOutcomes(window=2)
+    for seed, deal in [(0, False), (1, True), (2, True)]:
+        env.reset(seed=seed)
+        mid = env.valuation_matrix.mean(axis=0).astype(np.float32)
+        env.step({"supplier": {"type": 1, "price": mid}})
+        env.step({"retailer": {"type": 0 if deal else 2, "price": mid}})
+        outcomes.add_env(env)
+
+    assert len(outcomes) == 2  # the no-deal episode fell out of the window
+    summary = outcomes.summarize(metrics)
+    assert summary["deal_rate"] == 1.0 and summary["in_zopa_rate"] == 1.0
@@ -0,0 +1,59 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from fastapi.testclient import TestClient
+from src.api.batch_runner import BatchNegotiationRequest, run_chunk, stream_batch
+import asyncio
+import pytest
+
+def _collect(request, executor, workers=1):
+    async def run():
+        return [chunk async for chunk in stream_batch(request, executor, workers)]
+    lines = "".join(asyncio.run(run())).splitlines()
+    return [json.loads(line) for line in lines]
+
+def test_chunks_are_reproducible_and_independent():
+    config = BatchNegotiationRequest(num_items=2, max_rounds=10, count=8, seed=3).model_dump()
+    whole, partial = run_chunk(config, 3, 0, 8)
+    split = run_chunk(config, 3, 0, 5)[0] + run_chunk(config, 3, 5, 8)[0]
+    assert whole == split
+    records = [json.loads(line) for line in whole.splitlines()]
+    assert [r["index"] for r in records] == list(range(8))
+    assert partial["count"] == 8
+    for r in records:
+        assert r["result"] in ("deal", "quit", "timeout", "invalid_accept")
+        assert (r["deal_prices"] is not None) == (r["result"] == "deal")
+        assert "messages" not in r
+
+def test_stream_batch_summary_and_messages():
+    request = BatchNegotiationRequest(num_agents=4, num_items=2, max_rounds=12, count=23, seed=1,
+                                      chunk_size=5, include_mock_messages=True, personas=["aggressive", "cooperative"])
+    with ThreadPoolExecutor(2) as executor:
+        records = _collect(request, executor, workers=2)
+    episodes, summary = records[:-1], records[-1]
+    assert [r["index"] for r in episodes] == list(range(23))
+    assert summary["type"] == "summary"
+    assert summary["count"] == 23
+    assert sum(summary["results"].values()) == 23
+    assert set(summary["mean_rewards"]) == {"supplier_1", "supplier_2", "buyer_1", "buyer_2"}
+    assert all(len(r["messages"]) <= r["rounds"] for r in episodes)
+    assert any(r["messages"] for r in episodes)
+
+def test_batch_request_validation():
+    with pytest.raises(ValueError):
+        BatchNegotiationRequest(personas=["sneaky"])
+    with pytest.raises(ValueError):
+        BatchNegotiationRequest(count=0)
+    # The field's old name is still accepted
+    assert BatchNegotiationRequest(include_messages=True).include_mock_messages
+
+def test_batch_endpoint_streams_ndjson(monkeypatch):
+    monkeypatch.setenv("EQX_BATCH_WORKERS", "2")
+    from src.api.app import app
+    with TestClient(app) as client:
+        resp = client.post("/api/negotiations/batch", json={"count": 6, "seed": 7, "num_items": 3})
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in resp.text.splitlines()]
+        assert len(lines) == 7
+        assert lines[-1]["seed"] == 7
+        assert client.post("/api/negotiations/batch", json={"count": 0}).status_code == 422
@@ -0,0 +1,20 @@
+import numpy as np
+from src.utils.downsampling import lttb_indices, lttb
+
+def test_lttb_keeps_endpoints_and_peaks():
+    x = np.arange(1000)
+    y = np.sin(x / 50.0)
+    y[437] = 10.0  # a spike must survive downsampling
+    idx = lttb_indices(y, 50)
+    assert len(idx) == 50
+    assert idx[0] == 0 and idx[-1] == 999
+    assert np.all(np.diff(idx) > 0)
+    assert 437 in idx
+
+def test_lttb_short_and_multi_series():
+    assert lttb_indices(np.ones(10), 20).tolist() == list(range(10))
+    prices = np.random.default_rng(0).uniform(size=(300, 3))
+    idx = lttb_indices(prices, 40)
+    assert len(idx) == 40
+    xs, ys = lttb(np.arange(300), prices[:, 0], 40)
+    assert len(xs) == len(ys) == 40
@@ -0,0 +1,22 @@
+import copy
+from src.utils.env_benchmark import run_grid, compare_to_baseline
+
+GRID = {"num_agents": [2, 3], "num_items": [2], "history_lag": [3]}
+
+def test_run_grid_reports_every_case():
+    report = run_grid(GRID, policies=("random", "scripted"), steps=50, resets=10)
+    assert len(report["results"]) == 4
+    for result in report["results"]:
+        assert result["steps_per_sec"] > 0
+        assert result["resets_per_sec"] > 0
+        assert result["alloc_bytes_per_step"] >= 0
+
+def test_compare_flags_regressions():
+    report = run_grid(GRID, policies=("scripted",), steps=50, resets=10)
+    assert compare_to_baseline(report, report, threshold=0.1) == []
+
+    slower = copy.deepcopy(report)
+    slower["results"][0]["steps_per_sec"] = report["results"][0]["steps_per_sec"] * 0.5
+    slower["results"][1]["alloc_bytes_per_step"] = report["results"][1]["alloc_bytes_per_step"] * 3 + 1000
+    regressions = compare_to_baseline(slower, report, threshold=0.1)
+    assert {r["metric"] for r in regressions} == {"steps_per_sec", "alloc_bytes_per_step"}
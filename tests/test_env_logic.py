@@ -97,3 +97,77 @@ def test_timeout():
     assert truncs["retailer"] == True
     assert rewards["supplier"] == -0.05
     assert rewards["retailer"] == -0.05
+
+def test_obs_buffer_views(env):
+    obs, _ = env.reset()
+    assert obs["supplier"].dtype == np.float32
+    assert np.allclose(obs["supplier"][1], env.val_s[0] / env.max_price)
+    assert obs["supplier"][3] == 1.0 and obs["retailer"][3] == 0.0
+
+    held = obs["supplier"]
+    env.step({"supplier": {"type": 1, "price": np.array([5000.0])}})
+    # Default: rows are views refreshed in place
+    assert np.isclose(held[0], 0.5)
+    assert held[3] == 0.0
+    assert np.isclose(held[4], 0.5)
+
+def test_obs_copies():
+    env = NegotiatorEnv(config={"max_rounds": 10, "num_items": 1, "copy_obs": True})
+    obs, _ = env.reset()
+    held = obs["supplier"]
+    env.step({"supplier": {"type": 1, "price": np.array([5000.0])}})
+    assert held[0] == 0.0
+
+def test_ring_history_matches_roll():
+    env = NegotiatorEnv(config={"max_rounds": 50, "num_items": 2, "history_lag": 4})
+    env.reset()
+    expected = np.zeros((4, 2), dtype=np.float32)
+    for k in range(10):
+        prices = np.array([4000.0 + 100 * k, 7000.0 - 50 * k], dtype=np.float32)
+        obs, *_ = env.step({env.current_proposer: {"type": 1, "price": prices}})
+        expected = np.roll(expected, 1, axis=0)
+        expected[0] = prices / env.max_price
+        assert np.array_equal(env.price_history, expected)
+        assert np.array_equal(obs["supplier"][6:], expected.flatten())
+
+def test_step_arrays(env):
+    env.reset()
+    obs, rewards, terms, truncs, proposer = env.step_arrays(1, np.array([5000.0]))
+    assert obs.shape == (2, 7)
+    assert proposer == 1
+    assert env.current_proposer == "retailer"
+    assert not terms.any() and not truncs.any()
+
+    obs, rewards, terms, truncs, proposer = env.step_arrays(0, np.array([0.0]))
+    assert terms.all()
+    assert np.isclose(rewards[0], (5000.0 - env.val_s[0]) / env.max_price * 0.99)
+    assert np.isclose(rewards[1], (env.val_r[0] - 5000.0) / env.max_price * 0.99)
+
+def test_step_arrays_work_does_not_grow_with_history_lag():
+    def written_per_step(lag):
+        env = NegotiatorEnv(config={"max_rounds": 100, "num_agents": 10, "num_items": 20, "history_lag": lag})
+        env.reset(seed=0)
+        env.step_arrays(1, np.full(20, 5000.0))
+        env.observation_array()
+        before_buf, before_ring = env._obs_buf.copy(), env._hist_ring.copy()
+        env.step_arrays(1, np.full(20, 6000.0))
+        after_buf, after_ring = env._obs_buf.copy(), env._hist_ring.copy()
+        # History is rendered on read, and then matches the ordered ring window
+        obs = env.observation_array()
+        assert np.array_equal(obs[:, env._hist_col:env._hist_col + 20], np.full((10, 20), 0.6, dtype=np.float32))
+        assert np.array_equal(obs[:, env._hist_col + 20:env._hist_col + 40], np.full((10, 20), 0.5, dtype=np.float32))
+        return np.count_nonzero(before_buf != after_buf) + np.count_nonzero(before_ring != after_ring)
+
+    assert written_per_step(3) == written_per_step(256) == written_per_step(1024)
+
+def test_copy_obs_keeps_earlier_observations_intact():
+    # What RLlib relies on: an observation from step t is not rewritten by step t + 1
+    env = NegotiatorEnv(config={"max_rounds": 10, "num_items": 2, "copy_obs": True})
+    env.reset(seed=0)
+    obs_t, *_ = env.step({"supplier": {"type": 1, "price": np.array([5000.0, 6000.0])}})
+    snapshot = {agent: row.copy() for agent, row in obs_t.items()}
+    array_t, *_ = env.step_arrays(1, np.array([5500.0, 6500.0]))
+    array_snapshot = array_t.copy()
+    env.step({"supplier": {"type": 1, "price": np.array([5200.0, 6200.0])}})
+    assert all(np.array_equal(obs_t[agent], snapshot[agent]) for agent in snapshot)
+    assert np.array_equal(array_t, array_snapshot)
@@ -0,0 +1,89 @@
+import asyncio
+import json
+from src.api.fanout import ConnectionSender, SpectatorHub, watched_key
+from src.api.state_backend import InMemoryStateBackend
+
+class SlowWebSocket:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.frames = []
+
+    async def send_text(self, text):
+        await asyncio.sleep(self.delay)
+        self.frames.append(json.loads(text))
+
+def test_sender_drops_stale_turns_but_keeps_control_frames():
+    async def run():
+        ws = SlowWebSocket(delay=0.01)
+        sender = ConnectionSender(ws, max_queue=4)
+        sender.send_json({"type": "init"})
+        for r in range(20):
+            sender.send_json({"type": "turn", "round": r})
+        sender.send_json({"type": "end"})
+        sender.start()
+        await sender.close()
+        return ws.frames, sender
+
+    frames, sender = asyncio.run(run())
+    assert frames[0]["type"] == "init"
+    assert frames[-1]["type"] == "end"
+    rounds = [f["round"] for f in frames if f["type"] == "turn"]
+    # The newest turns survive; older ones were coalesced away
+    assert rounds == sorted(rounds) and rounds[-1] == 19
+    assert sender.dropped == 20 - len(rounds)
+
+def test_slow_spectator_does_not_delay_others():
+    async def run():
+        backend = InMemoryStateBackend()
+        hub = SpectatorHub(backend)
+        fast, slow = SlowWebSocket(), SlowWebSocket(delay=0.2)
+        senders = [ConnectionSender(fast, max_queue=8), ConnectionSender(slow, max_queue=8)]
+        for sender in senders:
+            sender.start()
+            hub.join("session_1_1", sender)
+        await asyncio.sleep(0)
+        for r in range(5):
+            await hub.publish("session_1_1", {"type": "turn", "round": r})
+        await hub.publish("session_2_1", {"type": "turn", "round": 99})
+        await asyncio.sleep(0.05)
+        fast_frames = list(fast.frames)
+        for sender in senders:
+            hub.leave("session_1_1", sender)
+            await sender.close(timeout=0.1)
+        return fast_frames, slow.frames, hub
+
+    fast_frames, slow_frames, hub = asyncio.run(run())
+    assert [f["round"] for f in fast_frames] == [0, 1, 2, 3, 4]
+    assert len(slow_frames) <= 1
+    assert hub.spectator_count("session_1_1") == 0
+
+def test_unwatched_sessions_are_not_published():
+    async def run():
+        backend = InMemoryStateBackend()
+        published = []
+        original = backend.publish
+
+        async def recording_publish(channel, message):
+            published.append(channel)
+            await original(channel, message)
+
+        backend.publish = recording_publish
+        publisher, watcher = SpectatorHub(backend), SpectatorHub(backend)
+        await publisher.publish_if_watched("session_1_1", {"type": "turn"})
+        # A spectator on another worker marks the session as watched
+        sender = ConnectionSender(SlowWebSocket())
+        sender.start()
+        watcher.join("session_1_1", sender)
+
+        async def marked():
+            while await backend.get_value(watched_key("session_1_1")) is None:
+                await asyncio.sleep(0)
+
+        await asyncio.wait_for(marked(), 1.0)
+        publisher.forget("session_1_1")  # skip the cached "not watched" answer
+        await publisher.publish_if_watched("session_1_1", {"type": "turn"})
+        watcher.leave("session_1_1", sender)
+        await sender.close(timeout=0.1)
+        return published
+
+    assert asyncio.run(run()) == ["session:session_1_1"]
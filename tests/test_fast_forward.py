@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from src.environment.negotiator_env import NegotiatorEnv, RESULT_DEAL, RESULT_QUIT
+from src.environment.fast_forward import simulate_episodes, time_dependent_strategy, hybrid_random_strategy
+
+def _strategies(env, betas):
+    return [
+        time_dependent_strategy("supplier" in agent, env.max_rounds, beta=beta)
+        for agent, beta in zip(env.possible_agents, betas)
+    ]
+
+def _step_through_env(config, strategies, valuations):
+    """Reference: play one episode turn by turn through NegotiatorEnv."""
+    env = NegotiatorEnv(config)
+    env.reset()
+    env.valuation_matrix[:] = valuations
+    lag = max(env.history_lag, 1)
+    offers = []
+    rng = np.random.default_rng(0)
+    while True:
+        r = env.current_round
+        history = np.zeros((1, lag, env.num_items), dtype=np.float32)
+        recent = offers[::-1][:lag]
+        if recent:
+            history[0, :len(recent)] = recent
+        agent_idx = env.possible_agents.index(env.current_proposer)
+        types, prices = strategies[agent_idx](r, history, valuations[None, agent_idx], rng)
+        _, rewards, terms, truncs, _ = env.step_arrays(int(types[0]), prices[0])
+        if types[0] == 1:
+            offers.append(env.current_prices.copy())
+        if terms.any() or truncs.any():
+            return env.last_result, rewards.copy(), env.current_round, env.deal_prices
+
+@pytest.mark.parametrize("config,betas", [
+    ({"num_items": 2, "max_rounds": 12}, [0.5, 2.0]),
+    ({"num_items": 3, "max_rounds": 6}, [0.3, 0.3]),
+    ({"num_agents": 4, "num_items": 2, "max_rounds": 15, "history_lag": 1}, [0.5, 1.0, 2.0, 3.0]),
+])
+def test_matches_env_step_semantics(config, betas):
+    env = NegotiatorEnv(config)
+    strategies = _strategies(env, betas)
+    batch = simulate_episodes(strategies, config=config, num_episodes=64, seed=5)
+
+    for i in range(64):
+        result, rewards, rounds, deal_prices = _step_through_env(config, strategies, batch["valuations"][i])
+        assert batch["result"][i] == result
+        assert batch["rounds"][i] == rounds
+        assert np.allclose(batch["rewards"][i], rewards)
+        if result == RESULT_DEAL:
+            assert batch["deal_round"][i] == rounds
+            assert np.array_equal(batch["deal_prices"][i], deal_prices)
+
+def test_hybrid_random_strategy_outcomes():
+    config = {"num_items": 3, "max_rounds": 10}
+    batch = simulate_episodes([hybrid_random_strategy(), hybrid_random_strategy()], config=config,
+                              num_episodes=20000, seed=1, chunk_size=4096)
+    # No ACCEPT/QUIT before 4 offers have been exchanged
+    assert batch["rounds"].min() >= 4
+    assert set(np.unique(batch["result"])) <= {1, 2, 4}
+    assert (batch["result"] == RESULT_QUIT).any()
+    again = simulate_episodes([hybrid_random_strategy(), hybrid_random_strategy()], config=config,
+                              num_episodes=20000, seed=1, chunk_size=4096)
+    assert np.array_equal(batch["rewards"], again["rewards"])
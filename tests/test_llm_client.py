@@ -0,0 +1,110 @@
+import asyncio
+import json
+from aiohttp import web
+from src.llm.llm_client import LLMClient
+from src.agents.hybrid_agent import HybridAgent
+
+async def _start_fake_ollama(delay=0.0):
+    peers = set()
+    models = []
+
+    async def generate(request):
+        peers.add(request.transport.get_extra_info("peername"))
+        body = await request.json()
+        models.append(body["model"])
+        await asyncio.sleep(delay)
+        if body.get("stream"):
+            # Ollama's NDJSON stream: one token per line, then a done marker
+            resp = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+            await resp.prepare(request)
+            for token in [" ok", f" {body['model']}", " "]:
+                await resp.write((json.dumps({"response": token, "done": False}) + "\n").encode())
+                await asyncio.sleep(0.01)
+            await resp.write((json.dumps({"response": "", "done": True}) + "\n").encode())
+            await resp.write_eof()
+            return resp
+        return web.json_response({"response": f" ok {body['model']} "})
+
+    app = web.Application()
+    app.router.add_post("/api/generate", generate)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}", peers, models
+
+def test_pooled_session_reuses_connections_and_overrides_model():
+    async def run():
+        runner, url, peers, models = await _start_fake_ollama()
+        try:
+            async with LLMClient(base_url=url, max_connections_per_host=2) as client:
+                for _ in range(10):
+                    assert await client.generate_response("hi") == "ok llama3"
+                assert await client.generate_response("hi", model="mistral") == "ok mistral"
+                # Shared by agents on different models
+                agents = [HybridAgent("Supplier", model="phi3", llm_client=client),
+                          HybridAgent("Retailer", llm_client=client)]
+                messages = await asyncio.gather(*(a.speak([5000.0]) for a in agents for _ in range(4)))
+                assert all(m.startswith("ok ") for m in messages)
+                session = client._session
+            assert session.closed
+            return peers, models
+        finally:
+            await runner.cleanup()
+
+    peers, models = asyncio.run(run())
+    # Keep-alive: 19 requests over at most 2 connections
+    assert len(peers) <= 2
+    assert models.count("phi3") == 4 and models.count("mistral") == 1
+
+def test_read_timeout_and_connection_errors_are_reported():
+    async def run():
+        runner, url, _, _ = await _start_fake_ollama(delay=0.5)
+        try:
+            client = LLMClient(base_url=url, read_timeout=0.05)
+            slow = await client.generate_response("hi")
+            await client.aclose()
+        finally:
+            await runner.cleanup()
+        down = LLMClient(base_url="http://127.0.0.1:9", connect_timeout=0.5)
+        unreachable = await down.generate_response("hi")
+        await down.aclose()
+        return slow, unreachable
+
+    slow, unreachable = asyncio.run(run())
+    assert slow.startswith("[Error") and "timed out" in slow
+    assert unreachable.startswith("[Error: Connection failed")
+
+def test_stream_response_yields_tokens_as_they_arrive():
+    async def run():
+        runner, url, _, _ = await _start_fake_ollama()
+        try:
+            async with LLMClient(base_url=url) as client:
+                chunks, arrivals = [], []
+                async for chunk in client.stream_response("hi", model="phi3"):
+                    chunks.append(chunk)
+                    arrivals.append(asyncio.get_running_loop().time())
+                full = await client.generate_response("hi", model="phi3")
+            mock = [c async for c in LLMClient(mock_mode=True).stream_response("hi")]
+        finally:
+            await runner.cleanup()
+        return chunks, arrivals, full, mock
+
+    chunks, arrivals, full, mock = asyncio.run(run())
+    assert chunks == ["ok", " phi3", " "]
+    assert arrivals[-1] - arrivals[0] > 0.015  # incremental, not buffered
+    assert "".join(chunks).strip() == full
+    assert len(mock) > 5 and "".join(mock) == LLMClient(mock_mode=True)._mock_response("llama3")
+
+def test_session_from_a_finished_loop_is_closed():
+    client = LLMClient()
+
+    async def session():
+        return await client._get_session()
+
+    first = asyncio.run(session())
+    second = asyncio.run(session())
+    assert first is not second
+    assert first.closed and not second.closed
+    asyncio.run(client.aclose())
@@ -0,0 +1,208 @@
+import asyncio
+import pytest
+from src.llm.scheduler import LLMScheduler
+from src.agents.hybrid_agent import HybridAgent
+
+class FakeClient:
+    """Records call order and peak concurrency; each call takes `delay` seconds."""
+    model = "llama3"
+
+    def __init__(self, delay=0.02, cached=None):
+        self.delay = delay
+        self.cached = cached or {}
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+
+    async def cached_response(self, prompt, system_prompt=None, model=None):
+        return self.cached.get(prompt)
+
+    async def generate_response(self, prompt, system_prompt=None, model=None, check_cache=True):
+        self.calls.append(prompt)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        return f"re: {prompt}"
+
+    async def stream_response(self, prompt, system_prompt=None, model=None, check_cache=True):
+        self.calls.append(prompt)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            for word in ["re:", f" {prompt}"]:
+                await asyncio.sleep(self.delay / 2)
+                yield word
+        finally:
+            self.active -= 1
+
+    def get_negotiation_prompt(self, agent_role, offer_prices, history, persona="professional"):
+        return f"{agent_role} {persona} {list(offer_prices)}"
+
+def test_in_flight_requests_are_bounded():
+    async def run():
+        client = FakeClient()
+        scheduler = LLMScheduler(client, max_in_flight=3)
+        results = await asyncio.gather(*(scheduler.generate_response(f"p{i}") for i in range(12)))
+        stats = scheduler.stats()
+        await scheduler.aclose()
+        return client, results, stats
+
+    client, results, stats = asyncio.run(run())
+    assert results == [f"re: p{i}" for i in range(12)]
+    assert client.peak == 3
+    assert stats["completed"] == 12 and stats["in_flight"] == 0
+    assert stats["max_wait_ms"]["interactive"] > 0
+
+def test_interactive_requests_jump_the_batch_queue():
+    async def run():
+        client = FakeClient()
+        scheduler = LLMScheduler(client, max_in_flight=1)
+        batch = [asyncio.create_task(scheduler.generate_response(f"batch{i}", priority="batch")) for i in range(4)]
+        await asyncio.sleep(0.005)  # batch0 is running, the rest are queued
+        assert scheduler.stats()["queued"] == {"interactive": 0, "batch": 3}
+        interactive = asyncio.create_task(scheduler.generate_response("live", priority="interactive"))
+        await asyncio.gather(interactive, *batch)
+        await scheduler.aclose()
+        return client.calls
+
+    calls = asyncio.run(run())
+    assert calls == ["batch0", "live", "batch1", "batch2", "batch3"]
+
+def test_identical_prompts_share_one_request():
+    async def run():
+        client = FakeClient()
+        scheduler = LLMScheduler(client, max_in_flight=1)
+        blocker = asyncio.create_task(scheduler.generate_response("other", priority="batch"))
+        await asyncio.sleep(0)
+        queued = asyncio.create_task(scheduler.generate_response("same", priority="batch"))
+        await asyncio.sleep(0)
+        # Duplicate while queued: coalesced, and lifted to interactive priority
+        dupes = [scheduler.generate_response("same") for _ in range(4)]
+        results = await asyncio.gather(queued, *dupes, blocker)
+        # Different model is a different request
+        await scheduler.generate_response("same", model="phi3")
+        stats = scheduler.stats()
+        await scheduler.aclose()
+        return client.calls, results, stats
+
+    calls, results, stats = asyncio.run(run())
+    assert calls == ["other", "same", "same"]
+    assert results[:5] == ["re: same"] * 5
+    assert stats["coalesced"] == 4 and stats["submitted"] == 7
+
+def test_agents_speak_through_scheduler():
+    async def run():
+        client = FakeClient()
+        scheduler = LLMScheduler(client, max_in_flight=2)
+        agents = [HybridAgent("Supplier", llm_client=client, scheduler=scheduler, priority="batch")
+                  for _ in range(6)]
+        messages = await asyncio.gather(*(a.speak([5000.0]) for a in agents))
+        with pytest.raises(ValueError):
+            await scheduler.generate_response("x", priority="urgent")
+        await scheduler.aclose()
+        return client, messages, scheduler.stats()
+
+    client, messages, stats = asyncio.run(run())
+    assert messages == ["re: Supplier neutral [5000.0]"] * 6
+    assert client.calls == ["Supplier neutral [5000.0]"]
+    assert stats["coalesced"] == 5
+
+def test_streams_hold_a_slot_until_exhausted():
+    async def run():
+        client = FakeClient()
+        scheduler = LLMScheduler(client, max_in_flight=2)
+
+        async def consume(i, priority):
+            return "".join([c async for c in scheduler.stream_response(f"s{i}", priority=priority)])
+
+        tasks = [asyncio.create_task(consume(i, "batch")) for i in range(4)]
+        await asyncio.sleep(0.005)
+        assert scheduler.stats()["queued"]["batch"] == 2
+        live = asyncio.create_task(consume("live", "interactive"))
+        results = await asyncio.gather(*tasks, live)
+        await scheduler.aclose()
+        return client, results, scheduler.stats()
+
+    client, results, stats = asyncio.run(run())
+    assert results == ["re: s0", "re: s1", "re: s2", "re: s3", "re: slive"]
+    assert client.peak == 2
+    assert client.calls.index("slive") == 2
+    assert stats["in_flight"] == 0 and stats["completed"] == 5
+
+def test_cache_hits_skip_the_queue():
+    async def run():
+        client = FakeClient(delay=0.05, cached={"hot": "cached answer"})
+        scheduler = LLMScheduler(client, max_in_flight=1)
+        slow = [asyncio.create_task(scheduler.generate_response(f"cold{i}")) for i in range(3)]
+        await asyncio.sleep(0)
+        hit = await scheduler.generate_response("hot")
+        streamed = [c async for c in scheduler.stream_response("hot")]
+        # Answered while the slow generations still hold or wait for the only slot
+        pending = sum(not t.done() for t in slow)
+        await asyncio.gather(*slow)
+        stats = scheduler.stats()
+        await scheduler.aclose()
+        return client.calls, hit, streamed, pending, stats
+
+    calls, hit, streamed, pending, stats = asyncio.run(run())
+    assert hit == "cached answer" and streamed == ["cached answer"]
+    assert pending == 3
+    assert "hot" not in calls and stats["cache_hits"] == 2
+
+def test_identical_streams_share_one_generation():
+    async def run():
+        client = FakeClient()
+        scheduler = LLMScheduler(client, max_in_flight=2)
+
+        async def consume(delay=0):
+            await asyncio.sleep(delay)
+            return [c async for c in scheduler.stream_response("same")]
+
+        # The late joiner arrives mid-stream and gets the earlier chunks replayed
+        results = await asyncio.gather(consume(), consume(), consume(0.015))
+        stats = scheduler.stats()
+
+        # A stream everyone abandons is cancelled and frees its slot
+        stream = scheduler.stream_response("dropped")
+        await stream.__anext__()
+        await stream.aclose()
+        await asyncio.gather(*scheduler._running, return_exceptions=True)
+        in_flight = scheduler.stats()["in_flight"]
+        await scheduler.aclose()
+        return client.calls, results, stats, in_flight
+
+    calls, results, stats, in_flight = asyncio.run(run())
+    assert calls == ["same", "dropped"]
+    assert results == [["re:", " same"]] * 3
+    assert stats["coalesced"] == 2
+    assert in_flight == 0
+
+def test_cancel_before_first_step_frees_the_slot():
+    class CancelOnDispatch(set):
+        """Cancels each task as it is dispatched, before its body gets to run."""
+        def add(self, task):
+            super().add(task)
+            task.cancel()
+
+    async def run():
+        client = FakeClient()
+        scheduler = LLMScheduler(client, max_in_flight=1)
+        scheduler._ensure_started()
+        scheduler._running = CancelOnDispatch()
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(scheduler.generate_response("cancelled"), 1.0)
+        await asyncio.sleep(0)
+        in_flight = scheduler.stats()["in_flight"]
+        scheduler._running = set()
+        # The only slot must be free again, or this request would wait forever
+        result = await asyncio.wait_for(scheduler.generate_response("next"), 1.0)
+        await scheduler.aclose()
+        return client, in_flight, result
+
+    client, in_flight, result = asyncio.run(run())
+    assert in_flight == 0
+    assert result == "re: next"
+    assert client.calls == ["next"]
@@ -94,6 +94,33 @@ def test_5_agent_negotiation():
     assert len(env.possible_agents) == 5
     print("PASS: 5-Agent negotiation works!")
 
+def test_n_agent_settlement():
+    env = NegotiatorEnv(config={"num_agents": 4, "num_items": 2, "max_rounds": 10})
+    env.reset()
+    env.step({env.current_proposer: {"type": 1, "price": np.array([6500.0, 6500.0])}})
+    obs, rewards, terms, truncs, infos = env.step({env.current_proposer: {"type": 0, "price": np.zeros(2)}})
+
+    assert all(terms.values())
+    for i, agent in enumerate(env.possible_agents):
+        sign = 1.0 if agent.startswith("supplier") else -1.0
+        expected = sign * np.sum(6500.0 - env.valuations[agent]) / env.max_price * 0.99
+        assert np.isclose(rewards[agent], expected)
+        assert infos[agent]["result"] == "deal"
+
+def test_per_agent_item_weights():
+    weights = [[1.0, 0.0], [0.5, 2.0]]
+    env = NegotiatorEnv(config={"num_items": 2, "item_weights": weights})
+    env.reset()
+    env.val_s = np.array([4000.0, 4000.0])
+    env.val_r = np.array([8000.0, 8000.0])
+    env.step({"supplier": {"type": 1, "price": np.array([6000.0, 5000.0])}})
+    _, rewards, _, _, _ = env.step({"retailer": {"type": 0, "price": np.zeros(2)}})
+
+    assert np.isclose(rewards["supplier"], 0.2 * 0.99)
+    assert np.isclose(rewards["retailer"], (0.5 * 0.2 + 2.0 * 0.3) * 0.99)
+    # Valuation assignments write through to the observation buffer
+    assert np.isclose(env._obs_buf[0, 2], 0.4)
+
 if __name__ == "__main__":
     print("\\nPhase 7: N-Agent Environment Test Suite")
     print("=" * 60)
@@ -102,6 +129,8 @@ if __name__ == "__main__":
         test_2_agent_backward_compatibility()
         test_3_agent_negotiation()
         test_5_agent_negotiation()
+        test_n_agent_settlement()
+        test_per_agent_item_weights()
         
         print("\\n" + "=" * 60)
         print("ALL TESTS PASSED!")
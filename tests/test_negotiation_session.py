@@ -0,0 +1,160 @@
+import asyncio
+import pytest
+from fastapi import WebSocketDisconnect
+from src.environment.negotiator_env import NegotiatorEnv
+from src.agents.hybrid_agent import HybridAgent
+from src.api.negotiation_session import NegotiationSession, resolve_pacing
+
+class FakeWebSocket:
+    """Client stand-in: scripted incoming messages, recorded outgoing ones."""
+    def __init__(self, incoming=()):
+        self.incoming = asyncio.Queue()
+        for msg in incoming:
+            self.incoming.put_nowait(msg)
+        self.sent = []
+
+    async def receive_json(self):
+        msg = await self.incoming.get()
+        if msg is None:
+            raise WebSocketDisconnect()
+        return msg
+
+    async def send_json(self, payload):
+        self.sent.append(payload)
+
+def _session(ws, pacing="turbo", max_rounds=10):
+    env = NegotiatorEnv(config={"max_rounds": max_rounds, "num_items": 2})
+    obs, _ = env.reset(seed=0)
+    agents = {"supplier": HybridAgent(role="Supplier"), "retailer": HybridAgent(role="Retailer")}
+    for agent in agents.values():
+        agent.num_items = 2
+    return NegotiationSession(ws, env, agents, pacing=pacing), obs
+
+def test_resolve_pacing():
+    assert resolve_pacing("turbo") == 0.0
+    assert resolve_pacing(None) == 1.5
+    assert resolve_pacing("0.25") == 0.25
+    assert resolve_pacing(100) == 10.0
+    with pytest.raises(ValueError):
+        resolve_pacing("warp")
+
+def test_turbo_runs_without_delay():
+    timeouts = []
+
+    def record_timeouts(session):
+        next_control = session._next_control
+
+        async def recorded(timeout=None):
+            timeouts.append(timeout)
+            return await next_control(timeout)
+
+        session._next_control = recorded
+        return session
+
+    async def run():
+        sessions = [_session(FakeWebSocket()) for _ in range(200)]
+        for session, _ in sessions:
+            record_timeouts(session)
+        await asyncio.gather(*(session.run(obs) for session, obs in sessions))
+        return sessions
+
+    sessions = asyncio.run(run())
+    # Every pacing wait was a non-blocking poll of the control queue
+    assert timeouts and all(t is not None and t <= 0 for t in timeouts)
+    for session, _ in sessions:
+        turns = [m for m in session.websocket.sent if m["type"] == "turn"]
+        assert 1 <= len(turns) <= 10
+
+def test_controls_interrupt_pacing_and_manual_turns():
+    async def run():
+        ws = FakeWebSocket()
+        session, obs = _session(ws, pacing="slow")
+        task = asyncio.create_task(session.run(obs))
+        await asyncio.sleep(0.05)
+        # The first automated turn is out; switching to manual cuts the 3s delay short
+        ws.incoming.put_nowait({"type": "toggle_manual", "value": True})
+        await asyncio.sleep(0.05)
+        assert ws.sent[-1] == {"type": "wait_for_human", "agent": "retailer"}
+        ws.incoming.put_nowait({"type": "human_action", "action": 2, "price": 0, "message": "bye"})
+        await asyncio.wait_for(task, 1.0)
+        return ws.sent
+
+    sent = asyncio.run(run())
+    turns = [m for m in sent if m["type"] == "turn"]
+    assert turns[-1]["agent"] == "retailer"
+    assert turns[-1]["action"] == "QUIT"
+    assert turns[-1]["message"] == "bye"
+
+def test_disconnect_while_waiting_for_human():
+    async def run():
+        ws = FakeWebSocket([{"type": "toggle_manual", "value": True}, None])
+        session, obs = _session(ws)
+        await session.run(obs)
+
+    with pytest.raises(WebSocketDisconnect):
+        asyncio.run(run())
+
+def test_messages_stream_as_deltas_before_the_turn():
+    async def run():
+        ws = FakeWebSocket()
+        session, obs = _session(ws)
+        await session.run(obs)
+        return ws.sent
+
+    sent = asyncio.run(run())
+    turns = [m for m in sent if m["type"] == "turn"]
+    for turn in (t for t in turns if t["action"] == "COUNTER"):
+        index = sent.index(turn)
+        deltas = [m for m in sent[:index]
+                  if m["type"] == "message_delta" and m["round"] == turn["round"] and m["agent"] == turn["agent"]]
+        assert len(deltas) > 1
+        assert "".join(d["delta"] for d in deltas).strip() == turn["message"]
+
+def test_player_queue_stays_bounded_for_a_slow_client():
+    from src.api.fanout import ConnectionSender
+
+    class SlowTextWebSocket(FakeWebSocket):
+        async def send_text(self, text):
+            await asyncio.sleep(0.001)
+            self.sent.append(text)
+
+    async def run():
+        ws = SlowTextWebSocket()
+        sender = ConnectionSender(ws, max_queue=4)
+        sender.start()
+        session, obs = _session(ws)
+        session.sender = sender
+        peak = 0
+        original = sender.send
+
+        def tracking_send(text, droppable=False):
+            nonlocal peak
+            result = original(text, droppable)
+            peak = max(peak, sender.queued)
+            return result
+
+        sender.send = tracking_send
+        await session.run(obs)
+        await sender.close()
+        return peak, sender.dropped, len(ws.sent)
+
+    peak, dropped, sent = asyncio.run(run())
+    assert peak <= 4 and dropped == 0 and sent > 10
+
+def test_only_expensive_policies_are_offloaded(monkeypatch):
+    from src.api import negotiation_session as ns
+    offloaded = []
+
+    async def recording_run_cpu(fn, *args, **kwargs):
+        offloaded.append(fn.__self__.role)
+        return fn(*args, **kwargs)
+
+    monkeypatch.setattr(ns, "run_cpu", recording_run_cpu)
+
+    async def run():
+        session, obs = _session(FakeWebSocket())
+        session.agents["retailer"].expensive_policy = True
+        await session.run(obs)
+
+    asyncio.run(run())
+    assert offloaded and set(offloaded) == {"Retailer"}
@@ -0,0 +1,54 @@
+import asyncio
+import threading
+import time
+from src.api.offload import OffloadPool
+
+def test_offload_runs_off_loop_and_bounds_pending():
+    pool = OffloadPool("test", max_workers=2, max_pending=3)
+    release = threading.Event()
+    loop_thread = threading.get_ident()
+
+    def blocking(i):
+        release.wait(1.0)
+        return i, threading.get_ident()
+
+    async def run():
+        tasks = [asyncio.create_task(pool.run(blocking, i)) for i in range(6)]
+        await asyncio.sleep(0.05)
+        # Two running, one admitted but queued, three waiting for admission
+        stats = pool.stats()
+        assert stats["pending"] == 3
+        assert stats["running"] == 2
+        assert stats["queued"] == 1
+        assert stats["waiting"] == 3
+        # The loop stays responsive while the pool is saturated
+        started = time.perf_counter()
+        await asyncio.sleep(0.01)
+        assert time.perf_counter() - started < 0.5
+        release.set()
+        return await asyncio.gather(*tasks)
+
+    results = asyncio.run(run())
+    assert [r[0] for r in results] == list(range(6))
+    assert all(r[1] != loop_thread for r in results)
+    stats = pool.stats()
+    assert stats["completed"] == 6
+    assert stats["pending"] == 0
+    assert stats["max_pending_seen"] == 3
+    pool.shutdown()
+
+def test_offload_counts_failures():
+    pool = OffloadPool("test", max_workers=1, max_pending=1)
+
+    async def run():
+        try:
+            await pool.run(int, "not a number")
+        except ValueError:
+            pass
+        return await pool.run(int, "7")
+
+    assert asyncio.run(run()) == 7
+    assert pool.stats()["failed"] == 1
+    # A second event loop gets its own admission semaphore
+    assert asyncio.run(pool.run(int, "8")) == 8
+    pool.shutdown()
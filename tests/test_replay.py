@@ -0,0 +1,84 @@
+import asyncio
+import json
+from fastapi import WebSocketDisconnect
+from src.api.fanout import ConnectionSender
+from src.api.replay import ReplayStream, open_replay_source, overview
+from src.api.session_archive import write_archive
+
+def _write_session(tmp_path, num_turns=40):
+    session = {
+        "id": "session_5_1",
+        "timestamp": "2026-01-01T00:00:00",
+        "config": {"num_items": 2, "max_rounds": num_turns},
+        "initial_state": {"val_s": [4000.0, 4000.0], "val_r": [9000.0, 9000.0]},
+        "turns": [{"type": "turn", "round": r + 1, "agent": ["supplier", "retailer"][r % 2], "action": "COUNTER",
+                   "price": [5000.0 + r, 6000.0 - r], "message": f"m{r}", "surplus": {"supplier": 0.0, "retailer": 0.0}}
+                  for r in range(num_turns)],
+        "deal_price": None,
+        "final_rewards": None,
+    }
+    write_archive(str(tmp_path / "session_5_1.eqxs"), session)
+
+class ReplayClient:
+    """Websocket stand-in: scripted controls in, JSON frames out."""
+    def __init__(self):
+        self.incoming = asyncio.Queue()
+        self.frames = []
+
+    async def receive_json(self):
+        msg = await self.incoming.get()
+        if msg is None:
+            raise WebSocketDisconnect()
+        return msg
+
+    async def send_text(self, text):
+        self.frames.append(json.loads(text))
+
+def test_replay_streams_seeks_and_pauses(tmp_path):
+    _write_session(tmp_path)
+    source = open_replay_source(str(tmp_path), "session_5_1")
+    assert source.num_turns == 40
+
+    async def run():
+        ws = ReplayClient()
+        sender = ConnectionSender(ws)
+        sender.start()
+        stream = ReplayStream(ws, sender, source, speed=100.0)
+        task = asyncio.create_task(stream.run(overview_points=10))
+        await asyncio.sleep(0.05)
+        ws.incoming.put_nowait({"type": "seek", "round": 30})
+        await asyncio.sleep(0.02)
+        ws.incoming.put_nowait({"type": "pause"})
+        await asyncio.sleep(0.05)
+        paused_at = len(ws.frames)
+        await asyncio.sleep(0.05)
+        assert len(ws.frames) == paused_at
+        ws.incoming.put_nowait({"type": "set_speed", "value": 1000})
+        ws.incoming.put_nowait({"type": "resume"})
+        await asyncio.sleep(0.2)
+        ws.incoming.put_nowait(None)
+        try:
+            await task
+        except WebSocketDisconnect:
+            pass
+        await sender.close()
+        return ws.frames
+
+    frames = asyncio.run(run())
+    assert frames[0]["type"] == "init" and frames[0]["num_turns"] == 40
+    assert frames[1]["type"] == "overview" and len(frames[1]["index"]) == 10
+    seek = next(i for i, f in enumerate(frames) if f["type"] == "seek")
+    assert frames[seek]["index"] == 29 and frames[seek]["round"] == 30
+    after = [f["round"] for f in frames[seek + 1:] if f["type"] == "turn"]
+    assert after == list(range(30, 41))
+    assert frames[-1]["type"] == "end"
+
+def test_overview_from_legacy_json(tmp_path):
+    session = {"id": "session_9", "config": {"num_items": 1},
+               "turns": [{"round": r, "price": float(r % 7)} for r in range(1, 101)]}
+    (tmp_path / "session_9.json").write_text(json.dumps(session))
+    source = open_replay_source(str(tmp_path), "session_9")
+    data = overview(source, 20)
+    assert len(data["index"]) == 20
+    assert data["round"][0] == 1 and data["round"][-1] == 100
+    assert open_replay_source(str(tmp_path), "session_10") is None
@@ -0,0 +1,77 @@
+import asyncio
+import time
+from src.llm.response_cache import ResponseCache, normalize_prompt, prompt_fingerprint
+from src.llm.llm_client import LLMClient
+from tests.test_llm_client import _start_fake_ollama
+
+def test_prices_are_bucketed_and_whitespace_collapsed():
+    assert normalize_prompt("Offer  $5,010.40\nnow", price_bucket=25) == "Offer $5000.00 now"
+    assert normalize_prompt("Offer $5,013", price_bucket=25) == "Offer $5025.00"
+    assert normalize_prompt("Offer $5,013", price_bucket=0) == "Offer $5013.00"
+    same = prompt_fingerprint("llama3", "sys", "Offer $5,004") == prompt_fingerprint("llama3", "sys", "Offer $4,998")
+    assert same
+    assert prompt_fingerprint("llama3", "sys", "Offer $5,004") != prompt_fingerprint("phi3", "sys", "Offer $5,004")
+    assert prompt_fingerprint("llama3", "sys", "Offer $5,004") != prompt_fingerprint("llama3", "sys", "Offer $5,104")
+
+def test_memory_tier_lru_and_ttl():
+    cache = ResponseCache(max_entries=2, ttl=0.05)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    assert cache.get("a") == "1"
+    cache.put("c", "3")  # evicts b, the least recently used
+    assert cache.get("b") is None
+    assert cache.get("c") == "3"
+    time.sleep(0.06)
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert stats["hits"] == 2 and stats["misses"] == 2
+    assert stats["evictions"] == 1 and stats["expirations"] == 1
+
+def test_disk_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "llm_cache.sqlite")
+    cache = ResponseCache(disk_path=path)
+    asyncio.run(cache.aput(cache.key("llama3", None, "Offer $5000"), "Deal."))
+    cache.close()
+
+    reopened = ResponseCache(disk_path=path)
+    assert asyncio.run(reopened.aget(reopened.key("llama3", None, "Offer $5,010"))) == "Deal."
+    assert reopened.stats()["disk_hits"] == 1
+    # Promoted to memory
+    assert reopened.get(reopened.key("llama3", None, "Offer $5000")) == "Deal."
+    assert reopened.stats()["memory_hits"] == 1
+    reopened.close()
+
+    expired = ResponseCache(disk_path=path, disk_ttl=0)
+    assert expired.get(expired.key("llama3", None, "Offer $5000")) is None
+    expired.close()
+
+def test_client_serves_repeated_prompts_from_cache():
+    async def run():
+        runner, url, _, models = await _start_fake_ollama()
+        cache = ResponseCache()
+        try:
+            async with LLMClient(base_url=url, cache=cache) as client:
+                first = await client.generate_response("Offer $5,000")
+                second = await client.generate_response("Offer $5,004")
+                other = await client.generate_response("Offer $5,004", model="mistral")
+        finally:
+            await runner.cleanup()
+        return first, second, other, models, cache.stats()
+
+    first, second, other, models, stats = asyncio.run(run())
+    assert first == second == "ok llama3" and other == "ok mistral"
+    assert models == ["llama3", "mistral"]
+    assert stats["hits"] == 1 and stats["misses"] == 2
+
+def test_disk_prune_runs_in_background_and_keeps_newest(tmp_path):
+    async def run():
+        cache = ResponseCache(disk_path=str(tmp_path / "llm_cache.sqlite"), max_disk_entries=2, prune_every=4)
+        for i in range(4):
+            await cache.aput(f"k{i}", f"v{i}")
+        await cache._prune_task
+        cache._memory.clear()
+        found = [await cache.aget(f"k{i}") for i in range(4)]
+        cache.close()
+        return found
+
+    assert asyncio.run(run()) == [None, None, "v2", "v3"]
@@ -0,0 +1,74 @@
+import json
+import numpy as np
+from src.api.session_archive import SessionArchive, write_archive, load_session, convert_session_file
+from src.api.session_index import SessionIndex
+
+def _session(num_turns=12):
+    agents = ["supplier", "retailer"]
+    return {
+        "id": "session_7",
+        "timestamp": "2026-01-01T00:00:00",
+        "config": {"num_items": 2, "max_rounds": 20},
+        "initial_state": {"val_s": [4000.0, 4100.0], "val_r": [9000.0, 9100.0]},
+        "turns": [
+            {
+                "type": "turn",
+                "round": r + 1,
+                "agent": agents[r % 2],
+                "action": "ACCEPT" if r == num_turns - 1 else "COUNTER",
+                "price": [5000.0 + r, 6000.5 - r],
+                "message": f"Offer {r} €" * (r % 3),
+                "surplus": {"supplier": 0.25 * r, "retailer": -0.125 * r},
+            }
+            for r in range(num_turns)
+        ],
+        "deal_price": [5010.0, 5990.5],
+        "final_rewards": {"supplier": 0.1, "retailer": 0.2},
+    }
+
+def test_archive_round_trip_and_range_reads(tmp_path):
+    session = _session()
+    path = tmp_path / "session_7.eqxs"
+    write_archive(str(path), session)
+
+    archive = SessionArchive(str(path))
+    assert len(archive) == 12
+    assert isinstance(archive.price_series(), np.ndarray)
+    assert archive.price_series().shape == (12, 2)
+    full = archive.to_session()
+    assert full["turns"] == session["turns"]
+    assert full["deal_price"] == session["deal_price"]
+    assert full["initial_state"] == session["initial_state"]
+
+    assert archive.turns(4, 7) == session["turns"][4:7]
+    assert archive.turns(10, 50) == session["turns"][10:]
+    assert archive.turns(5, 5) == []
+
+    # Columns are aligned so they can be viewed straight from the map
+    for spec in archive.header["columns"].values():
+        assert spec["offset"] % 64 == 0
+
+def test_empty_session_and_loading_all_formats(tmp_path):
+    empty = {**_session(0), "id": "session_8", "deal_price": None}
+    write_archive(str(tmp_path / "session_8.eqxs"), empty)
+    assert load_session(str(tmp_path), "session_8")["turns"] == []
+
+    legacy = tmp_path / "session_7.json"
+    legacy.write_text(json.dumps(_session(), indent=4))
+    from_json = load_session(str(tmp_path), "session_7", 2, 4)
+    assert from_json["num_turns"] == 12
+    assert [t["round"] for t in from_json["turns"]] == [3, 4]
+
+    archive_path = convert_session_file(str(legacy), remove_source=True)
+    assert not legacy.exists()
+    assert archive_path.endswith(".eqxs")
+    from_archive = load_session(str(tmp_path), "session_7", 2, 4)
+    assert from_archive["turns"] == from_json["turns"]
+    assert load_session(str(tmp_path), "session_9") is None
+
+    index = SessionIndex(str(tmp_path / "index.sqlite3"))
+    assert index.rebuild(str(tmp_path)) == 2
+    sessions, _ = index.query()
+    assert {s["id"]: s["result"] for s in sessions} == {"session_7": "Deal", "session_8": "No Deal"}
+    assert {s["id"]: s["rounds"] for s in sessions}["session_7"] == 12
+    index.close()
@@ -0,0 +1,58 @@
+import json
+import pytest
+from src.api.session_index import SessionIndex
+
+def _session(i, deal=True, num_items=3):
+    return {
+        "id": f"session_{1000 + i}",
+        "timestamp": f"2026-01-{1 + i // 10:02d}T10:00:{i % 10:02d}",
+        "config": {"num_items": num_items, "max_rounds": 10},
+        "turns": [{"round": r} for r in range(i % 5 + 1)],
+        "deal_price": [6000.0] * num_items if deal else None,
+        "final_rewards": {"supplier": 0.1, "retailer": 0.2},
+    }
+
+@pytest.fixture
+def index(tmp_path):
+    idx = SessionIndex(str(tmp_path / "index.sqlite3"))
+    for i in range(25):
+        idx.add(_session(i, deal=i % 2 == 0, num_items=3 if i < 20 else 1))
+    yield idx
+    idx.close()
+
+def test_cursor_pagination_is_newest_first(index):
+    seen = []
+    cursor = None
+    while True:
+        page, cursor = index.query(limit=10, cursor=cursor)
+        seen += [s["id"] for s in page]
+        if cursor is None:
+            break
+    assert seen == [f"session_{1000 + i}" for i in reversed(range(25))]
+
+def test_filters(index):
+    deals, _ = index.query(limit=100, result="Deal")
+    assert len(deals) == 13
+    single, _ = index.query(limit=100, num_items=1)
+    assert {s["id"] for s in single} == {f"session_{1000 + i}" for i in range(20, 25)}
+    dated, _ = index.query(limit=100, date_from="2026-01-02", date_to="2026-01-02T23:59:59")
+    assert len(dated) == 10
+    assert dated[0]["config"]["max_rounds"] == 10
+    assert dated[0]["final_rewards"]["retailer"] == 0.2
+
+def test_rebuild_backfills_existing_files(tmp_path):
+    sessions_dir = tmp_path / "sessions"
+    sessions_dir.mkdir()
+    for i in range(3):
+        (sessions_dir / f"session_{1000 + i}.json").write_text(json.dumps(_session(i)))
+    (sessions_dir / "broken.json").write_text("{not json")
+    idx = SessionIndex(str(sessions_dir / "index.sqlite3"))
+    assert idx.rebuild(str(sessions_dir)) == 3
+    assert idx.rebuild(str(sessions_dir)) == 0
+    page, _ = idx.query()
+    assert page[0]["rounds"] == 3
+    idx.close()
+
+def test_invalid_cursor(index):
+    with pytest.raises(ValueError):
+        index.query(cursor="not-a-cursor")
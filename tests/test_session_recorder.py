@@ -0,0 +1,46 @@
+import asyncio
+import json
+from src.api.session_recorder import SessionRecorder, read_session_log
+
+HEADER = {"id": "session_1", "timestamp": "2026-01-01T00:00:00", "config": {"num_items": 2, "max_rounds": 10}}
+
+def test_records_stream_to_jsonl(tmp_path):
+    path = tmp_path / "session_1.jsonl"
+
+    async def run():
+        recorder = SessionRecorder(str(path), HEADER, batch_size=4, flush_interval=0.01)
+        await recorder.start()
+        for r in range(10):
+            recorder.record({"type": "turn", "round": r + 1, "price": [5000.0, 6000.0]})
+        await asyncio.sleep(0.05)
+        # Turns are on disk before the session ends
+        assert len(path.read_text().splitlines()) == 11
+        await recorder.close({"deal_price": [5500.0, 6000.0], "final_rewards": {"supplier": 0.1}})
+        return recorder.summary()
+
+    summary = asyncio.run(run())
+    assert summary["rounds"] == 10
+    session = read_session_log(str(path))
+    assert session["id"] == "session_1"
+    assert session["status"] == "completed"
+    assert [t["round"] for t in session["turns"]] == list(range(1, 11))
+    assert session["deal_price"] == [5500.0, 6000.0]
+
+def test_disconnect_and_torn_log(tmp_path):
+    path = tmp_path / "session_2.jsonl"
+
+    async def run():
+        recorder = SessionRecorder(str(path), HEADER)
+        await recorder.start()
+        recorder.record({"type": "turn", "round": 1})
+        await recorder.close({"deal_price": None, "final_rewards": None}, status="disconnected")
+
+    asyncio.run(run())
+    assert read_session_log(str(path))["status"] == "disconnected"
+
+    # A crash mid-write leaves no end record and maybe a partial line
+    torn = tmp_path / "session_3.jsonl"
+    torn.write_text(json.dumps({"type": "header", **HEADER}) + "\n" + json.dumps({"type": "turn", "round": 1}) + "\n{\"type\": \"tu")
+    session = read_session_log(str(torn))
+    assert session["status"] == "incomplete"
+    assert len(session["turns"]) == 1
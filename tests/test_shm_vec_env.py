@@ -0,0 +1,70 @@
+from multiprocessing import shared_memory
+import numpy as np
+import pytest
+from src.environment.shm_vec_env import SharedMemoryVecEnv
+from src.environment.vec_negotiator_env import VecNegotiatorEnv
+
+CONFIG = {"max_rounds": 6, "num_items": 2}
+
+def _actions(rng, num_envs):
+    types = rng.choice([0, 1, 1, 1, 2], size=num_envs)
+    prices = rng.uniform(4000, 9000, size=(num_envs, 2)).astype(np.float32)
+    return types, prices
+
+def test_matches_in_process_slices():
+    with SharedMemoryVecEnv(CONFIG, num_envs=16, num_workers=2) as pool:
+        obs, _ = pool.reset(seed=10)
+        # Worker slices are seeded seed + i, so two local envs reproduce the pool
+        local = [VecNegotiatorEnv(CONFIG, num_envs=8) for _ in range(2)]
+        local_obs = [env.reset(seed=10 + i)[0] for i, env in enumerate(local)]
+        assert np.array_equal(obs, np.concatenate(local_obs))
+
+        rng = np.random.default_rng(0)
+        for _ in range(20):
+            types, prices = _actions(rng, 16)
+            obs, rewards, terms, truncs, infos = pool.step(types, prices)
+            outputs = [env.step(types[i * 8:(i + 1) * 8], prices[i * 8:(i + 1) * 8]) for i, env in enumerate(local)]
+            assert np.array_equal(obs, np.concatenate([o[0] for o in outputs]))
+            assert np.array_equal(rewards, np.concatenate([o[1] for o in outputs]))
+            assert np.array_equal(terms, np.concatenate([o[2] for o in outputs]))
+            assert np.array_equal(infos["result"], np.concatenate([o[4]["result"] for o in outputs]))
+
+def test_async_step():
+    pool = SharedMemoryVecEnv(CONFIG, num_envs=8, num_workers=2)
+    try:
+        pool.reset(seed=0)
+        pool.step_async(np.ones(8, dtype=np.int64), np.full((8, 2), 6000.0))
+        obs, rewards, terms, truncs, _ = pool.step_wait()
+        assert obs.shape == (8, 2, pool.obs_size)
+        assert not terms.any() and not truncs.any()
+        assert np.allclose(obs[:, :, 0], 0.6)
+    finally:
+        pool.close()
+    assert pool.closed
+
+def test_close_after_a_worker_died():
+    pool = SharedMemoryVecEnv(CONFIG, num_envs=8, num_workers=2)
+    names = [block.name for block in pool._blocks]
+    pool._processes[0].kill()
+    pool._processes[0].join()
+    pool.close()
+    assert pool.closed
+    for name in names:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+def test_worker_error_drains_every_reply():
+    with SharedMemoryVecEnv(CONFIG, num_envs=8, num_workers=2) as pool:
+        pool.reset(seed=0)
+        # Worker 0 rejects its command; worker 1's reply must not be left in its pipe
+        pool._remotes[0].send(("bogus", None))
+        pool._remotes[1].send(("reset", 1))
+        pool._waiting = True
+        with pytest.raises(RuntimeError, match="Unknown command"):
+            pool.step_wait()
+        assert not pool._waiting
+
+        pool.step_async(np.ones(8, dtype=np.int64), np.full((8, 2), 6000.0))
+        obs, _, terms, _, _ = pool.step_wait()
+        assert not terms.any()
+        assert np.allclose(obs[:, :, 0], 0.6)
@@ -0,0 +1,94 @@
+import asyncio
+import json
+import pytest
+from src.api import state_backend as sb
+from src.api.state_backend import InMemoryStateBackend, ConnectionManager, create_state_backend, SESSION_ID_PATTERN
+
+class FakeWebSocket:
+    def __init__(self):
+        self.accepted = False
+        self.closed = None
+        self.sent = []
+
+    async def accept(self):
+        self.accepted = True
+
+    async def close(self, code=1000, reason=""):
+        self.closed = code
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+def test_session_ids_are_unique_within_a_millisecond():
+    backend = InMemoryStateBackend()
+
+    async def run():
+        return await asyncio.gather(*(backend.new_session_id() for _ in range(1000)))
+
+    ids = asyncio.run(run())
+    assert len(set(ids)) == 1000
+    assert all(SESSION_ID_PATTERN.match(i) for i in ids)
+
+def test_session_ids_differ_across_workers():
+    # Each uvicorn worker has its own in-memory backend and sequence
+    workers = [InMemoryStateBackend(), InMemoryStateBackend()]
+
+    async def run():
+        return [await backend.new_session_id() for backend in workers]
+
+    first, second = asyncio.run(run())
+    assert first != second
+    assert SESSION_ID_PATTERN.match("session_1700000000000_3")
+
+class FailingWebSocket(FakeWebSocket):
+    async def accept(self):
+        raise RuntimeError("client went away")
+
+def test_failed_accept_releases_the_slot():
+    backend = InMemoryStateBackend()
+    manager = ConnectionManager(backend, max_connections=1)
+
+    async def run():
+        with pytest.raises(RuntimeError):
+            await manager.connect(FailingWebSocket())
+        assert await backend.active_connections() == 0
+        assert await manager.connect(FakeWebSocket())
+
+    asyncio.run(run())
+
+def test_capacity_is_shared_and_broadcast_reaches_every_manager():
+    backend = InMemoryStateBackend()
+    # Two managers on one backend stand in for two workers
+    workers = [ConnectionManager(backend, max_connections=3), ConnectionManager(backend, max_connections=3)]
+
+    async def run():
+        for manager in workers:
+            await manager.start()
+        sockets = [FakeWebSocket() for _ in range(4)]
+        accepted = [await workers[i % 2].connect(ws) for i, ws in enumerate(sockets)]
+        assert accepted == [True, True, True, False]
+        assert sockets[3].closed == 1008
+        assert await backend.active_connections() == 3
+
+        await asyncio.sleep(0)
+        await workers[0].broadcast({"type": "log", "message": "hello"})
+        await asyncio.sleep(0.01)
+        assert [ws.sent for ws in sockets[:3]] == [[{"type": "log", "message": "hello"}]] * 3
+
+        await workers[0].disconnect(sockets[0])
+        await workers[0].disconnect(sockets[0])
+        assert await backend.active_connections() == 2
+        assert await workers[1].connect(FakeWebSocket())
+        for manager in workers:
+            await manager.stop()
+
+    asyncio.run(run())
+
+def test_backend_selection(monkeypatch):
+    monkeypatch.delenv("EQX_STATE_BACKEND", raising=False)
+    assert isinstance(create_state_backend(), InMemoryStateBackend)
+    with pytest.raises(ValueError):
+        create_state_backend("memcached://localhost")
+    if sb.aioredis is None:
+        with pytest.raises(RuntimeError):
+            create_state_backend("redis://localhost:6379/0")
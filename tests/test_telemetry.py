@@ -0,0 +1,76 @@
+import asyncio
+import threading
+import time
+from fastapi.testclient import TestClient
+from src.utils.telemetry import Registry, Counter, Gauge, Histogram, EventLoopLagMonitor
+
+def test_sharded_metrics_sum_across_threads_and_render():
+    registry = Registry()
+    requests = Counter("requests", "Requests", ["route"], registry=registry)
+    latency = Histogram("latency_seconds", "Latency", buckets=(0.1, 1.0), registry=registry)
+    depth = Gauge("depth", "Depth", registry=registry)
+    child = requests.labels("/a")
+
+    def work():
+        for _ in range(10000):
+            child.inc()
+            latency.observe(0.5)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    latency.observe(0.05)
+    latency.observe(5.0)
+    depth.set_function(lambda: 7)
+
+    text = registry.render()
+    assert '# TYPE requests counter' in text
+    assert 'requests_total{route="/a"} 40000' in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1"} 40001' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 40002' in text
+    assert 'latency_seconds_count 40002' in text
+    assert 'depth 7' in text
+
+def test_event_loop_lag_monitor_sees_blocking_work():
+    registry = Registry()
+    lag = Histogram("lag_seconds", "Lag", buckets=(0.01, 0.1), registry=registry)
+    last = Gauge("lag_last_seconds", "Lag", registry=registry)
+
+    async def run():
+        monitor = EventLoopLagMonitor(lag, last, interval=0.01)
+        monitor.start()
+        await asyncio.sleep(0.03)
+        time.sleep(0.15)  # block the loop
+        await asyncio.sleep(0.03)
+        await monitor.stop()
+
+    asyncio.run(run())
+    cumulative, count, total = lag.labels().snapshot()
+    assert count >= 2
+    assert cumulative[1] < count  # at least one wake-up later than 100 ms
+
+def test_metrics_endpoint_reports_api_env_and_agent_metrics(tmp_path, monkeypatch):
+    from src.api import app as app_module
+    from src.api.session_index import SessionIndex
+    monkeypatch.setattr(app_module, "SESSIONS_DIR", str(tmp_path))
+    monkeypatch.setattr(app_module, "session_index", SessionIndex(str(tmp_path / "index.sqlite3")))
+    with TestClient(app_module.app) as client:
+        with client.websocket_connect("/ws/negotiate?pacing=turbo") as ws:
+            while ws.receive_json()["type"] != "end":
+                pass
+        resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = resp.text
+    assert 'eqx_turn_duration_seconds_count{mode="auto"}' in text
+    assert "eqx_env_step_duration_seconds_count" in text
+    assert "eqx_agent_action_duration_seconds_count" in text
+    assert 'eqx_llm_request_duration_seconds_count{model="llama3",outcome="mock"}' in text
+    assert 'eqx_sessions_started_total{kind="negotiate"}' in text
+    assert 'eqx_active_sessions{kind="negotiate"} 0' in text
+    assert 'eqx_offload_queue_depth{pool="cpu",state="running"}' in text
+    assert "eqx_session_save_duration_seconds_count" in text
+    assert list(tmp_path.glob("session_*.eqxs"))
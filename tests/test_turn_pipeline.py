@@ -0,0 +1,124 @@
+import asyncio
+import numpy as np
+import pytest
+from src.api.turn_pipeline import TurnPipeline
+from src.environment.negotiator_env import NegotiatorEnv
+from src.api.negotiation_session import NegotiationSession
+from tests.test_negotiation_session import FakeWebSocket
+
+async def _slow_message(text, delay):
+    await asyncio.sleep(delay)
+    return text
+
+async def _gated_message(text, gate, started):
+    started.append(text)
+    await gate.wait()
+    return text
+
+async def _until(predicate):
+    while not predicate():
+        await asyncio.sleep(0)
+
+async def _slow_stream(words, delay):
+    for word in words:
+        await asyncio.sleep(delay)
+        yield word
+
+def test_turns_are_emitted_in_order_while_messages_overlap():
+    async def run():
+        emitted = []
+
+        async def emit(payload):
+            emitted.append((payload["round"], payload["message"]))
+
+        pipeline = TurnPipeline(emit, max_pending=3)
+        gates = [asyncio.Event() for _ in range(3)]
+        started = []
+        for i, gate in enumerate(gates):
+            await pipeline.submit({"round": i + 1, "message": ""}, _gated_message(f"m{i + 1}", gate, started))
+        await pipeline.submit({"round": 4, "message": "final"})
+        # All three messages generate at once, before any turn is out
+        await asyncio.wait_for(_until(lambda: len(started) == 3), 1.0)
+        assert emitted == []
+        # Later turns finish generating first; output order must not change
+        for gate in reversed(gates):
+            gate.set()
+            await asyncio.sleep(0)
+        await pipeline.drain()
+        await pipeline.close()
+        return emitted
+
+    assert asyncio.run(run()) == [(1, "m1"), (2, "m2"), (3, "m3"), (4, "final")]
+
+def test_deltas_of_later_turns_wait_for_the_head():
+    async def run():
+        events = []
+
+        async def emit(payload):
+            events.append(("turn", payload["round"], payload["message"]))
+
+        async def on_delta(payload, chunk):
+            events.append(("delta", payload["round"], chunk))
+
+        pipeline = TurnPipeline(emit, on_delta)
+        await pipeline.submit({"round": 1}, _slow_stream(["a", " b"], 0.03))
+        await pipeline.submit({"round": 2}, _slow_stream(["c", " d"], 0.005))
+        await pipeline.drain()
+        await pipeline.close()
+        return events
+
+    assert asyncio.run(run()) == [
+        ("delta", 1, "a"), ("delta", 1, " b"), ("turn", 1, "a b"),
+        ("delta", 2, "c"), ("delta", 2, " d"), ("turn", 2, "c d"),
+    ]
+
+def test_emit_failure_surfaces_to_the_driver():
+    async def run():
+        async def emit(payload):
+            raise ConnectionError("client gone")
+
+        pipeline = TurnPipeline(emit, max_pending=1)
+        await pipeline.submit({"round": 1, "message": ""})
+        with pytest.raises(ConnectionError):
+            for i in range(3):
+                await pipeline.submit({"round": i + 2, "message": ""}, _slow_message("x", 10))
+        await pipeline.close()
+
+    asyncio.run(run())
+
+class GatedAgent:
+    """LLM-bound agent: every message waits for `gate`; `started` records the ones in flight."""
+    def __init__(self, gate, started):
+        self.gate = gate
+        self.started = started
+        self.history = []
+
+    def get_strategic_action(self, observation):
+        return {"type": 1, "price": np.full(2, 6000.0, dtype=np.float32)}
+
+    def draft(self, prices, stream=False):
+        self.history.append(list(prices))
+        return _gated_message(f"offer {len(self.history)}", self.gate, self.started)
+
+    def update_history(self, prices):
+        pass
+
+def test_session_overlaps_llm_calls_with_stepping():
+    async def run():
+        ws = FakeWebSocket()
+        env = NegotiatorEnv(config={"max_rounds": 6, "num_items": 2})
+        obs, _ = env.reset(seed=0)
+        gate, started = asyncio.Event(), []
+        agents = {"supplier": GatedAgent(gate, started), "retailer": GatedAgent(gate, started)}
+        session = NegotiationSession(ws, env, agents, pacing="turbo", stream_messages=False, pipeline_depth=3)
+        task = asyncio.create_task(session.run(obs))
+        # Sequential play would block on the first message; the env keeps stepping instead
+        await asyncio.wait_for(_until(lambda: len(started) >= 3), 1.0)
+        assert not [m for m in ws.sent if m["type"] == "turn"]
+        gate.set()
+        await asyncio.wait_for(task, 1.0)
+        return ws.sent
+
+    turns = [m for m in asyncio.run(run()) if m["type"] == "turn"]
+    assert [t["round"] for t in turns] == [1, 2, 3, 4, 5, 6]
+    assert [t["message"] for t in turns] == ["offer 1", "offer 1", "offer 2", "offer 2", "offer 3", "offer 3"]
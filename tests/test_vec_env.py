@@ -0,0 +1,110 @@
+import pytest
+import numpy as np
+from src.environment.negotiator_env import NegotiatorEnv, RESULT_DEAL, RESULT_TIMEOUT
+from src.environment.vec_negotiator_env import VecNegotiatorEnv
+
+@pytest.fixture
+def vec_env():
+    return VecNegotiatorEnv(config={"max_rounds": 5, "num_items": 2}, num_envs=8)
+
+def _mirror_slot(vec_env, slot):
+    """Build a single env holding the same valuations as one vec slot."""
+    env = NegotiatorEnv(config=vec_env.config)
+    env.reset()
+    for i, agent in enumerate(env.possible_agents):
+        env.valuations[agent][:] = vec_env.valuations[slot, i]
+    env._write_valuation_obs()
+    return env
+
+def test_reset_shapes(vec_env):
+    obs, infos = vec_env.reset(seed=0)
+    assert obs.shape == (8, 2, vec_env.obs_size)
+    assert obs.dtype == np.float32
+    # Feasible zone per item in 2-agent mode
+    assert np.all(vec_env.valuations[:, 0] <= vec_env.valuations[:, 1])
+    # Supplier proposes first
+    assert np.all(obs[:, 0, 2 * 2 + 1] == 1.0)
+    assert np.all(obs[:, 1, 2 * 2 + 1] == 0.0)
+
+def test_seed_is_reproducible(vec_env):
+    vec_env.reset(seed=42)
+    first = vec_env.valuations.copy()
+    vec_env.reset(seed=42)
+    assert np.array_equal(first, vec_env.valuations)
+
+def test_matches_single_env(vec_env):
+    vec_env.reset(seed=1)
+    env = _mirror_slot(vec_env, 0)
+
+    script = [
+        (1, [5000.0, 6000.0]),
+        (1, [5500.0, 6500.0]),
+        (0, [0.0, 0.0]),
+    ]
+    for action_type, price in script:
+        types = np.ones(vec_env.num_envs, dtype=np.int64)
+        prices = np.full((vec_env.num_envs, 2), 5000.0, dtype=np.float32)
+        types[0] = action_type
+        prices[0] = price
+
+        proposer = env.current_proposer
+        obs_single, rew_single, term_single, trunc_single, _ = env.step(
+            {proposer: {"type": action_type, "price": np.array(price)}}
+        )
+        obs, rewards, terms, truncs, infos = vec_env.step(types, prices)
+
+        for i, agent in enumerate(env.possible_agents):
+            assert rewards[0, i] == rew_single[agent]
+        assert terms[0] == term_single["supplier"]
+        assert truncs[0] == trunc_single["supplier"]
+        if not (terms[0] or truncs[0]):
+            for i, agent in enumerate(env.possible_agents):
+                assert np.array_equal(obs[0, i], obs_single[agent])
+
+    assert infos["result"][0] == RESULT_DEAL
+    assert np.array_equal(infos["deal_prices"][0], env.deal_prices)
+    assert np.array_equal(infos["final_observation"][0, 0], obs_single["supplier"])
+
+def test_random_rollouts_match_single_env_exactly():
+    config = {"num_agents": 3, "num_items": 3, "max_rounds": 12, "history_lag": 4}
+    vec_env = VecNegotiatorEnv(config=config, num_envs=6)
+    vec_env.reset(seed=7)
+    singles = [_mirror_slot(vec_env, slot) for slot in range(vec_env.num_envs)]
+    live = [True] * vec_env.num_envs
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        types = rng.choice([0, 1, 1, 1, 2], size=vec_env.num_envs)
+        prices = rng.uniform(3000, 10500, size=(vec_env.num_envs, 3)).astype(np.float32)
+        obs, rewards, terms, truncs, infos = vec_env.step(types, prices)
+        for slot, env in enumerate(singles):
+            if not live[slot]:
+                continue
+            proposer = env.current_proposer
+            obs_single, rew_single, term_single, trunc_single, _ = env.step(
+                {proposer: {"type": int(types[slot]), "price": prices[slot]}}
+            )
+            assert np.array_equal(rewards[slot], [rew_single[a] for a in env.possible_agents])
+            done = terms[slot] or truncs[slot]
+            if not done:
+                assert np.array_equal(vec_env.ordered_history([slot])[0], env.price_history)
+            final = infos["final_observation"][slot] if done else obs[slot]
+            for i, agent in enumerate(env.possible_agents):
+                assert np.array_equal(final[i], obs_single[agent])
+            # After an auto-reset the slot has new valuations; stop mirroring it
+            live[slot] = not done
+
+def test_timeout_and_autoreset(vec_env):
+    vec_env.reset(seed=3)
+    types = np.ones(vec_env.num_envs, dtype=np.int64)
+    prices = np.full((vec_env.num_envs, 2), 6000.0, dtype=np.float32)
+    for _ in range(vec_env.max_rounds - 1):
+        _, _, terms, truncs, _ = vec_env.step(types, prices)
+        assert not truncs.any()
+    obs, rewards, terms, truncs, infos = vec_env.step(types, prices)
+    assert truncs.all()
+    assert np.all(infos["result"] == RESULT_TIMEOUT)
+    assert np.allclose(rewards, -0.05)
+    assert np.all(infos["episode_rounds"] == vec_env.max_rounds)
+    # Slots were reset in place
+    assert np.all(vec_env.current_round == 0)
+    assert np.all(obs[:, :, :2] == 0.0)